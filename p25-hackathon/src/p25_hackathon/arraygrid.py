@@ -0,0 +1,427 @@
+import random
+import weakref
+from typing import Optional
+
+import numpy as np
+
+from p25_hackathon.grid import EMPTY, SHEEP, WOLF, Cell, CellDraws, Grid, batch_rng, codes_to_rows
+from p25_hackathon.livingbeings import Animal, GrassCell, Sheep, Wolf
+
+_KINDS: dict[int, type[Animal]] = {SHEEP: Sheep, WOLF: Wolf}
+
+
+def species_code(animal: Animal) -> int:
+    """code d'espèce d'un animal"""
+    if isinstance(animal, Sheep):
+        return SHEEP
+    if isinstance(animal, Wolf):
+        return WOLF
+    raise ValueError(f"espèce inconnue : {type(animal).__name__}")
+
+
+class _AnimalView:
+    """
+    Animal lu et écrit directement dans les tableaux de la grille.
+    La vue suit l'animal quand il se déplace ; une fois l'animal retiré,
+    elle garde ses dernières valeurs.
+    """
+
+    def __init__(self, grid: "ArrayGrid", i: int) -> None:
+        self._grid: Optional[ArrayGrid] = grid
+        self._i = i
+        self._last_energy = 0
+        self._last_age = 0
+
+    @property
+    def energy(self) -> int:
+        if self._grid is None:
+            return self._last_energy
+        return int(self._grid._energy[self._i])
+
+    @energy.setter
+    def energy(self, value: int) -> None:
+        if self._grid is None:
+            self._last_energy = value
+        else:
+            self._grid._energy[self._i] = value
+
+    @property
+    def age(self) -> int:
+        if self._grid is None:
+            return self._last_age
+        return int(self._grid._age[self._i])
+
+    @age.setter
+    def age(self, value: int) -> None:
+        if self._grid is None:
+            self._last_age = value
+        else:
+            self._grid._age[self._i] = value
+
+    def _detach(self) -> None:
+        self._last_energy = self.energy
+        self._last_age = self.age
+        self._grid = None
+
+
+class SheepView(_AnimalView, Sheep):
+    """Mouton stocké dans une ArrayGrid."""
+
+
+class WolfView(_AnimalView, Wolf):
+    """Loup stocké dans une ArrayGrid."""
+
+
+_VIEWS: dict[int, type[_AnimalView]] = {SHEEP: SheepView, WOLF: WolfView}
+
+
+class _GrassView(GrassCell):
+    """Herbe d'une cellule d'ArrayGrid (mêmes méthodes que GrassCell)."""
+
+    def __init__(self, grid: "ArrayGrid", i: int) -> None:
+        self._grid = grid
+        self._i = i
+
+    @property
+    def present(self) -> bool:
+        return bool(self._grid._grass[self._i])
+
+    @present.setter
+    def present(self, value: bool) -> None:
+        self._grid._set_grass(self._i, value)
+
+    @property
+    def regrow_timer(self) -> int:
+        return int(self._grid._timer[self._i])
+
+    @regrow_timer.setter
+    def regrow_timer(self, value: int) -> None:
+        self._grid._timer[self._i] = value
+
+
+class _CellView(Cell):
+    """Cellule d'ArrayGrid : même interface que Cell, sans objet stocké."""
+
+    def __init__(self, grid: "ArrayGrid", i: int) -> None:
+        self._grid = grid
+        self._i = i
+
+    @property
+    def grass(self) -> GrassCell:
+        return _GrassView(self._grid, self._i)
+
+    @property
+    def animal(self) -> Optional[Animal]:
+        return self._grid._animal_view(self._i)
+
+    @animal.setter
+    def animal(self, animal: Optional[Animal]) -> None:
+        if animal is None:
+            self._grid._clear(self._i)
+        else:
+            self._grid._put(self._i, animal)
+
+
+class ArrayGrid(Grid):
+    """
+    Grille stockée dans des tableaux numpy plats (indice i = y * n + x) :
+    herbe (1 octet), timer de repousse (2 octets), espèce (1 octet),
+    énergie (4 octets) et âge (4 octets), soit 12 octets par cellule.
+
+    Même API publique que Grid : `cell` renvoie des vues qui lisent et
+    écrivent directement dans les tableaux (effectifs compris).
+    """
+
+    def _init_storage(self) -> None:
+        if self._grass_regrow_time > np.iinfo(np.uint16).max:
+            raise ValueError("la repousse doit tenir sur 16 bits")
+
+        n2 = self._size * self._size
+        self._grass = np.zeros(n2, dtype=np.bool_)
+        self._timer = np.zeros(n2, dtype=np.uint16)
+        self._species = np.zeros(n2, dtype=np.uint8)
+        self._energy = np.zeros(n2, dtype=np.int32)
+        self._age = np.zeros(n2, dtype=np.int32)
+
+        # vues animales encore référencées, pour qu'elles suivent les déplacements
+        self._views: weakref.WeakValueDictionary[int, _AnimalView] = weakref.WeakValueDictionary()
+
+    @property
+    def nbytes(self) -> int:
+        """mémoire occupée par les tableaux, index des cases libres compris"""
+        arrays = (self._grass, self._timer, self._species, self._energy, self._age)
+        return sum(a.nbytes for a in arrays) + self._free.nbytes
+
+    def _index(self, x: int, y: int) -> int:
+        return y * self._size + x
+
+    def _animal_view(self, i: int) -> Optional[Animal]:
+        code = int(self._species[i])
+        if code == EMPTY:
+            return None
+        view = self._views.get(i)
+        if view is None:
+            view = _VIEWS[code](self, i)
+            self._views[i] = view
+        return view
+
+    def _put(self, i: int, animal: Animal) -> None:
+        """copie l'état d'un animal dans les tableaux"""
+        if self._species[i] != EMPTY:
+            self._clear(i)
+        self._species[i] = species_code(animal)
+        self._energy[i] = animal.energy
+        self._age[i] = animal.age
+        self._track(self._kind_of(animal), i)
+
+    def _clear(self, i: int) -> None:
+        code = int(self._species[i])
+        if code == EMPTY:
+            return
+        self._untrack(_KINDS[code], i)
+        view = self._views.pop(i, None)
+        if view is not None:
+            view._detach()
+        self._species[i] = EMPTY
+        self._energy[i] = 0
+        self._age[i] = 0
+
+    def _set_grass(self, i: int, present: bool) -> None:
+        if bool(self._grass[i]) != present:
+            self._grass[i] = present
+            self._n_grass += 1 if present else -1
+
+    def cell(self, x: int, y: int) -> Cell:
+        """renvoie une vue sur la cellule"""
+        return _CellView(self, self._index(x, y))
+
+    def place_grass_random(self, coverage: float, rng: random.Random) -> None:
+        draws = batch_rng(rng).random(self._grass.size, dtype=np.float32)
+        grown = ~self._grass & (draws < coverage)
+        self._grass |= grown
+        self._n_grass += int(np.count_nonzero(grown))
+
+    def tick_grass(self, grass_growth_probability: float, rng: random.Random,
+                   draws: Optional[CellDraws] = None) -> None:
+        """Met à jour l'herbe : décrémente les timers de repousse et fait pousser aléatoirement sur les cellules libres
+
+        Avec `draws`, seules les cases prêtes et sans herbe sont tirées.
+        """
+        if not (0.0 <= grass_growth_probability <= 1.0):
+            raise ValueError("La proba doit être dans [0, 1] !")
+
+        # Repousse : tous les timers en cours sont décrémentés d'un coup
+        regrowing = self._timer > 0
+        np.subtract(self._timer, 1, out=self._timer, where=regrowing)
+        ready = self._timer == 0
+        grown = regrowing & ready
+
+        # Pousse spontanée : un seul tableau de tirages pour tout le tour
+        if grass_growth_probability > 0.0:
+            if draws is None:
+                grown |= ready & (batch_rng(rng).random(self._grass.size, dtype=np.float32)
+                                  < grass_growth_probability)
+            else:
+                cells = np.flatnonzero(ready & ~self._grass)
+                grown[cells[draws(cells) < grass_growth_probability]] = True
+
+        grown &= ~self._grass
+        self._grass |= grown
+        self._n_grass += int(np.count_nonzero(grown))
+
+    def move_animal(self, dep: tuple[int, int], arr: tuple[int, int]) -> bool:
+        """déplace un animal si la destination est libre"""
+        fx, fy = dep
+        tx, ty = arr
+        if not (self.in_bounds(fx, fy) and self.in_bounds(tx, ty)):
+            return False
+
+        i = self._index(fx, fy)
+        j = self._index(tx, ty)
+        if self._species[i] == EMPTY or self._species[j] != EMPTY:
+            return False
+
+        kind = _KINDS[int(self._species[i])]
+        self._untrack(kind, i)
+        self._track(kind, j)
+        self._species[j] = self._species[i]
+        self._energy[j] = self._energy[i]
+        self._age[j] = self._age[i]
+        self._species[i] = EMPTY
+        self._energy[i] = 0
+        self._age[i] = 0
+
+        view = self._views.pop(i, None)
+        if view is not None:
+            view._i = j
+            self._views[j] = view
+        return True
+
+    def remove_animal(self, x: int, y: int) -> None:
+        """enlève un animal mort"""
+        self._clear(self._index(x, y))
+
+    def _place(self, animal: Animal, x: int, y: int) -> None:
+        self._put(self._index(x, y), animal)
+
+    def try_reproduce(self, parent: tuple[int, int], baby: Animal, rng: random.Random) -> bool:
+        """assure la reproduction des espèces"""
+        x, y = parent
+        options = [(i, j) for (i, j) in self.neighbors4(x, y) if self._species[self._index(i, j)] == EMPTY]
+        if not options:
+            return False
+
+        bx, by = rng.choice(options)
+        self._put(self._index(bx, by), baby)
+        return True
+
+    def eat_grass_if_present(self, x: int, y: int) -> bool:
+        i = self._index(x, y)
+        if self._grass[i]:
+            self._set_grass(i, False)
+            self._timer[i] = self._grass_regrow_time
+            return True
+        return False
+
+    def world(self) -> dict[str, np.ndarray]:
+        """
+        vues (n, n) sur les tableaux (mêmes noms que export_state), pour les
+        phases groupées : énergie et âge peuvent y être modifiés directement,
+        espèce et herbe seulement par move_animals / eat_grass_at (index)
+        """
+        shape = (self._size, self._size)
+        return {
+            "grass": self._grass.reshape(shape),
+            "timer": self._timer.reshape(shape),
+            "species": self._species.reshape(shape),
+            "energy": self._energy.reshape(shape),
+            "age": self._age.reshape(shape),
+        }
+
+    def move_animals(self, src: np.ndarray, dst: np.ndarray) -> None:
+        """
+        Déplace en bloc l'animal de chaque case src[k] vers dst[k]. Les
+        destinations sont distinctes et ne sont pas des cases de départ ;
+        un animal présent sur une destination est retiré (mouton mangé).
+        """
+        if src.size == 0:
+            return
+        codes = self._species[src]
+        victims = dst[self._species[dst] != EMPTY]
+        victim_codes = self._species[victims]
+        for code, kind in _KINDS.items():
+            occupied = self._occupied[kind]
+            occupied.difference_update(victims[victim_codes == code].tolist())
+            mine = codes == code
+            if mine.any():
+                occupied.difference_update(src[mine].tolist())
+                occupied.update(dst[mine].tolist())
+        self._free.update(removed=dst, added=src)
+
+        if self._views:
+            for i in victims.tolist():
+                view = self._views.pop(i, None)
+                if view is not None:
+                    view._detach()
+
+        for arr in (self._species, self._energy, self._age):
+            arr[dst] = arr[src]
+            arr[src] = 0
+
+        if self._views:
+            moving = [(self._views.pop(i, None), j) for i, j in zip(src.tolist(), dst.tolist())]
+            for view, j in moving:
+                if view is not None:
+                    view._i = j
+                    self._views[j] = view
+
+    def remove_animals(self, cells: np.ndarray) -> None:
+        """enlève en bloc les animaux des cases données (morts)"""
+        if cells.size == 0:
+            return
+        codes = self._species[cells]
+        for code, kind in _KINDS.items():
+            self._occupied[kind].difference_update(cells[codes == code].tolist())
+        self._free.update(removed=cells[:0], added=cells)
+        if self._views:
+            for i in cells.tolist():
+                view = self._views.pop(i, None)
+                if view is not None:
+                    view._detach()
+        for arr in (self._species, self._energy, self._age):
+            arr[cells] = 0
+
+    def eat_grass_at(self, cells: np.ndarray) -> np.ndarray:
+        """mange l'herbe des cases données ; renvoie les cases où il y en avait"""
+        ate = self._grass[cells]
+        eaten = cells[ate]
+        self._grass[eaten] = False
+        self._timer[eaten] = self._grass_regrow_time
+        self._n_grass -= len(eaten)
+        return ate
+
+    def _symbol_codes(self) -> np.ndarray:
+        # 0 = vide, 1 = herbe, 2 = mouton, 3 = loup
+        return np.where(self._species != EMPTY, self._species + 1, self._grass.astype(np.uint8))
+
+    def export_state(self) -> dict[str, np.ndarray]:
+        return {
+            "grass": self._grass.copy(),
+            "timer": self._timer.copy(),
+            "species": self._species.copy(),
+            "energy": self._energy.copy(),
+            "age": self._age.copy(),
+            "free": self._free.cells(),
+        }
+
+    def import_state(self, state: dict[str, np.ndarray]) -> None:
+        """reprend les tableaux tels quels (sans copie s'ils ont déjà le bon type)"""
+        n2 = self._size * self._size
+        if state["species"].shape != (n2,):
+            raise ValueError(f"état de taille {state['species'].shape} pour une grille {self._size}x{self._size}")
+
+        self._reset_indexes()
+        self._views = weakref.WeakValueDictionary()
+        self._grass = np.asarray(state["grass"], dtype=np.bool_)
+        self._timer = np.asarray(state["timer"], dtype=np.uint16)
+        self._species = np.asarray(state["species"], dtype=np.uint8)
+        self._energy = np.asarray(state["energy"], dtype=np.int32)
+        self._age = np.asarray(state["age"], dtype=np.int32)
+
+        for code, kind in _KINDS.items():
+            self._occupied[kind] = set(np.flatnonzero(self._species == code).tolist())
+        self._n_grass = int(np.count_nonzero(self._grass))
+        self._free.restore(state["free"])
+
+    def cell_codes(self) -> np.ndarray:
+        return self._grass.astype(np.uint8) | (self._species << 1)
+
+    def cell_energies(self) -> np.ndarray:
+        return self._energy.copy()
+
+    def symbol_rows(self) -> list[str]:
+        return codes_to_rows(self.cell_codes(), self._size)
+
+    def render_ascii(self, use_color: bool) -> str:
+        glyphs = np.array([self._colorize(ch, use_color) for ch in ".#SW"], dtype=object)
+        rows = glyphs[self._symbol_codes()].reshape(self._size, self._size)
+        return "\n".join("".join(row) for row in rows.tolist())
+
+    def _count_scan(self) -> tuple[int, int, int]:
+        sheep = int(np.count_nonzero(self._species == SHEEP))
+        wolf = int(np.count_nonzero(self._species == WOLF))
+        grass = int(np.count_nonzero(self._grass))
+        return sheep, wolf, grass
+
+
+def main() -> None:
+    print("Testing ArrayGrid...")
+    g = ArrayGrid(size=10, grass_regrow_time=5)
+    g.place_grass_random(0.5, random.Random(42))
+    g.spawn_animal_random(Sheep(energy=20), random.Random(1))
+    print(g.render_ascii(use_color=True))
+    print(f"{g.nbytes} octets pour {g.size * g.size} cellules")
+    print("ArrayGrid test complete.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+# Exécution en lot, sans affichage, de nombreuses simulations (configurations × graines) en parallèle
+
+import argparse
+import csv
+import itertools
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+from p25_hackathon.cache import CachedRun, ResultCache
+from p25_hackathon.simulation import SimConfig, Simulation
+
+SERIES_COLUMNS = ["run", "config", "seed", "turn", "sheep", "wolves", "grass"]
+OUTCOME_COLUMNS = [
+    "run", "config", "seed", "turns", "sheep", "wolves", "grass",
+    "sheep_extinction_turn", "wolf_extinction_turn", "coexistence", "stop_reason",
+]
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    """Une simulation à exécuter : configuration et graine."""
+    run: int
+    config_id: int
+    config: SimConfig
+    seed: int
+
+
+@dataclass
+class RunResult:
+    """Série temporelle des populations et bilan final d'une simulation."""
+    job: BatchJob
+    series: list[tuple[int, int, int, int]]
+    sheep_extinction_turn: Optional[int]
+    wolf_extinction_turn: Optional[int]
+    stop_reason: Optional[str] = None
+
+    @property
+    def coexistence(self) -> bool:
+        _turn, sheep, wolves, _grass = self.series[-1]
+        return sheep > 0 and wolves > 0
+
+
+def expand_grid(base: SimConfig, params: dict[str, list[Any]]) -> list[SimConfig]:
+    """Toutes les combinaisons des valeurs de paramètres, à partir d'une configuration de base."""
+    names = list(params)
+    return [replace(base, **dict(zip(names, values))) for values in itertools.product(*params.values())]
+
+
+def make_jobs(configs: list[SimConfig], seeds: Iterable[int]) -> list[BatchJob]:
+    """Produit cartésien configurations × graines, numéroté."""
+    pairs = itertools.product(enumerate(configs), seeds)
+    return [BatchJob(run, config_id, cfg, seed) for run, ((config_id, cfg), seed) in enumerate(pairs)]
+
+
+def run_job(job: BatchJob) -> RunResult:
+    """Exécute une simulation complète sans affichage ni pause."""
+    sim = Simulation(job.config, seed=job.seed)
+    sim.initialize()
+
+    series: list[tuple[int, int, int, int]] = []
+    sheep_extinction: Optional[int] = None
+    wolf_extinction: Optional[int] = None
+    while True:
+        s, w, g = sim.grid.count()
+        series.append((sim.turn, s, w, g))
+        if s == 0 and sheep_extinction is None:
+            sheep_extinction = sim.turn
+        if w == 0 and wolf_extinction is None:
+            wolf_extinction = sim.turn
+        if sim.should_stop():
+            break
+        sim.step()
+
+    return RunResult(job, series, sheep_extinction, wolf_extinction, sim.stop_reason)
+
+
+def _to_cached(result: RunResult) -> CachedRun:
+    return CachedRun.from_series(np.array(result.series), result.stop_reason)
+
+
+def _from_cached(job: BatchJob, run: CachedRun) -> RunResult:
+    series = [(turn, s, w, g) for turn, s, w, g in run.series.tolist()]
+    return RunResult(job, series, run.outcome["sheep_extinction_turn"], run.outcome["wolf_extinction_turn"],
+                     run.outcome["stop_reason"])
+
+
+class _CsvSink:
+    """Écrit les séries et les bilans dans deux fichiers CSV, au fil des résultats."""
+
+    def __init__(self, series_path: str, outcomes_path: str, config_columns: list[str]) -> None:
+        self._series_file = open(series_path, "w", newline="")
+        self._outcomes_file = open(outcomes_path, "w", newline="")
+        self._series = csv.writer(self._series_file)
+        self._outcomes = csv.writer(self._outcomes_file)
+        self._series.writerow(SERIES_COLUMNS)
+        self._outcomes.writerow(OUTCOME_COLUMNS + config_columns)
+
+    def write(self, series_rows: list[list[Any]], outcome_row: list[Any]) -> None:
+        self._series.writerows(series_rows)
+        self._outcomes.writerow(outcome_row)
+
+    def close(self) -> None:
+        self._series_file.close()
+        self._outcomes_file.close()
+
+
+class _ParquetSink:
+    """Même chose au format Parquet (nécessite pyarrow), un groupe de lignes par simulation."""
+
+    def __init__(self, series_path: str, outcomes_path: str, config_columns: list[str]) -> None:
+        # Import local : pyarrow n'est nécessaire que pour ce format
+        import pyarrow as pa  # noqa: PLC0415
+        import pyarrow.parquet as pq  # noqa: PLC0415
+
+        self._pa = pa
+        self._pq = pq
+        self._series_path = series_path
+        self._outcomes_path = outcomes_path
+        self._outcome_columns = OUTCOME_COLUMNS + config_columns
+        self._series_writer: Optional[Any] = None
+        self._outcome_rows: list[list[Any]] = []
+
+    def write(self, series_rows: list[list[Any]], outcome_row: list[Any]) -> None:
+        table = self._pa.table({name: list(col) for name, col in zip(SERIES_COLUMNS, zip(*series_rows))})
+        if self._series_writer is None:
+            self._series_writer = self._pq.ParquetWriter(self._series_path, table.schema)
+        self._series_writer.write_table(table)
+        self._outcome_rows.append(outcome_row)
+
+    def close(self) -> None:
+        if self._series_writer is not None:
+            self._series_writer.close()
+        columns = {name: list(col) for name, col in zip(self._outcome_columns, zip(*self._outcome_rows))}
+        self._pq.write_table(self._pa.table(columns), self._outcomes_path)
+
+
+def run_batch(jobs: list[BatchJob], series_path: str, outcomes_path: str, workers: Optional[int] = None,
+              cache: Optional[ResultCache] = None) -> int:
+    """
+    Exécute les simulations sur un pool de processus et écrit les résultats au
+    fur et à mesure (CSV, ou Parquet si les fichiers finissent par .parquet).
+    Avec un cache, les simulations déjà faites n'y sont pas relancées, et les
+    nouvelles y sont ajoutées. Renvoie le nombre de simulations terminées.
+    """
+    cached = {job.run: cache.get(job.config, job.seed) for job in jobs} if cache is not None else {}
+    pending = [job for job in jobs if cached.get(job.run) is None]
+
+    config_columns = [f.name for f in fields(SimConfig)]
+    sink_cls = _ParquetSink if series_path.endswith(".parquet") else _CsvSink
+    sink = sink_cls(series_path, outcomes_path, config_columns)
+
+    done = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            # map conserve l'ordre des simulations : fichiers identiques d'une exécution à l'autre
+            computed = pool.map(run_job, pending, chunksize=1)
+            for job in jobs:
+                hit = cached.get(job.run)
+                if hit is not None:
+                    result = _from_cached(job, hit)
+                else:
+                    result = next(computed)
+                    if cache is not None:
+                        cache.put(job.config, job.seed, _to_cached(result))
+                series_rows = [[job.run, job.config_id, job.seed, *row] for row in result.series]
+                outcome_row = [
+                    job.run, job.config_id, job.seed, *result.series[-1],
+                    result.sheep_extinction_turn, result.wolf_extinction_turn, result.coexistence,
+                    result.stop_reason,
+                    *asdict(job.config).values(),
+                ]
+                sink.write(series_rows, outcome_row)
+                done += 1
+                print(f"\r{done}/{len(jobs)} simulations", end="", file=sys.stderr, flush=True)
+    finally:
+        sink.close()
+        print(file=sys.stderr)
+    return done
+
+
+def parse_param(text: str) -> tuple[str, list[Any]]:
+    """Lit 'nom=v1,v2,...' en convertissant les valeurs au type du champ de SimConfig."""
+    name, _, values = text.partition("=")
+    types = {f.name: f.type for f in fields(SimConfig)}
+    if name not in types or not values:
+        raise argparse.ArgumentTypeError(f"paramètre invalide : {text!r} (attendu : champ=v1,v2,...)")
+
+    kind = types[name]
+    if kind is bool:
+        return name, [v.lower() in ("1", "true", "yes", "oui") for v in values.split(",")]
+    return name, [kind(v) for v in values.split(",")]
+
+
+# Intervalle de graines 'a-b', bornes comprises et éventuellement négatives
+_SEED_RANGE = re.compile(r"^(-?\d+)-(-?\d+)$")
+
+
+def parse_seeds(text: str) -> list[int]:
+    """Lit une liste de graines : '0-99', '1,5,7', ou un mélange ('-5--1,3') ; négatives permises."""
+    seeds: list[int] = []
+    for item in text.split(","):
+        span = _SEED_RANGE.match(item.strip())
+        try:
+            if span is not None:
+                seeds.extend(range(int(span[1]), int(span[2]) + 1))
+            else:
+                seeds.append(int(item))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"graines invalides : {text!r} (attendu : a-b ou a,b,c)") from None
+    return seeds
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ecosystem-batch",
+        description="Exécute en parallèle et sans affichage une grille de configurations × graines.",
+    )
+    parser.add_argument("--param", type=parse_param, action="append", default=[],
+                        help="Valeurs d'un champ de SimConfig, ex: --param grid_size=30,60 (répétable)")
+    parser.add_argument("--seeds", type=parse_seeds, default=list(range(10)),
+                        help="Graines : '0-99' ou '1,5,7' (défaut: 0-9)")
+    parser.add_argument("--out", default="series.csv",
+                        help="Fichier des séries par tour, .csv ou .parquet (défaut: series.csv)")
+    parser.add_argument("--outcomes", default=None,
+                        help="Fichier des bilans par simulation (défaut: outcomes.csv/.parquet)")
+    parser.add_argument("--stop-on-convergence", action="store_true",
+                        help="Arrêter chaque simulation dès que sa dynamique est établie (raison dans les bilans)")
+    parser.add_argument("--cache", default=None,
+                        help="Répertoire du cache de résultats : les simulations déjà faites ne sont pas relancées")
+    parser.add_argument("--cache-size", type=int, default=256,
+                        help="Taille maximale du cache en Mo, les résultats les moins utilisés partent d'abord (défaut: 256)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Nombre de processus (défaut: nombre de cœurs)")
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    base = SimConfig(stop_on_convergence=args.stop_on_convergence)
+    configs = expand_grid(base, dict(args.param))
+    jobs = make_jobs(configs, args.seeds)
+
+    outcomes = args.outcomes
+    if outcomes is None:
+        outcomes = "outcomes.parquet" if args.out.endswith(".parquet") else "outcomes.csv"
+
+    print(f"{len(configs)} configuration(s) × {len(args.seeds)} graine(s) = {len(jobs)} simulations")
+    cache = ResultCache(args.cache, args.cache_size * 1024 * 1024) if args.cache else None
+    run_batch(jobs, args.out, outcomes, workers=args.workers, cache=cache)
+    if cache is not None:
+        print(cache.summary())
+    print(f"Séries écrites dans '{args.out}', bilans dans '{outcomes}'.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+# Phases d'un tour traitées en bloc sur une ArrayGrid, au lieu d'un animal à la fois
+
+import argparse
+import math
+import sys
+import time
+from dataclasses import dataclass, replace
+from typing import Optional
+
+import numpy as np
+
+from p25_hackathon.arraygrid import ArrayGrid
+from p25_hackathon.grid import EMPTY, SHEEP, WOLF
+from p25_hackathon.instrumentation import TurnStats
+from p25_hackathon.kernels import MOVE_ROUNDS, NEIGHBORS, NO_DIR, SyncParams, Window, choose
+
+
+# Vagues de passage : chaque animal reçoit une vague au hasard et agit après
+# les vagues précédentes, ce qui imite l'ordre aléatoire de Simulation.step
+# (un animal voit les cases libérées par ceux qui sont passés avant lui)
+WAVES = 8
+
+# Tours de résolution : une vague par tour, puis MOVE_ROUNDS - 1 tours pour
+# les perdants de la dernière vague
+ROUNDS = WAVES + MOVE_ROUNDS - 1
+
+
+@dataclass(frozen=True)
+class GeneratorWindow(Window):
+    """
+    Source de tirages pour les phases groupées qui puise dans un générateur
+    numpy (mode "shared" de la simulation) au lieu du hachage par case.
+    """
+    gen: np.random.Generator
+
+    def uniform(self, stream: int, shape: tuple[int, ...]) -> np.ndarray:
+        return self.gen.random(shape)
+
+    def at(self, stream: int, cells: np.ndarray) -> np.ndarray:
+        return self.gen.random(len(cells))
+
+
+def _neighbors(cells: np.ndarray, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    voisins (4, k) des cases données, dans l'ordre de NEIGHBORS, et masque
+    des voisins dans la grille (hors grille : la case elle-même, masquée)
+    """
+    x, y = cells % n, cells // n
+    inside = np.stack([x > 0, x < n - 1, y > 0, y < n - 1])
+    offsets = np.array([dx + dy * n for dx, dy in NEIGHBORS], dtype=np.int64)
+    nbr = np.where(inside, cells[None, :] + offsets[:, None], cells[None, :])
+    return nbr, inside
+
+
+def _move_round(grid: ArrayGrid, cells: np.ndarray, options: np.ndarray, nbr: np.ndarray,
+                draws: Window, stream: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Un tour de résolution : l'animal de chaque case `cells` vise un voisin
+    parmi ses `options` (4, k) ; quand plusieurs visent la même case, la plus
+    forte priorité l'emporte. Renvoie, pour chaque animal, s'il a bougé, et
+    les cases d'arrivée de ceux qui ont bougé.
+    """
+    direction = choose(options, draws.at(stream, cells))
+    contenders = np.flatnonzero(direction != NO_DIR)
+    target = nbr[direction[contenders], contenders]
+    # par case visée, le prétendant de plus forte priorité
+    priority = draws.at(stream + 1, cells)[contenders]
+    order = np.lexsort((-priority, target))
+    first = np.ones(len(order), dtype=np.bool_)
+    first[1:] = target[order[1:]] != target[order[:-1]]
+    winners, dst = contenders[order[first]], target[order[first]]
+    grid.move_animals(cells[winners], dst)
+
+    moved = np.zeros(len(cells), dtype=np.bool_)
+    moved[winners] = True
+    return moved, dst
+
+
+def _waves(draws: Window, stream: int, cells: np.ndarray) -> np.ndarray:
+    return (draws.at(stream, cells) * WAVES).astype(np.int64)
+
+
+def sheep_phase(grid: ArrayGrid, params: SyncParams, draws: Window, stream: int,
+                stats: Optional[TurnStats] = None) -> None:
+    """
+    Phase moutons de Simulation.step, traitée en bloc par vagues (WAVES).
+
+    Chaque mouton vise une case libre voisine avec de l'herbe s'il y en a,
+    sinon une case libre voisine. Quand plusieurs moutons visent la même
+    case, la plus forte priorité (tirée au hasard) l'emporte ; les perdants
+    réessaient au tour suivant avec les cases restantes, comme un mouton qui
+    passe après. Ensuite tous les moutons mangent l'herbe de leur case et
+    perdent de l'énergie. Tirages : flux stream .. stream + 2 * ROUNDS.
+    """
+    world = grid.world()
+    n = grid.size
+    species, grass = world["species"].reshape(-1), world["grass"].reshape(-1)
+    waiting = np.flatnonzero(species == SHEEP)
+    wave = _waves(draws, stream, waiting)
+    moved = 0
+    for r in range(ROUNDS):
+        now = wave <= r
+        cells = waiting[now]
+        if len(cells) == 0:
+            continue
+        nbr, inside = _neighbors(cells, n)
+        options = inside & (species[nbr] == EMPTY)
+        grassy = options & grass[nbr]
+        options = np.where(grassy.any(axis=0), grassy, options)
+        won, _dst = _move_round(grid, cells, options, nbr, draws, stream + 1 + 2 * r)
+        moved += len(_dst)
+        # restent en attente : les perdants d'un conflit et ceux dont la vague n'est pas venue
+        keep = ~now
+        keep[now] = options.any(axis=0) & ~won
+        waiting, wave = waiting[keep], wave[keep]
+
+    sheep = np.flatnonzero(species == SHEEP)
+    ate = grid.eat_grass_at(sheep)
+    energy = world["energy"].reshape(-1)
+    energy[sheep] += ate * params.sheep_energy_from_grass - params.sheep_energy_loss_per_turn
+
+    if stats is not None:
+        stats.moves_attempted += len(sheep)
+        stats.moves_failed += len(sheep) - moved
+        stats.grass_eaten += int(np.count_nonzero(ate))
+
+
+def wolf_phase(grid: ArrayGrid, params: SyncParams, draws: Window, stream: int,
+               stats: Optional[TurnStats] = None) -> None:
+    """
+    Phase loups de Simulation.step, traitée en bloc par vagues (WAVES).
+
+    Chasse : chaque loup qui a un mouton voisin le vise ; un mouton visé
+    par plusieurs loups revient à la plus forte priorité, qui le mange et
+    prend sa case, et les bredouilles rechassent au tour suivant avec les
+    moutons restants. Les loups sans mouton voisin se déplacent vers une
+    case libre, résolus de la même façon. Enfin tous les loups perdent de
+    l'énergie. Tirages : flux stream .. stream + 4 * ROUNDS.
+    """
+    world = grid.world()
+    n = grid.size
+    species = world["species"].reshape(-1)
+    energy = world["energy"].reshape(-1)
+    waiting = np.flatnonzero(species == WOLF)
+    wave = _waves(draws, stream, waiting)
+    kills = walks = 0
+    for r in range(ROUNDS):
+        now = wave <= r
+        cells = waiting[now]
+        if len(cells) == 0:
+            continue
+        nbr, inside = _neighbors(cells, n)
+        prey = inside & (species[nbr] == SHEEP)
+        hunting = prey.any(axis=0)
+        ate, dst = _move_round(grid, cells[hunting], prey[:, hunting], nbr[:, hunting],
+                               draws, stream + 1 + 4 * r)
+        energy[dst] += params.wolf_energy_from_sheep
+        kills += len(dst)
+
+        # les autres marchent, une fois les moutons mangés retirés
+        walking = ~hunting
+        free = inside[:, walking] & (species[nbr[:, walking]] == EMPTY)
+        walked, dst = _move_round(grid, cells[walking], free, nbr[:, walking], draws, stream + 3 + 4 * r)
+        walks += len(dst)
+
+        # restent en attente : les perdants d'un conflit et ceux dont la vague n'est pas venue
+        retry = np.zeros(len(cells), dtype=np.bool_)
+        retry[hunting] = ~ate
+        retry[walking] = free.any(axis=0) & ~walked
+        keep = ~now
+        keep[now] = retry
+        waiting, wave = waiting[keep], wave[keep]
+
+    wolves = np.flatnonzero(species == WOLF)
+    energy[wolves] -= params.wolf_energy_loss_per_turn
+
+    if stats is not None:
+        stats.moves_attempted += len(wolves)
+        stats.sheep_eaten += kills
+        stats.moves_failed += len(wolves) - kills - walks
+
+
+def _welch(a: list[float], b: list[float]) -> float:
+    """écart des moyennes de deux échantillons en nombre d'écarts-types (test de Welch)"""
+    ma, mb = sum(a) / len(a), sum(b) / len(b)
+    va = sum((x - ma) ** 2 for x in a) / max(len(a) - 1, 1)
+    vb = sum((x - mb) ** 2 for x in b) / max(len(b) - 1, 1)
+    se = math.sqrt(va / len(a) + vb / len(b))
+    return 0.0 if se == 0 else abs(ma - mb) / se
+
+
+def main() -> int:
+    # import local : simulation utilise ce module
+    from p25_hackathon.simulation import SimConfig, Simulation
+
+    parser = argparse.ArgumentParser(
+        prog="ecosystem-batched",
+        description="Compare les phases groupées à la version un animal à la fois : statistiques et vitesse.",
+    )
+    parser.add_argument("--size", type=int, default=40, help="Taille de la grille des essais statistiques (défaut: 40)")
+    parser.add_argument("--seeds", type=int, default=20, help="Nombre de graines par version (défaut: 20)")
+    parser.add_argument("--turns", type=int, default=20, help="Tours par simulation (défaut: 20)")
+    parser.add_argument("--bench-size", type=int, default=300, help="Taille de la grille du chronométrage (défaut: 300)")
+    parser.add_argument("--density", type=float, default=0.5,
+                        help="Densité de moutons du chronométrage, loups 4 fois moins (défaut: 0.5)")
+    parser.add_argument("--max-sigma", type=float, default=4.0,
+                        help="Écart toléré entre les moyennes, en écarts-types (défaut: 4)")
+    args = parser.parse_args()
+
+    # 1) Équivalence statistique : effectifs moyens sur de nombreuses graines,
+    # au quart, à la moitié et à la fin de la simulation
+    area = args.size * args.size
+    cfg = SimConfig(grid_size=args.size, initial_sheep=area // 4, initial_wolves=area // 50,
+                    max_turns=args.turns, grid_backend="arrays")
+    checkpoints = sorted({max(1, args.turns // 4), max(1, args.turns // 2), args.turns})
+    samples: dict[bool, dict[str, list[float]]] = {}
+    for batched in (False, True):
+        runs: dict[str, list[float]] = {}
+        for seed in range(args.seeds):
+            sim = Simulation(replace(cfg, batched_phases=batched), seed=seed)
+            sim.initialize()
+            for turn in range(1, args.turns + 1):
+                sim.step()
+                if turn in checkpoints:
+                    for name, value in zip(("moutons", "loups", "herbe"), sim.grid.count()):
+                        runs.setdefault(f"{name} (tour {turn})", []).append(value)
+        samples[batched] = runs
+
+    ok = True
+    print(f"Effectifs moyens sur {args.seeds} graines :")
+    for name in samples[False]:
+        a, b = samples[False][name], samples[True][name]
+        sigma = _welch(a, b)
+        ok &= sigma <= args.max_sigma
+        print(f"  {name:18s} un à un {sum(a) / len(a):9.1f}   groupé {sum(b) / len(b):9.1f}   écart {sigma:4.1f} σ")
+
+    # 2) Vitesse des phases moutons et loups sur des populations denses
+    n = args.bench_size
+    area = n * n
+    bench = SimConfig(grid_size=n, initial_sheep=int(area * args.density), initial_wolves=int(area * args.density / 4),
+                      initial_grass_coverage=0.5, grid_backend="arrays")
+    sim = Simulation(bench, seed=0)
+    sim.initialize()
+    state = sim.grid.export_state()
+    print(f"{bench.initial_sheep} moutons et {bench.initial_wolves} loups sur {n}x{n} :")
+    for name in ("sheep", "wolves"):
+        timings = {}
+        for batched in (False, True):
+            sim = Simulation(replace(bench, batched_phases=batched), seed=0)
+            sim.grid.import_state({k: v.copy() for k, v in state.items()})
+            phase = dict(sim._phases())[name]
+            t0 = time.perf_counter()
+            phase()
+            timings[batched] = time.perf_counter() - t0
+        print(f"  phase {name:7s} un à un {timings[False] * 1e3:8.1f} ms, groupé {timings[True] * 1e3:6.1f} ms "
+              f"(x{timings[False] / timings[True]:.1f})")
+
+    print("Équivalence statistique : " + ("OK" if ok else "ÉCHEC"))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
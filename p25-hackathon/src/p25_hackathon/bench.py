@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# Banc d'essai : vitesse (tours/s), temps par phase et mémoire sur des scénarios fixes
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from p25_hackathon.instrumentation import StatsCollector
+from p25_hackathon.simulation import GRID_BACKENDS, SimConfig, Simulation
+
+BENCH_SEED = 12345
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Un scénario de référence : taille de grille et densités de population."""
+    name: str
+    grid_size: int
+    sheep_density: float
+    wolf_density: float
+    grass_coverage: float = 0.30
+
+    def config(self, backend: str) -> SimConfig:
+        area = self.grid_size * self.grid_size
+        return SimConfig(
+            grid_size=self.grid_size,
+            initial_sheep=int(area * self.sheep_density),
+            initial_wolves=int(area * self.wolf_density),
+            initial_grass_coverage=self.grass_coverage,
+            max_turns=sys.maxsize,
+            grid_backend=backend,
+        )
+
+
+SCENARIOS = (
+    Scenario("small-sparse", 30, 0.02, 0.005),
+    Scenario("small-dense", 30, 0.30, 0.03),
+    Scenario("medium-sparse", 100, 0.02, 0.005),
+    Scenario("medium-dense", 100, 0.30, 0.03),
+    Scenario("large-sparse", 300, 0.02, 0.005),
+    Scenario("large-dense", 300, 0.30, 0.03),
+    Scenario("grass-only", 300, 0.0, 0.0),
+)
+
+
+def run_scenario(scenario: Scenario, backend: str, turns: int, repeat: int) -> dict[str, Any]:
+    """Mesure un scénario ; garde la meilleure des `repeat` exécutions."""
+    best: Optional[dict[str, Any]] = None
+    for _ in range(repeat):
+        sim = Simulation(scenario.config(backend), seed=BENCH_SEED)
+        t0 = time.perf_counter()
+        sim.initialize()
+        init_s = time.perf_counter() - t0
+
+        collector = StatsCollector()
+        sim.set_observer(collector)
+        t0 = time.perf_counter()
+        for _ in range(turns):
+            sim.step()
+        elapsed = time.perf_counter() - t0
+
+        result = {
+            "turns_per_s": turns / elapsed,
+            "init_s": init_s,
+            "phases_s": {name: t / turns for name, t in collector.total.phase_s.items()},
+            "final_counts": list(sim.grid.count()),
+        }
+        if best is None or result["turns_per_s"] > best["turns_per_s"]:
+            best = result
+
+    assert best is not None
+    best["peak_mem_bytes"] = _peak_memory(scenario, backend, turns=min(turns, 5))
+    return best
+
+
+def _peak_memory(scenario: Scenario, backend: str, turns: int) -> int:
+    """Pic mémoire (tracemalloc) à part : le traçage fausserait les temps."""
+    tracemalloc.start()
+    try:
+        sim = Simulation(scenario.config(backend), seed=BENCH_SEED)
+        sim.initialize()
+        for _ in range(turns):
+            sim.step()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_suite(names: list[str], backends: list[str], turns: int, repeat: int) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for scenario in SCENARIOS:
+        if names and scenario.name not in names:
+            continue
+        for backend in backends:
+            key = f"{scenario.name}/{backend}"
+            r = run_scenario(scenario, backend, turns, repeat)
+            results[key] = r
+            print(f"{key:24s} {r['turns_per_s']:10.1f} tours/s  {r['peak_mem_bytes'] / 1e6:8.1f} Mo  "
+                  + " ".join(f"{name}={t * 1e3:.2f}ms" for name, t in r["phases_s"].items()))
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "turns": turns,
+            "repeat": repeat,
+            "seed": BENCH_SEED,
+        },
+        "scenarios": results,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """Liste des régressions (vitesse ou mémoire) au-delà du seuil relatif."""
+    regressions = []
+    for key, base in baseline["scenarios"].items():
+        cur = current["scenarios"].get(key)
+        if cur is None:
+            continue
+        if cur["turns_per_s"] < base["turns_per_s"] * (1 - threshold):
+            regressions.append(f"{key}: {cur['turns_per_s']:.1f} tours/s (référence {base['turns_per_s']:.1f})")
+        if cur["peak_mem_bytes"] > base["peak_mem_bytes"] * (1 + threshold):
+            regressions.append(f"{key}: {cur['peak_mem_bytes']} octets (référence {base['peak_mem_bytes']})")
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ecosystem-bench",
+        description="Mesure tours/s, temps par phase et pic mémoire sur des scénarios de référence.",
+    )
+    parser.add_argument("--scenario", action="append", default=[],
+                        choices=[s.name for s in SCENARIOS],
+                        help="Scénario à mesurer (répétable, défaut: tous)")
+    parser.add_argument("--backend", action="append", default=[], choices=GRID_BACKENDS,
+                        help="Backend de grille à mesurer (répétable, défaut: tous)")
+    parser.add_argument("--turns", type=int, default=20,
+                        help="Tours mesurés par exécution (défaut: 20)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Exécutions par scénario, on garde la meilleure (défaut: 3)")
+    parser.add_argument("--save", default=None,
+                        help="Enregistrer les résultats comme référence JSON")
+    parser.add_argument("--compare", default=None,
+                        help="Comparer à une référence JSON (code de sortie 1 si régression)")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Écart relatif toléré avant de signaler une régression (défaut: 0.15)")
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    current = run_suite(args.scenario, args.backend or list(GRID_BACKENDS), args.turns, args.repeat)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"Référence enregistrée dans '{args.save}'.")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        for line in regressions:
+            print(f"RÉGRESSION {line}")
+        if regressions:
+            return 1
+        print("Aucune régression.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Cache sur disque des résultats de simulation.
+
+Une simulation est déterministe pour une configuration et une graine
+données : son résultat (série des effectifs et bilan) est rangé sous un nom
+qui est le hachage de la configuration, de la graine et de ENGINE_VERSION.
+Les entrées sont des fichiers au format des sauvegardes (checkpoint.py).
+Quand la taille totale dépasse la limite, les entrées lues ou écrites le
+moins récemment (date de modification du fichier) sont supprimées.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+import numpy as np
+
+from p25_hackathon.checkpoint import read_checkpoint, write_checkpoint
+from p25_hackathon.simulation import ENGINE_VERSION, SimConfig
+
+# Champs sans effet sur les résultats (affichage, vérifications), exclus de la clé
+_IGNORED_FIELDS = ("delay_s", "use_color", "debug_counts")
+
+_SUFFIX = ".run"
+
+# Un dépassement de la limite vide le cache jusqu'à cette fraction de la
+# limite : le répertoire n'est pas reparcouru à chaque ajout suivant
+EVICT_TO = 0.9
+
+
+def cache_key(config: SimConfig, seed: int) -> str:
+    """hachage canonique de (configuration, graine, version du moteur)"""
+    fields = {k: v for k, v in asdict(config).items() if k not in _IGNORED_FIELDS}
+    text = json.dumps({"config": fields, "seed": seed, "engine": ENGINE_VERSION},
+                      sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+@dataclass
+class CachedRun:
+    """résultat d'une simulation : effectifs par tour et bilan"""
+    series: np.ndarray       # (tours + 1, 4) : tour, moutons, loups, herbe
+    outcome: dict[str, Any]  # valeurs JSON (tours d'extinction, raison d'arrêt)
+
+    @classmethod
+    def from_series(cls, series: np.ndarray, stop_reason: Optional[str]) -> "CachedRun":
+        """résultat complet à partir des effectifs par tour et de Simulation.stop_reason"""
+        series = np.asarray(series, dtype=np.int64).reshape(-1, 4)
+        outcome: dict[str, Any] = {"stop_reason": stop_reason}
+        for name, column in (("sheep_extinction_turn", 1), ("wolf_extinction_turn", 2)):
+            extinct = np.flatnonzero(series[:, column] == 0)
+            outcome[name] = int(series[extinct[0], 0]) if len(extinct) else None
+        return cls(series, outcome)
+
+
+class ResultCache:
+    """
+    Répertoire de résultats, limité à `max_bytes` octets. Les simulations
+    sans graine (seed=None) ne sont jamais mises en cache. `hits` et
+    `misses` comptent les lectures depuis la création de l'objet.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024) -> None:
+        if max_bytes <= 0:
+            raise ValueError("la taille du cache doit être positive")
+        os.makedirs(directory, exist_ok=True)
+        self._dir = directory
+        self._max_bytes = max_bytes
+        self._total = sum(size for _mtime, size, _path in self._entries())
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        return f"Cache '{self._dir}' : {self.hits}/{total} résultats trouvés ({self.hit_rate:.0%})"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._dir, key + _SUFFIX)
+
+    def get(self, config: SimConfig, seed: Optional[int]) -> Optional[CachedRun]:
+        """résultat enregistré pour (configuration, graine), ou None"""
+        if seed is None:
+            return None
+        path = self._path(cache_key(config, seed))
+        try:
+            header, arrays = read_checkpoint(path)
+            run = CachedRun(np.array(arrays["series"]), header["outcome"])
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError):
+            # illisible (tronquée, écrite par une ancienne version...) : supprimée, puis recalculée
+            self._remove(path)
+            self.misses += 1
+            return None
+        os.utime(path)  # entrée utilisée récemment
+        self.hits += 1
+        return run
+
+    def put(self, config: SimConfig, seed: Optional[int], run: CachedRun) -> None:
+        """enregistre un résultat, puis fait de la place si la limite est dépassée"""
+        if seed is None:
+            return
+        path = self._path(cache_key(config, seed))
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+        write_checkpoint(path, {"outcome": run.outcome}, {"series": run.series})
+        self._total += os.path.getsize(path) - previous
+        if self._total > self._max_bytes:
+            self._evict()
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        """(date de dernière utilisation, taille, chemin) de chaque entrée"""
+        entries = []
+        with os.scandir(self._dir) as it:
+            for entry in it:
+                if entry.name.endswith(_SUFFIX):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _remove(self, path: str) -> None:
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        self._total -= size
+
+    def _evict(self) -> None:
+        """supprime les entrées les moins récemment utilisées jusqu'à EVICT_TO de la limite"""
+        entries = self._entries()
+        self._total = sum(size for _mtime, size, _path in entries)
+        for _mtime, size, path in sorted(entries):
+            if self._total <= self._max_bytes * EVICT_TO:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._total -= size
@@ -0,0 +1,86 @@
+import json
+import os
+import struct
+from typing import Any
+
+import numpy as np
+
+# Format d'un point de sauvegarde (un seul fichier) :
+#   MAGIC (8 octets) | version (uint32) | taille de l'en-tête (uint32) | en-tête JSON
+#   puis les tableaux bruts, chacun aligné sur ALIGN octets pour pouvoir être
+#   projetés en mémoire (np.memmap) directement au chargement.
+MAGIC = b"P25CKPT\0"
+VERSION = 1
+ALIGN = 64
+
+_PREFIX = struct.Struct("<8sII")
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGN) * ALIGN
+
+
+def write_checkpoint(path: str, header: dict[str, Any], arrays: dict[str, np.ndarray]) -> None:
+    """
+    Écrit l'en-tête et les tableaux dans un fichier de sauvegarde. Le fichier
+    est écrit à côté puis renommé : une sauvegarde interrompue ne remplace
+    jamais la précédente.
+    """
+    # Les positions des tableaux dépendent de la taille de l'en-tête, qui les contient :
+    # on réserve assez de place pour que l'en-tête final tienne avant le premier tableau
+    layout: dict[str, dict[str, Any]] = {}
+    meta = dict(header, arrays=layout)
+    for name, arr in arrays.items():
+        layout[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": 0}
+    reserve = len(json.dumps(meta).encode()) + 32 * len(arrays) + 64
+
+    offset = _aligned(_PREFIX.size + reserve)
+    for name, arr in arrays.items():
+        layout[name]["offset"] = offset
+        offset = _aligned(offset + arr.nbytes)
+
+    encoded = json.dumps(meta).encode()
+    if len(encoded) > reserve:
+        raise ValueError("en-tête de sauvegarde trop grand")
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, VERSION, len(encoded)))
+        f.write(encoded)
+        for name, arr in arrays.items():
+            f.seek(layout[name]["offset"])
+            f.write(np.ascontiguousarray(arr).tobytes())
+        f.truncate(offset)
+    os.replace(tmp_path, path)
+
+
+def read_checkpoint(path: str) -> tuple[dict[str, Any], dict[str, np.ndarray]]:
+    """
+    Lit un fichier de sauvegarde. Les tableaux sont projetés en mémoire en
+    copie sur écriture : rien n'est lu tant qu'on n'y accède pas, et les
+    modifier ne touche pas au fichier.
+    """
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        prefix = f.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size:
+            raise ValueError(f"{path!r} est tronqué (en-tête incomplet)")
+        magic, version, size = _PREFIX.unpack(prefix)
+        if magic != MAGIC:
+            raise ValueError(f"{path!r} n'est pas une sauvegarde de simulation")
+        if version != VERSION:
+            raise ValueError(f"version de sauvegarde non prise en charge : {version}")
+        meta = json.loads(f.read(size))
+
+    arrays: dict[str, np.ndarray] = {}
+    for name, spec in meta.pop("arrays").items():
+        shape = tuple(spec["shape"])
+        dtype = np.dtype(spec["dtype"])
+        if spec["offset"] + int(np.prod(shape)) * dtype.itemsize > file_size:
+            raise ValueError(f"{path!r} est tronqué (tableau {name!r} incomplet)")
+        if int(np.prod(shape)) == 0:
+            arrays[name] = np.zeros(shape, dtype=dtype)
+        else:
+            arrays[name] = np.memmap(path, dtype=dtype, mode="c",
+                                     offset=spec["offset"], shape=shape)
+    return meta, arrays
@@ -0,0 +1,462 @@
+import random
+from typing import Optional
+
+import numpy as np
+
+from p25_hackathon.arraygrid import batch_rng, species_code
+from p25_hackathon.grid import SHEEP, WOLF, Cell, CellDraws, Grid, codes_to_rows
+from p25_hackathon.livingbeings import Animal, GrassCell, Sheep, Wolf
+
+_KINDS: dict[int, type[Animal]] = {SHEEP: Sheep, WOLF: Wolf}
+
+
+class _Tile:
+    """Tuile allouée : herbe et timers de repousse de ses cases (indice local ly * largeur + lx)."""
+
+    __slots__ = ("grass", "timer")
+
+    def __init__(self, n_cells: int, full: bool) -> None:
+        self.grass = np.full(n_cells, full, dtype=np.bool_)
+        self.timer = np.zeros(n_cells, dtype=np.uint16)
+
+
+class _SparseFree:
+    """
+    Remplace l'index des cases libres de Grid (un tableau de n² cases) :
+    une case est libre si aucun animal n'y est. Le tirage se fait par rejet,
+    rapide tant que la grille n'est pas presque pleine.
+    """
+
+    def __init__(self, grid: "ChunkedGrid") -> None:
+        self._grid = grid
+
+    def __len__(self) -> int:
+        return self._grid._size ** 2 - len(self._grid._animals)
+
+    def __contains__(self, i: int) -> bool:
+        return i not in self._grid._animals
+
+    def add(self, i: int) -> None:
+        pass
+
+    def discard(self, i: int) -> None:
+        pass
+
+    def sample(self, k: int, rng: random.Random) -> list[int]:
+        """tire k cases libres distinctes (au plus le nombre de cases libres)"""
+        k = min(k, len(self))
+        animals = self._grid._animals
+        n2 = self._grid._size ** 2
+        picked: list[int] = []
+        taken: set[int] = set()
+        while len(picked) < k:
+            i = rng.randrange(n2)
+            if i in animals or i in taken:
+                continue
+            taken.add(i)
+            picked.append(i)
+        return picked
+
+
+class _ChunkGrass(GrassCell):
+    """Herbe d'une cellule de ChunkedGrid (mêmes méthodes que GrassCell)."""
+
+    def __init__(self, grid: "ChunkedGrid", x: int, y: int) -> None:
+        self._grid = grid
+        self._x = x
+        self._y = y
+
+    @property
+    def present(self) -> bool:
+        return self._grid._grass_at(self._x, self._y)
+
+    @present.setter
+    def present(self, value: bool) -> None:
+        self._grid._write_grass(self._x, self._y, present=value)
+
+    @property
+    def regrow_timer(self) -> int:
+        return self._grid._timer_at(self._x, self._y)
+
+    @regrow_timer.setter
+    def regrow_timer(self, value: int) -> None:
+        self._grid._write_grass(self._x, self._y, timer=value)
+
+
+class _ChunkCell(Cell):
+    """Cellule de ChunkedGrid : même interface que Cell, rien n'est alloué pour une case vide."""
+
+    def __init__(self, grid: "ChunkedGrid", x: int, y: int) -> None:
+        self._grid = grid
+        self._x = x
+        self._y = y
+
+    @property
+    def grass(self) -> GrassCell:
+        return _ChunkGrass(self._grid, self._x, self._y)
+
+    @property
+    def animal(self) -> Optional[Animal]:
+        return self._grid._animals.get(self._y * self._grid._size + self._x)
+
+    @animal.setter
+    def animal(self, animal: Optional[Animal]) -> None:
+        i = self._y * self._grid._size + self._x
+        if animal is None:
+            self._grid._clear(i)
+        else:
+            self._grid._put(i, animal)
+
+
+class ChunkedGrid(Grid):
+    """
+    Grille découpée en tuiles de `tile_size` × `tile_size` cases, pour les
+    très grandes cartes surtout vides.
+
+    Une tuile sans herbe ni repousse en cours n'a aucun stockage ; une tuile
+    entièrement en herbe est notée comme telle, sans tableau, et la phase
+    d'herbe la saute (rien n'y change). Les autres tuiles ont deux petits
+    tableaux (herbe, timer). Les animaux sont gardés à part, par indice
+    y * n + x : la mémoire suit le nombre d'animaux, pas la taille de la carte.
+
+    Même API publique que Grid (voisins, déplacements d'une tuile à l'autre,
+    reproduction...). Le placement aléatoire se fait par rejet, sans index
+    des cases libres.
+    """
+
+    TILE_SIZE = 64
+
+    def __init__(self, size: int, grass_regrow_time: int, debug: bool = False,
+                 tile_size: Optional[int] = None) -> None:
+        self._tile = tile_size if tile_size is not None else self.TILE_SIZE
+        if self._tile <= 0:
+            raise ValueError("la taille des tuiles doit être > 0")
+        super().__init__(size, grass_regrow_time, debug=debug)
+
+    def _reset_indexes(self) -> None:
+        self._occupied = {Sheep: set(), Wolf: set()}
+        self._free = _SparseFree(self)  # type: ignore[assignment]
+        self._n_grass = 0
+
+    def _init_storage(self) -> None:
+        if self._grass_regrow_time > np.iinfo(np.uint16).max:
+            raise ValueError("la repousse doit tenir sur 16 bits")
+
+        n, t = self._size, self._tile
+        self._tiles_x = -(-n // t)
+        # largeur (= hauteur) des tuiles de chaque colonne : celles du bord sont coupées
+        widths = np.minimum(t, n - np.arange(self._tiles_x) * t)
+        self._tile_cells = np.outer(widths, widths).ravel()
+
+        self._dense: dict[int, _Tile] = {}
+        self._full: set[int] = set()
+        self._animals: dict[int, Animal] = {}
+
+    @property
+    def nbytes(self) -> int:
+        """mémoire occupée par les tuiles allouées"""
+        return sum(tile.grass.nbytes + tile.timer.nbytes for tile in self._dense.values())
+
+    @property
+    def tile_counts(self) -> tuple[int, int, int]:
+        """nombre de tuiles (vides, entièrement en herbe, allouées)"""
+        total = self._tiles_x * self._tiles_x
+        return total - len(self._full) - len(self._dense), len(self._full), len(self._dense)
+
+    # --- Tuiles ---
+
+    def _locate(self, x: int, y: int) -> tuple[int, int]:
+        """(tuile, indice local) de la case (x, y)"""
+        t = self._tile
+        tx, lx = divmod(x, t)
+        ty, ly = divmod(y, t)
+        width = min(t, self._size - tx * t)
+        return ty * self._tiles_x + tx, ly * width + lx
+
+    def _tile_origin(self, tile: int) -> tuple[int, int, int, int]:
+        """(x0, y0, largeur, hauteur) d'une tuile"""
+        ty, tx = divmod(tile, self._tiles_x)
+        x0, y0 = tx * self._tile, ty * self._tile
+        return x0, y0, min(self._tile, self._size - x0), min(self._tile, self._size - y0)
+
+    def _dense_tile(self, tile: int) -> _Tile:
+        """tuile allouée (allouée maintenant si elle était vide ou pleine d'herbe)"""
+        dense = self._dense.get(tile)
+        if dense is None:
+            dense = _Tile(int(self._tile_cells[tile]), full=tile in self._full)
+            self._full.discard(tile)
+            self._dense[tile] = dense
+        return dense
+
+    def _compact(self, tile: int) -> None:
+        """libère le stockage d'une tuile devenue uniforme"""
+        dense = self._dense[tile]
+        grass = int(np.count_nonzero(dense.grass))
+        if grass == dense.grass.size and not dense.timer.any():
+            del self._dense[tile]
+            self._full.add(tile)
+        elif grass == 0 and not dense.timer.any():
+            del self._dense[tile]
+
+    def _grass_at(self, x: int, y: int) -> bool:
+        tile, k = self._locate(x, y)
+        if tile in self._full:
+            return True
+        dense = self._dense.get(tile)
+        return dense is not None and bool(dense.grass[k])
+
+    def _timer_at(self, x: int, y: int) -> int:
+        tile, k = self._locate(x, y)
+        dense = self._dense.get(tile)
+        return 0 if dense is None else int(dense.timer[k])
+
+    def _write_grass(self, x: int, y: int, present: Optional[bool] = None, timer: Optional[int] = None) -> None:
+        tile, k = self._locate(x, y)
+        dense = self._dense_tile(tile)
+        if present is not None and bool(dense.grass[k]) != present:
+            dense.grass[k] = present
+            self._n_grass += 1 if present else -1
+        if timer is not None:
+            dense.timer[k] = timer
+
+    def _grow(self, probability: float, gen: Optional[np.random.Generator], regrow: bool,
+              draws: Optional[CellDraws] = None) -> None:
+        """
+        Pousse aléatoire sur les cases sans herbe (et sans repousse en cours),
+        sans tirage si `gen` et `draws` sont None ; avec `regrow`, les timers
+        de repousse sont d'abord décrémentés.
+        Les tuiles vides reçoivent d'un coup un nombre binomial de pousses,
+        ce qui revient au même que de tirer chaque case. Avec `draws`, chaque
+        case a son propre tirage : les tuiles vides sont alors tirées case
+        par case.
+        """
+        n_tiles = self._tiles_x * self._tiles_x
+        absent = np.ones(n_tiles, dtype=np.bool_)
+        absent[list(self._dense)] = False
+        absent[list(self._full)] = False
+
+        for tile in sorted(self._dense):
+            dense = self._dense[tile]
+            if regrow:
+                regrowing = dense.timer > 0
+                np.subtract(dense.timer, 1, out=dense.timer, where=regrowing)
+                ready = dense.timer == 0
+                grown = regrowing & ready
+            else:
+                ready = np.ones(dense.grass.size, dtype=np.bool_)
+                grown = np.zeros(dense.grass.size, dtype=np.bool_)
+            if draws is not None:
+                local = np.flatnonzero(ready & ~dense.grass)
+                grown[local[draws(self._tile_indices(tile)[local]) < probability]] = True
+            elif gen is not None:
+                grown |= ready & (gen.random(dense.grass.size, dtype=np.float32) < probability)
+            grown &= ~dense.grass
+            dense.grass |= grown
+            self._n_grass += int(np.count_nonzero(grown))
+            self._compact(tile)
+
+        if draws is not None:
+            for tile in np.flatnonzero(absent).tolist():
+                grown = draws(self._tile_indices(tile)) < probability
+                self._add_grown(tile, grown)
+            return
+        if gen is None:
+            return
+        tiles = np.flatnonzero(absent)
+        counts = gen.binomial(self._tile_cells[tiles], probability)
+        for tile, k in zip(tiles[counts > 0].tolist(), counts[counts > 0].tolist()):
+            grown = np.zeros(int(self._tile_cells[tile]), dtype=np.bool_)
+            grown[gen.choice(grown.size, k, replace=False)] = True
+            self._add_grown(tile, grown)
+
+    def _add_grown(self, tile: int, grown: np.ndarray) -> None:
+        """herbe poussée dans une tuile vide (masque local des cases)"""
+        k = int(np.count_nonzero(grown))
+        if k == 0:
+            return
+        if k == grown.size:
+            self._full.add(tile)
+        else:
+            dense = _Tile(grown.size, full=False)
+            dense.grass[grown] = True
+            self._dense[tile] = dense
+        self._n_grass += k
+
+    def _tile_indices(self, tile: int) -> np.ndarray:
+        """indices y * n + x des cases d'une tuile, dans l'ordre local"""
+        x0, y0, w, h = self._tile_origin(tile)
+        return ((y0 + np.arange(h))[:, None] * self._size + x0 + np.arange(w)).ravel()
+
+    # --- Animaux ---
+
+    def _put(self, i: int, animal: Animal) -> None:
+        if i in self._animals:
+            self._clear(i)
+        species_code(animal)  # refuse les espèces inconnues
+        self._animals[i] = animal
+        self._track(self._kind_of(animal), i)
+
+    def _clear(self, i: int) -> None:
+        animal = self._animals.pop(i, None)
+        if animal is not None:
+            self._untrack(self._kind_of(animal), i)
+
+    # --- API de Grid ---
+
+    def cell(self, x: int, y: int) -> Cell:
+        """renvoie une vue sur la cellule"""
+        return _ChunkCell(self, x, y)
+
+    def place_grass_random(self, coverage: float, rng: random.Random) -> None:
+        self._grow(coverage, batch_rng(rng) if coverage > 0.0 else None, regrow=False)
+
+    def tick_grass(self, grass_growth_probability: float, rng: random.Random,
+                   draws: Optional[CellDraws] = None) -> None:
+        """Met à jour l'herbe : décrémente les timers de repousse et fait pousser aléatoirement sur les cellules libres
+        """
+        if not (0.0 <= grass_growth_probability <= 1.0):
+            raise ValueError("La proba doit être dans [0, 1] !")
+        if grass_growth_probability == 0.0:
+            self._grow(0.0, None, regrow=True)
+        elif draws is not None:
+            self._grow(grass_growth_probability, None, regrow=True, draws=draws)
+        else:
+            self._grow(grass_growth_probability, batch_rng(rng), regrow=True)
+
+    def move_animal(self, dep: tuple[int, int], arr: tuple[int, int]) -> bool:
+        """déplace un animal si la destination est libre (d'une tuile à l'autre si besoin)"""
+        fx, fy = dep
+        tx, ty = arr
+        if not (self.in_bounds(fx, fy) and self.in_bounds(tx, ty)):
+            return False
+
+        i = fy * self._size + fx
+        j = ty * self._size + tx
+        animal = self._animals.get(i)
+        if animal is None or j in self._animals:
+            return False
+
+        kind = self._kind_of(animal)
+        del self._animals[i]
+        self._animals[j] = animal
+        self._untrack(kind, i)
+        self._track(kind, j)
+        return True
+
+    def remove_animal(self, x: int, y: int) -> None:
+        """enlève un animal mort"""
+        self._clear(y * self._size + x)
+
+    def _place(self, animal: Animal, x: int, y: int) -> None:
+        self._put(y * self._size + x, animal)
+
+    def try_reproduce(self, parent: tuple[int, int], baby: Animal, rng: random.Random) -> bool:
+        """assure la reproduction des espèces"""
+        x, y = parent
+        n = self._size
+        options = [(i, j) for (i, j) in self.neighbors4(x, y) if j * n + i not in self._animals]
+        if not options:
+            return False
+
+        bx, by = rng.choice(options)
+        self._put(by * n + bx, baby)
+        return True
+
+    def eat_grass_if_present(self, x: int, y: int) -> bool:
+        if not self._grass_at(x, y):
+            return False
+        tile, k = self._locate(x, y)
+        dense = self._dense_tile(tile)
+        dense.grass[k] = False
+        dense.timer[k] = self._grass_regrow_time
+        self._n_grass -= 1
+        return True
+
+    def cell_codes(self) -> np.ndarray:
+        n = self._size
+        codes = np.zeros((n, n), dtype=np.uint8)
+        for tile in self._full:
+            x0, y0, w, h = self._tile_origin(tile)
+            codes[y0:y0 + h, x0:x0 + w] = 1
+        for tile, dense in self._dense.items():
+            x0, y0, w, h = self._tile_origin(tile)
+            codes[y0:y0 + h, x0:x0 + w] = dense.grass.reshape(h, w)
+        flat = codes.ravel()
+        for code, kind in _KINDS.items():
+            flat[list(self._occupied[kind])] |= code << 1
+        return flat
+
+    def cell_energies(self) -> np.ndarray:
+        energies = np.zeros(self._size * self._size, dtype=np.int32)
+        for i, animal in self._animals.items():
+            energies[i] = animal.energy
+        return energies
+
+    def symbol_rows(self) -> list[str]:
+        return codes_to_rows(self.cell_codes(), self._size)
+
+    def export_state(self) -> dict[str, np.ndarray]:
+        """
+        état creux : tuiles pleines d'herbe, contenu des tuiles allouées
+        (mis bout à bout), et un enregistrement par animal
+        """
+        dense = sorted(self._dense)
+        animals = sorted(self._animals)
+        empty_b = np.zeros(0, dtype=np.bool_)
+        empty_t = np.zeros(0, dtype=np.uint16)
+        return {
+            "tiles_full": np.array(sorted(self._full), dtype=np.int64),
+            "tiles_dense": np.array(dense, dtype=np.int64),
+            "dense_grass": np.concatenate([self._dense[t].grass for t in dense] or [empty_b]),
+            "dense_timer": np.concatenate([self._dense[t].timer for t in dense] or [empty_t]),
+            "animal_index": np.array(animals, dtype=np.int64),
+            "animal_species": np.array([species_code(self._animals[i]) for i in animals], dtype=np.uint8),
+            "animal_energy": np.array([self._animals[i].energy for i in animals], dtype=np.int32),
+            "animal_age": np.array([self._animals[i].age for i in animals], dtype=np.int32),
+        }
+
+    def import_state(self, state: dict[str, np.ndarray]) -> None:
+        """remplace tout le contenu de la grille par un état produit par export_state"""
+        if "tiles_dense" not in state:
+            raise ValueError("état d'une grille non découpée en tuiles")
+        self._reset_indexes()
+        self._init_storage()
+
+        self._full = set(state["tiles_full"].tolist())
+        offset = 0
+        for tile in state["tiles_dense"].tolist():
+            size = int(self._tile_cells[tile])
+            dense = _Tile(size, full=False)
+            dense.grass[:] = state["dense_grass"][offset:offset + size]
+            dense.timer[:] = state["dense_timer"][offset:offset + size]
+            self._dense[tile] = dense
+            offset += size
+        self._n_grass = (int(self._tile_cells[list(self._full)].sum())
+                         + int(np.count_nonzero(state["dense_grass"])))
+
+        for i, code, energy, age in zip(state["animal_index"].tolist(), state["animal_species"].tolist(),
+                                        state["animal_energy"].tolist(), state["animal_age"].tolist()):
+            self._put(i, _KINDS[code](energy=energy, age=age))
+
+    def _count_scan(self) -> tuple[int, int, int]:
+        sheep = sum(1 for a in self._animals.values() if isinstance(a, Sheep))
+        wolf = sum(1 for a in self._animals.values() if isinstance(a, Wolf))
+        grass = int(self._tile_cells[list(self._full)].sum())
+        grass += sum(int(np.count_nonzero(d.grass)) for d in self._dense.values())
+        return sheep, wolf, grass
+
+
+def main() -> None:
+    print("Testing ChunkedGrid...")
+    g = ChunkedGrid(size=10_000, grass_regrow_time=5)
+    g.place_grass_random(0.0, random.Random(42))
+    g.spawn_animals_random([Sheep(energy=20) for _ in range(1000)], random.Random(1))
+    x, y = g.positions_of(Sheep)[0]
+    g.move_animal((x, y), g.neighbors4(x, y)[0])
+    print(f"effectifs {g.count()}, tuiles (vides, pleines, allouées) {g.tile_counts}")
+    print(f"{g.nbytes} octets de tuiles pour {g.size * g.size} cellules")
+    print("ChunkedGrid test complete.")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,39 @@
 import argparse
 import sys
 import time
-import matplotlib.pyplot as plt
 
+import numpy as np
 
-from p25_hackathon.grid import Grid
-from p25_hackathon.simulation import Simulation, SimConfig
-from p25_hackathon.interface import run_pyxel
-from typing import Any
+
+from p25_hackathon.grid import Grid, codes_to_rows
+from p25_hackathon.cache import CachedRun, ResultCache
+from p25_hackathon.convergence import (
+    STOP_CYCLE,
+    STOP_EXTINCTION,
+    STOP_FIXED_POINT,
+    STOP_MAX_TURNS,
+    STOP_SHEEP_EXTINCT,
+    STOP_WOLVES_EXTINCT,
+)
+from p25_hackathon.instrumentation import StatsCollector
+from p25_hackathon.pipeline import FramePipeline
+from p25_hackathon.render import DiffRenderer, StatusLine
+from p25_hackathon.replay import ReplayRecorder
+from p25_hackathon.stats import make_stats_sink
+from p25_hackathon.trajectory import TrajectoryWriter
+from p25_hackathon.simulation import GRID_BACKENDS, RNG_MODES, Simulation, SimConfig
+from p25_hackathon.fused import FusedSimulation
+from typing import Any, Callable
+
+# Message d'arrêt pour chaque raison (Simulation.stop_reason)
+STOP_MESSAGES = {
+    STOP_MAX_TURNS: "nombre maximal de tours atteint",
+    STOP_EXTINCTION: "extinction de tous les animaux",
+    STOP_SHEEP_EXTINCT: "extinction des moutons",
+    STOP_WOLVES_EXTINCT: "extinction des loups",
+    STOP_FIXED_POINT: "effectifs stables",
+    STOP_CYCLE: "cycle proies-prédateurs établi",
+}
 
 def plot_stats(stats: dict[str, list[Any]]) -> None:
     """Affiche le graphique d'évolution des populations."""
@@ -22,6 +48,9 @@ def plot_stats(stats: dict[str, list[Any]]) -> None:
         return
 
     try:
+        # import local : matplotlib n'est nécessaire que pour le graphique
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=(10, 6))
         plt.plot(stats["turns"], stats["sheep"], label="Moutons", color="blue")
         plt.plot(stats["turns"], stats["wolves"], label="Loups", color="red")
@@ -73,6 +102,51 @@ def build_parser() -> argparse.ArgumentParser:
                         help="Désactiver les couleurs ANSI")
     parser.add_argument("-v", action="count", default=0,
                         help="Verbose (ex: -v, -vv)")
+    parser.add_argument("--backend", choices=GRID_BACKENDS, default="objects",
+                        help="Stockage de la grille : objets Python, tableaux numpy ou tuiles (défaut: objects)")
+    parser.add_argument("--rng", choices=RNG_MODES, default="shared",
+                        help="Tirages : générateur partagé, ou à compteur indépendant de l'ordre de calcul (défaut: shared)")
+    parser.add_argument("--batched", action="store_true",
+                        help="Traiter moutons et loups en bloc au lieu d'un par un (backend arrays)")
+    parser.add_argument("--fused", action="store_true",
+                        help="Moteur de tour fusionné (mêmes tours, backend arrays, hors interface graphique)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Simulation dans un thread à pleine vitesse, l'affichage ne montre que la dernière image")
+    parser.add_argument("--headless", action="store_true",
+                        help="Aucun affichage ni graphique (seulement les fichiers demandés et un bilan)")
+    parser.add_argument("--render-every", type=int, default=1,
+                        help="Afficher la grille un tour sur N seulement, le délai ne s'applique qu'aux tours affichés (défaut: 1)")
+    parser.add_argument("--fast-forward", action="store_true",
+                        help="Sans délai ni grille : une ligne d'état avec les tours/s, mise à jour en continu")
+    parser.add_argument("--stop-on-convergence", action="store_true",
+                        help="Arrêter dès qu'une espèce disparaît ou que les effectifs sont stables ou cycliques")
+    parser.add_argument("--convergence-window", type=int, default=200,
+                        help="Nombre de tours examinés pour détecter effectifs stables ou cycle (défaut: 200)")
+    parser.add_argument("--cache", default=None,
+                        help="Répertoire du cache de résultats, utilisé sans affichage de la grille "
+                             "(--headless ou --fast-forward) avec une graine fixée")
+    parser.add_argument("--cache-size", type=int, default=256,
+                        help="Taille maximale du cache en Mo (défaut: 256)")
+    parser.add_argument("--debug-counts", action="store_true",
+                        help="Vérifier les effectifs par un parcours complet de la grille à chaque comptage")
+    parser.add_argument("--profile", action="store_true",
+                        help="Mesurer le temps de chaque phase et les événements, résumé en fin de simulation")
+    parser.add_argument("--resume", default=None,
+                        help="Reprendre une simulation sauvegardée (fichier écrit par --checkpoint)")
+    parser.add_argument("--checkpoint", default=None,
+                        help="Fichier de sauvegarde, réécrit tous les --checkpoint-every tours et à l'arrêt")
+    parser.add_argument("--checkpoint-every", type=int, default=100,
+                        help="Intervalle de sauvegarde en tours (défaut: 100)")
+    parser.add_argument("--record", default=None,
+                        help="Enregistrer un journal de rejeu (relecture avec p25-hackathon-replay)")
+    parser.add_argument("--keyframe-every", type=int, default=100,
+                        help="Intervalle entre images complètes du journal de rejeu (défaut: 100)")
+    parser.add_argument("--trajectory", default=None,
+                        help="Enregistrer l'état de chaque case à chaque tour (complété en cas de --resume)")
+    parser.add_argument("--stats-out", default=None,
+                        help="Écrire les effectifs de chaque tour en flux (CSV, ou binaire si le nom finit par .bin)")
+    parser.add_argument("--plot-points", type=int, default=1000,
+                        help="Nombre pair de paquets (min/max) gardés pour le graphique final (défaut: 1000)")
     parser.add_argument("--pyxel", action="store_true",
                         help="Lancer l'interface graphique")
     parser.add_argument("--cell-size", type=int, default=8,
@@ -81,20 +155,110 @@ def build_parser() -> argparse.ArgumentParser:
                         help="Nombre d'images par seconde dans l'interface graphique (défaut: 60)")
     return parser
 
-def clear_screen() -> None:
+def run_pipelined(sim: Simulation, renderer: DiffRenderer,
+                  on_turn: Callable[[Simulation], Any], delay_s: float) -> None:
     """
-    Efface le terminal et replace le curseur en haut à gauche.
+    Simulation dans un thread (voir pipeline.py), affichage dans le thread
+    principal : toutes les `delay_s` secondes, on affiche la dernière image
+    publiée, les tours intermédiaires ne sont pas dessinés.
+    """
+    pipeline = FramePipeline(sim, on_turn=on_turn)
+    pipeline.start()
+    try:
+        while True:
+            frame = pipeline.latest()
+            if frame is None:
+                break
+            s, w, g = frame.counts
+            header = f"Tour: {frame.turn} | Sheep: {s} | Wolves: {w} | Grass: {g}"
+            renderer.draw(header, codes_to_rows(frame.codes, sim.grid.size))
+            if frame.last:
+                break
+            time.sleep(delay_s)
+        pipeline.stop()
+        renderer.close()
+        print(f"Arrêt: {STOP_MESSAGES.get(str(sim.stop_reason), 'condition atteinte')} (tour {sim.turn}), "
+              f"{pipeline.dropped} images non affichées.")
+    except KeyboardInterrupt:
+        pipeline.stop()
+        renderer.close()
+        print("Arrêt manuel (Ctrl+C).")
 
-    Utilise des séquences ANSI, compatibles avec la majorité des terminaux.
+def run_loop(sim: Simulation, renderer: DiffRenderer, on_turn: Callable[[Simulation], tuple[int, int, int]],
+             delay_s: float, args: argparse.Namespace) -> None:
     """
-    sys.stdout.write("\x1b[2J\x1b[H")
+    Boucle principale : `on_turn` à chaque tour, puis selon le mode
+    - normal : grille affichée tous les --render-every tours (et au dernier),
+      suivie du délai ;
+    - --fast-forward : ni grille ni délai, une ligne d'état avec les tours/s ;
+    - --headless : ni grille ni délai, rien à l'écran avant le bilan.
+    """
+    show_grid = not (args.headless or args.fast_forward)
+    status = StatusLine() if args.fast_forward else None
+    first_turn, t0 = sim.turn, time.perf_counter()
+
+    def finish(message: str) -> None:
+        if show_grid:
+            renderer.close()
+        if status is not None:
+            status.close()
+        print(message)
+        if not show_grid:
+            elapsed = time.perf_counter() - t0
+            turns = sim.turn - first_turn
+            rate = turns / elapsed if elapsed > 0 else 0.0
+            print(f"{turns} tours en {elapsed:.2f} s ({rate:,.0f} tours/s).")
+
+    try:
+        # Boucle principale de la simulation
+        while True:
+            # Comptage des entités pour affichage synthétique
+            s, w, g = on_turn(sim)
+            stop = sim.should_stop()
+
+            # Affichage ASCII de la grille (un tour sur render_every)
+            drawn = show_grid and (stop or sim.turn % args.render_every == 0)
+            if drawn:
+                header = f"Tour: {sim.turn} | Sheep: {s} | Wolves: {w} | Grass: {g}"
+                renderer.draw(header, sim.grid.symbol_rows())
+            if status is not None:
+                status.update(sim.turn, (s, w, g), force=stop)
+
+            # Condition d'arrêt (extinction ou nombre max de tours)
+            if stop:
+                finish(f"Arrêt: {STOP_MESSAGES.get(str(sim.stop_reason), 'condition atteinte')} (tour {sim.turn}).")
+                break
+
+            # Calcul du tour suivant
+            sim.step()
+
+            # Pause pour contrôler la vitesse d’animation
+            if drawn:
+                time.sleep(delay_s)
+
+    except KeyboardInterrupt:
+        # Arrêt propre si l'utilisateur interrompt le programme
+        finish("Arrêt manuel (Ctrl+C).")
 
 def main() -> int:
     """
     Fonction principale de la CLI.
     """
     # Lecture des arguments passés par l’utilisateur
-    args = build_parser().parse_args()
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.render_every < 1:
+        parser.error("--render-every doit être au moins 1")
+    if args.batched and args.backend != "arrays":
+        parser.error("--batched demande --backend arrays")
+    if args.fused and args.backend != "arrays":
+        parser.error("--fused demande --backend arrays")
+    if args.plot_points < 2 or args.plot_points % 2:
+        parser.error("--plot-points doit être un nombre pair, au moins 2")
+    if args.pyxel and (args.headless or args.fast_forward):
+        parser.error("--headless et --fast-forward n'ont pas de sens avec --pyxel")
+    if args.pipeline and (args.headless or args.fast_forward or args.render_every > 1):
+        parser.error("--pipeline règle déjà le rythme d'affichage : sans --headless, --fast-forward ni --render-every")
 
     # Construction de la configuration de simulation à partir de la CLI
     # Les paramètres non fournis gardent leur valeur par défaut
@@ -106,63 +270,128 @@ def main() -> int:
         max_turns=args.turns,
         delay_s=args.delay,
         use_color=not args.no_color,
+        grid_backend=args.backend,
+        debug_counts=args.debug_counts,
+        rng_mode=args.rng,
+        batched_phases=args.batched,
+        stop_on_convergence=args.stop_on_convergence,
+        convergence_window=args.convergence_window,
     )
 
+    # Effectifs par tour : sous-échantillonnés pour le graphique (mémoire constante),
+    # et éventuellement écrits en entier dans un fichier au fil de l'eau
+    stats_sink = make_stats_sink(args.stats_out, args.plot_points)
+
     if args.pyxel:
-        stats = run_pyxel(cfg, seed=args.seed, cell_size=args.cell_size, fps=args.fps)
+        # import local : pyxel n'est nécessaire que pour l'interface graphique
+        from p25_hackathon.interface import run_pyxel
+
+        recorder = ReplayRecorder(args.record, cfg.grid_size, args.keyframe_every) if args.record else None
+        stats = run_pyxel(cfg, seed=args.seed, cell_size=args.cell_size, fps=args.fps,
+                          recorder=recorder, stats=stats_sink, pipelined=args.pipeline)
+        if recorder is not None:
+            recorder.close()
+        stats_sink.close()
         plot_stats(stats)
         return 0
 
-    # Création de la simulation avec une graine aléatoire optionnelle
-    sim = Simulation(cfg, seed=args.seed)
-    sim.initialize()
+    # Cache de résultats : seulement si rien d'autre que les effectifs n'est demandé
+    cache = ResultCache(args.cache, args.cache_size * 1024 * 1024) if args.cache else None
+    cacheable = (cache is not None and args.seed is not None and (args.headless or args.fast_forward)
+                 and not (args.resume or args.record or args.trajectory or args.checkpoint or args.profile))
+    if cache is not None and not cacheable:
+        print("Cache ignoré : il demande --seed et --headless ou --fast-forward, "
+              "sans --resume, --record, --trajectory, --checkpoint ni --profile.")
+    if cacheable:
+        assert cache is not None
+        hit = cache.get(cfg, args.seed)
+        if hit is not None:
+            for turn, s, w, g in hit.series.tolist():
+                stats_sink.record(turn, (s, w, g))
+            last_turn = int(hit.series[-1, 0])
+            reason = STOP_MESSAGES.get(str(hit.outcome["stop_reason"]), "condition atteinte")
+            print(f"Arrêt: {reason} (tour {last_turn}), résultat repris du cache.")
+            print(cache.summary())
+            stats_sink.close()
+            if args.stats_out:
+                print(f"Effectifs enregistrés dans '{args.stats_out}'.")
+            if not args.headless:
+                plot_stats(stats_sink.series())
+            return 0
 
-    # Dictionnaire pour stocker les données de population
-    stats = {
-        "turns": [],
-        "sheep": [],
-        "wolves": [],
-        "grass": []
-    }
+    # Création de la simulation avec une graine aléatoire optionnelle,
+    # ou reprise d'une sauvegarde (sa configuration remplace celle de la CLI)
+    sim_cls = FusedSimulation if args.fused else Simulation
+    if args.resume:
+        sim = sim_cls.load(args.resume)
+    else:
+        sim = sim_cls(cfg, seed=args.seed)
+        sim.initialize()
 
+    # Journal de rejeu (taille de grille de la simulation, éventuellement reprise)
+    recorder = ReplayRecorder(args.record, sim.grid.size, args.keyframe_every) if args.record else None
+    trajectory = None
+    if args.trajectory:
+        trajectory = TrajectoryWriter(args.trajectory, sim.grid.size, first_turn=sim.turn,
+                                      append=args.resume is not None)
 
-    try:
-        # Boucle principale de la simulation
-        while True:
-            # Nettoyage du terminal avant le nouvel affichage
-            clear_screen()
+    collector = StatsCollector() if args.profile else None
+    sim.set_observer(collector)
 
-            # Comptage des entités pour affichage synthétique
-            s, w, g = sim.grid.count()
-            print(f"Tour: {sim.turn} | Sheep: {s} | Wolves: {w} | Grass: {g}")
 
-            # Enregistrement des données
-            stats["turns"].append(sim.turn)
-            stats["sheep"].append(s)
-            stats["wolves"].append(w)
-            stats["grass"].append(g)
+    first_turn = sim.turn
+    series: list[tuple[int, int, int, int]] = []  # pour le cache
 
+    def record_turn(sim: Simulation) -> tuple[int, int, int]:
+        """enregistrements de chaque tour (effectifs, journal, trajectoire, sauvegarde)"""
+        counts = sim.grid.count()
+        stats_sink.record(sim.turn, counts)
+        if cacheable:
+            series.append((sim.turn, *counts))
+        if recorder is not None:
+            recorder.record(sim.turn, sim.grid.cell_codes(), counts)
+        if trajectory is not None:
+            trajectory.record(sim.turn, sim.grid)
+        if args.checkpoint and sim.turn != first_turn and sim.turn % args.checkpoint_every == 0:
+            sim.save(args.checkpoint)
+        return counts
 
-            # Affichage ASCII de la grille
-            print(sim.grid.render_ascii(use_color=cfg.use_color))
+    # Affichage différentiel : seules les cases modifiées sont réécrites
+    renderer = DiffRenderer(use_color=cfg.use_color)
 
-            # Condition d'arrêt (extinction ou nombre max de tours)
-            if sim.should_stop():
-                print("\nArrêt: condition atteinte (max tours ou extinction).")
-                break
+    if args.pipeline:
+        run_pipelined(sim, renderer, record_turn, cfg.delay_s)
+    else:
+        run_loop(sim, renderer, record_turn, cfg.delay_s, args)
 
-            # Calcul du tour suivant
-            sim.step()
+    if recorder is not None:
+        recorder.close()
+        print(f"Journal de rejeu enregistré dans '{args.record}'.")
 
-            # Pause pour contrôler la vitesse d’animation
-            time.sleep(cfg.delay_s)
+    if trajectory is not None:
+        trajectory.close()
+        print(f"Trajectoire enregistrée dans '{args.trajectory}' ({trajectory.next_turn} tours).")
 
-    except KeyboardInterrupt:
-        # Arrêt propre si l'utilisateur interrompt le programme
-        print("\nArrêt manuel (Ctrl+C).")
+    if args.checkpoint:
+        sim.save(args.checkpoint)
+        print(f"Simulation sauvegardée dans '{args.checkpoint}' (tour {sim.turn}).")
+
+    if collector is not None:
+        print(collector.summary())
+
+    # une simulation interrompue (Ctrl+C) n'est pas mise en cache
+    if cacheable and sim.should_stop():
+        assert cache is not None
+        cache.put(cfg, args.seed, CachedRun.from_series(np.array(series), sim.stop_reason))
+        print(cache.summary() + ", résultat ajouté.")
+
+    stats_sink.close()
+    if args.stats_out:
+        print(f"Effectifs enregistrés dans '{args.stats_out}'.")
 
     # Affichage du graphique d'évolution
-    plot_stats(stats)
+    if not args.headless:
+        plot_stats(stats_sink.series())
 
     return 0
 
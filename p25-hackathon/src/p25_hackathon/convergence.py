@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# Détection d'une dynamique établie (point fixe, extinction d'une espèce, cycle) pour arrêter tôt
+
+import argparse
+import sys
+import time
+from collections import Counter
+from dataclasses import replace
+from typing import Any, Optional
+
+import numpy as np
+
+# Raisons d'arrêt (Simulation.stop_reason)
+STOP_MAX_TURNS = "max_turns"
+STOP_EXTINCTION = "extinction"
+STOP_SHEEP_EXTINCT = "sheep_extinct"
+STOP_WOLVES_EXTINCT = "wolves_extinct"
+STOP_FIXED_POINT = "fixed_point"
+STOP_CYCLE = "cycle"
+
+# Période minimale d'un cycle, en tours, et corrélation exigée entre la
+# fenêtre et elle-même décalée d'une période
+MIN_PERIOD = 4
+CYCLE_MIN_CORRELATION = 0.8
+
+
+class ConvergenceDetector:
+    """
+    Suit les effectifs (moutons, loups, herbe) tour par tour et dit quand la
+    suite de la simulation n'apprendra plus rien :
+    - extinction d'une seule espèce animale (présente plus tôt) : elle ne
+      peut pas réapparaître ;
+    - point fixe (à des fluctuations près) : sur les `window` derniers
+      tours, l'écart-type de chaque effectif et l'écart entre la moyenne de
+      chaque quart de la fenêtre et celle de la fenêtre restent sous
+      `tolerance` × `cells` (nombre de cases de la grille) ;
+    - cycle : moutons et loups oscillent avec une même période p (pic de
+      l'autocorrélation au décalage p, au moins CYCLE_MIN_CORRELATION), sans
+      dérive entre les deux moitiés de la fenêtre.
+
+    Les deux derniers tests ne sont faits que tous les `check_every` tours,
+    une fois la fenêtre pleine. Une fois une raison trouvée, elle reste.
+    """
+
+    def __init__(self, cells: int, window: int = 200, tolerance: float = 0.02,
+                 check_every: Optional[int] = None) -> None:
+        if window < 4 * MIN_PERIOD:
+            raise ValueError(f"fenêtre trop courte : {window} tours (minimum {4 * MIN_PERIOD})")
+        if tolerance < 0:
+            raise ValueError("la tolérance doit être positive")
+        self._window = window
+        self._margin = tolerance * cells
+        self._check_every = check_every if check_every is not None else max(1, window // 10)
+        self._series = np.zeros((window, 3), dtype=np.float64)  # tampon circulaire
+        self._count = 0
+        self._seen = [False, False]  # moutons, loups déjà vus vivants
+        self.reason: Optional[str] = None
+        self.turn: Optional[int] = None    # tour où la raison a été trouvée
+        self.period: Optional[int] = None  # période du cycle détecté
+
+    def update(self, turn: int, counts: tuple[int, int, int]) -> Optional[str]:
+        """ajoute les effectifs d'un tour ; renvoie la raison d'arrêter, ou None"""
+        if self.reason is not None:
+            return self.reason
+        sheep, wolves, _grass = counts
+        self._seen = [self._seen[0] or sheep > 0, self._seen[1] or wolves > 0]
+        self._series[self._count % self._window] = counts
+        self._count += 1
+
+        reason = None
+        if sheep == 0 and wolves > 0 and self._seen[0]:
+            reason = STOP_SHEEP_EXTINCT
+        elif wolves == 0 and sheep > 0 and self._seen[1]:
+            reason = STOP_WOLVES_EXTINCT
+        elif self._count >= self._window and self._count % self._check_every == 0:
+            reason = self._check(self.window())
+        if reason is not None:
+            self.reason, self.turn = reason, turn
+        return reason
+
+    def export_state(self) -> tuple[dict[str, Any], np.ndarray]:
+        """compteurs et raison trouvée (valeurs JSON), puis tampon des effectifs"""
+        state = {"count": self._count, "seen": list(self._seen),
+                 "reason": self.reason, "turn": self.turn, "period": self.period}
+        return state, self._series.copy()
+
+    def import_state(self, state: dict[str, Any], series: np.ndarray) -> None:
+        """reprend l'état écrit par export_state (même fenêtre)"""
+        if series.shape != self._series.shape:
+            raise ValueError(f"fenêtre de {len(series)} tours pour un détecteur de {self._window} tours")
+        self._series[:] = series
+        self._count = int(state["count"])
+        self._seen = [bool(v) for v in state["seen"]]
+        self.reason, self.turn, self.period = state["reason"], state["turn"], state["period"]
+
+    def window(self) -> np.ndarray:
+        """effectifs des derniers tours (au plus `window`), du plus ancien au plus récent"""
+        if self._count < self._window:
+            return self._series[:self._count].copy()
+        return np.roll(self._series, -(self._count % self._window), axis=0)
+
+    def _check(self, x: np.ndarray) -> Optional[str]:
+        quarters = np.stack([q.mean(axis=0) for q in np.array_split(x, 4)])
+        drift = np.abs(quarters - x.mean(axis=0)).max(axis=0)
+        if np.all(x.std(axis=0) <= self._margin) and np.all(drift <= self._margin):
+            return STOP_FIXED_POINT
+        period = self._cycle_period(x[:, :2])
+        if period is not None:
+            self.period = period
+            return STOP_CYCLE
+        return None
+
+    def _cycle_period(self, x: np.ndarray) -> Optional[int]:
+        """période commune des colonnes de x (tours, k), ou None"""
+        z = x - x.mean(axis=0)
+        std = z.std(axis=0)
+        if np.any(std == 0):
+            return None
+        # pas de dérive : les moitiés de la fenêtre ont presque la même moyenne
+        half = len(x) // 2
+        if np.any(np.abs(z[:half].mean(axis=0) - z[half:].mean(axis=0)) > 0.5 * std):
+            return None
+
+        # corrélation de la fenêtre avec elle-même décalée de k tours, moyenne des colonnes
+        lags = range(1, len(x) // 3 + 1)
+        acf = np.empty(len(lags) + 1)
+        acf[0] = 1.0
+        for k in lags:
+            a, b = z[:-k], z[k:]
+            norm = np.sqrt((a * a).sum(axis=0) * (b * b).sum(axis=0))
+            acf[k] = float(np.mean((a * b).sum(axis=0) / np.where(norm > 0, norm, 1.0)))
+
+        # premier pic assez haut après un passage par une corrélation négative
+        crossed = np.flatnonzero(acf < 0)
+        if len(crossed) == 0:
+            return None
+        for k in range(max(MIN_PERIOD, int(crossed[0]) + 1), len(acf) - 1):
+            if acf[k] >= acf[k - 1] and acf[k] >= acf[k + 1]:
+                return k if acf[k] >= CYCLE_MIN_CORRELATION else None
+        return None
+
+
+def main() -> int:
+    # import local : simulation utilise ce module
+    from p25_hackathon.simulation import SimConfig, Simulation
+
+    parser = argparse.ArgumentParser(
+        prog="ecosystem-convergence",
+        description="Compare des simulations avec et sans arrêt anticipé : raisons d'arrêt et tours économisés.",
+    )
+    parser.add_argument("--size", type=int, default=30, help="Taille de la grille (défaut: 30)")
+    parser.add_argument("--seeds", type=int, default=20, help="Nombre de graines (défaut: 20)")
+    parser.add_argument("--turns", type=int, default=2000, help="Nombre maximal de tours (défaut: 2000)")
+    parser.add_argument("--window", type=int, default=200, help="Fenêtre du détecteur en tours (défaut: 200)")
+    parser.add_argument("--tolerance", type=float, default=0.02,
+                        help="Tolérance du point fixe, en fraction du nombre de cases (défaut: 0.02)")
+    args = parser.parse_args()
+
+    base = SimConfig(grid_size=args.size, max_turns=args.turns, grid_backend="arrays")
+    timings = {}
+    reasons: Counter[str] = Counter()
+    turns = {False: 0, True: 0}
+    for early in (False, True):
+        cfg = replace(base, stop_on_convergence=early, convergence_window=args.window,
+                      convergence_tolerance=args.tolerance)
+        t0 = time.perf_counter()
+        for seed in range(args.seeds):
+            sim = Simulation(cfg, seed=seed)
+            sim.initialize()
+            while not sim.should_stop():
+                sim.step()
+            turns[early] += sim.turn
+            if early:
+                reasons[str(sim.stop_reason)] += 1
+        timings[early] = time.perf_counter() - t0
+
+    print(f"{args.seeds} graines, {args.size}x{args.size}, au plus {args.turns} tours :")
+    print(f"  sans détecteur : {turns[False]:8d} tours en {timings[False]:7.2f} s")
+    print(f"  avec détecteur : {turns[True]:8d} tours en {timings[True]:7.2f} s "
+          f"({1 - turns[True] / max(turns[False], 1):.0%} de tours en moins)")
+    print("  raisons d'arrêt : " + ", ".join(f"{name} {n}" for name, n in reasons.most_common()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# Ensemble de K simulations (une graine chacune) avancées ensemble dans une pile de grilles (K, n, n)
+
+import argparse
+import csv
+import sys
+import time
+from dataclasses import dataclass, replace
+from typing import Optional, Sequence
+
+import numpy as np
+
+from p25_hackathon.kernels import SYNC_PHASES, SyncParams, Window, World, empty_world
+from p25_hackathon.grid import SHEEP, WOLF
+from p25_hackathon.rng import seed64
+from p25_hackathon.simulation import SimConfig, Simulation
+
+
+@dataclass
+class EnsembleResult:
+    """
+    Séries des effectifs de chaque réplique et statistiques d'ensemble,
+    du tour 0 (état initial) au dernier tour.
+    """
+    seeds: list[int]
+    series: np.ndarray    # (tours + 1, K, 3) : moutons, loups, herbe
+    mean: np.ndarray      # (tours + 1, 3)
+    variance: np.ndarray  # (tours + 1, 3), variance empirique (0 si K = 1)
+
+
+class Ensemble:
+    """
+    K répliques d'une même configuration, une graine chacune, stockées dans
+    des tableaux (K, n, n) et avancées ensemble par les phases du tour
+    synchrone (kernels.py) : chaque opération numpy traite les K grilles à
+    la fois.
+
+    Chaque réplique garde ses propres tirages (graine de la réplique, tour,
+    flux, case) : la réplique de graine s suit exactement la même
+    trajectoire que ParallelSimulation(config, seed=s).
+    """
+
+    def __init__(self, config: SimConfig, seeds: Sequence[int]) -> None:
+        if len(seeds) == 0:
+            raise ValueError("il faut au moins une graine")
+        self._cfg = config
+        self._seeds = [int(s) for s in seeds]
+        self._params = SyncParams.from_config(config)
+        n = config.grid_size
+        self._world = empty_world((len(self._seeds), n, n))
+        # une graine par grille de la pile, diffusée contre (n, n)
+        self._seed_stack = np.array([seed64(s) for s in self._seeds], dtype=np.uint64).reshape(-1, 1, 1)
+        self._turn = 0
+
+    @property
+    def turn(self) -> int:
+        return self._turn
+
+    @property
+    def world(self) -> World:
+        """état courant, tableaux (K, n, n)"""
+        return self._world
+
+    def initialize(self) -> None:
+        """placement initial de chaque réplique, identique à Simulation.initialize avec sa graine"""
+        n = self._cfg.grid_size
+        cfg = replace(self._cfg, grid_backend="arrays")
+        for k, seed in enumerate(self._seeds):
+            sim = Simulation(cfg, seed=seed)
+            sim.initialize()
+            state = sim.grid.export_state()
+            for name, arr in self._world.items():
+                arr[k] = state[name].reshape(n, n) if name in state else 0
+
+    def step(self) -> None:
+        """Exécute un tour complet dans toutes les répliques."""
+        self._turn += 1
+        window = Window(self._seed_stack, self._turn, 0, self._cfg.grid_size)
+        for _name, _halo, phase in SYNC_PHASES:
+            phase(self._world, window, self._params)
+
+    def counts(self) -> np.ndarray:
+        """effectifs (moutons, loups, herbe) de chaque réplique, forme (K, 3)"""
+        species = self._world["species"]
+        return np.stack([
+            np.count_nonzero(species == SHEEP, axis=(1, 2)),
+            np.count_nonzero(species == WOLF, axis=(1, 2)),
+            np.count_nonzero(self._world["grass"], axis=(1, 2)),
+        ], axis=1)
+
+    def run(self, turns: Optional[int] = None) -> EnsembleResult:
+        """avance de `turns` tours (max_turns par défaut) et renvoie séries et statistiques"""
+        turns = self._cfg.max_turns if turns is None else turns
+        series = np.empty((turns + 1, len(self._seeds), 3), dtype=np.int64)
+        series[0] = self.counts()
+        for t in range(1, turns + 1):
+            self.step()
+            series[t] = self.counts()
+        ddof = 1 if len(self._seeds) > 1 else 0
+        return EnsembleResult(
+            seeds=list(self._seeds),
+            series=series,
+            mean=series.mean(axis=1),
+            variance=series.var(axis=1, ddof=ddof),
+        )
+
+
+def write_summary_csv(path: str, result: EnsembleResult) -> None:
+    """moyenne et variance d'ensemble de chaque effectif, un tour par ligne"""
+    names = ("sheep", "wolves", "grass")
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["turn"] + [f"{n}_mean" for n in names] + [f"{n}_var" for n in names])
+        for t, (mean, var) in enumerate(zip(result.mean, result.variance)):
+            writer.writerow([t, *(f"{v:.3f}" for v in mean), *(f"{v:.3f}" for v in var)])
+
+
+def main() -> int:
+    # import local : parallel n'est utile qu'à la vérification
+    from p25_hackathon.parallel import ParallelSimulation
+
+    parser = argparse.ArgumentParser(
+        prog="ecosystem-ensemble",
+        description="Avance K répliques (graines) d'une configuration ensemble et résume moyenne et variance.",
+    )
+    parser.add_argument("--size", type=int, default=100, help="Taille n de la grille (défaut: 100)")
+    parser.add_argument("--sheep", type=float, default=0.10, help="Densité initiale de moutons (défaut: 0.10)")
+    parser.add_argument("--wolves", type=float, default=0.01, help="Densité initiale de loups (défaut: 0.01)")
+    parser.add_argument("--turns", type=int, default=100, help="Nombre de tours (défaut: 100)")
+    parser.add_argument("--replicas", type=int, default=32, help="Nombre de répliques K (défaut: 32)")
+    parser.add_argument("--seed", type=int, default=0, help="Graine de la première réplique, les suivantes +1 (défaut: 0)")
+    parser.add_argument("--out", default=None, help="Fichier CSV des moyennes et variances par tour")
+    parser.add_argument("--check", action="store_true",
+                        help="Comparer la première réplique à une simulation seule et chronométrer celle-ci")
+    args = parser.parse_args()
+
+    area = args.size * args.size
+    cfg = SimConfig(grid_size=args.size, initial_sheep=int(area * args.sheep),
+                    initial_wolves=int(area * args.wolves), max_turns=args.turns)
+    seeds = list(range(args.seed, args.seed + args.replicas))
+
+    ensemble = Ensemble(cfg, seeds)
+    ensemble.initialize()
+    t0 = time.perf_counter()
+    result = ensemble.run()
+    elapsed = time.perf_counter() - t0
+    per_replica = elapsed / len(seeds)
+
+    step = max(1, args.turns // 10)
+    print(f"{len(seeds)} répliques {args.size}x{args.size}, {args.turns} tours : {elapsed:.2f} s "
+          f"({per_replica * 1e3:.1f} ms par réplique)")
+    print(f"{'tour':>6s} {'moutons':>18s} {'loups':>18s} {'herbe':>18s}")
+    for t in range(0, args.turns + 1, step):
+        cols = [f"{m:9.1f} ±{np.sqrt(v):7.1f}" for m, v in zip(result.mean[t], result.variance[t])]
+        print(f"{t:6d} " + " ".join(f"{c:>18s}" for c in cols))
+    if args.out:
+        write_summary_csv(args.out, result)
+        print(f"Moyennes et variances écrites dans '{args.out}'.")
+
+    if args.check:
+        # même trajectoire qu'une simulation synchrone seule avec la même graine
+        with ParallelSimulation(cfg, seed=seeds[0], workers=1) as single:
+            single.initialize()
+            alone = [single.count()]
+            for _ in range(args.turns):
+                single.step()
+                alone.append(single.count())
+        identical = bool(np.array_equal(np.array(alone), result.series[:, 0, :]))
+        print(f"Première réplique : {'identique' if identical else 'DIFFÉRENTE'} à ParallelSimulation")
+
+        # coût d'une simulation ordinaire (Simulation.step) pour la même configuration
+        sim = Simulation(cfg, seed=seeds[0])
+        sim.initialize()
+        t0 = time.perf_counter()
+        for _ in range(args.turns):
+            sim.step()
+        standalone = time.perf_counter() - t0
+        print(f"Simulation seule : {standalone * 1e3:.1f} ms ; une réplique coûte "
+              f"{per_replica / standalone:.1%} de ce temps")
+        if not identical:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# Moteur de tour fusionné : âges, morts et reproductions en quelques passes numpy
+
+import argparse
+import sys
+import time
+from dataclasses import asdict, replace
+from typing import Callable, Optional
+
+import numpy as np
+
+from p25_hackathon.arraygrid import ArrayGrid
+from p25_hackathon.grid import EMPTY, SHEEP, WOLF
+from p25_hackathon.instrumentation import StatsCollector, TurnStats
+from p25_hackathon.livingbeings import Animal, Sheep, Wolf
+from p25_hackathon.simulation import (
+    STREAM_SHEEP_BIRTH,
+    STREAM_SHEEP_BIRTH_ORDER,
+    STREAM_WOLF_BIRTH,
+    STREAM_WOLF_BIRTH_ORDER,
+    SimConfig,
+    Simulation,
+)
+
+
+class FusedSimulation(Simulation):
+    """
+    Même simulation que Simulation (backend "arrays"), tour regroupé en
+    quatre phases au lieu de six :
+    - "start" : vieillissement de tous les animaux d'un coup, puis herbe ;
+    - "sheep", "wolves" : inchangées ;
+    - "end" : morts repérées et retirées en bloc, puis reproductions, en ne
+      parcourant que les parents au-dessus du seuil.
+
+    Les phases où l'ordre de passage ne change rien (âges, morts) ne
+    construisent plus de liste de positions : le générateur avance comme
+    s'il avait mélangé une liste de même longueur (un tampon réutilisé), si
+    bien que pour une graine donnée, chaque tour est identique à celui de
+    Simulation.step.
+    """
+
+    def __init__(self, config: SimConfig, seed: Optional[int]) -> None:
+        if config.grid_backend != "arrays":
+            raise ValueError("le moteur fusionné demande le backend 'arrays'")
+        super().__init__(config, seed)
+        self._order: list[int] = []
+
+    def _phases(self) -> list[tuple[str, Callable[[], None]]]:
+        phases = dict(super()._phases())
+        return [
+            ("start", self._start),
+            ("sheep", phases["sheep"]),
+            ("wolves", phases["wolves"]),
+            ("end", self._end),
+        ]
+
+    def _arrays(self) -> ArrayGrid:
+        assert isinstance(self._grid, ArrayGrid)
+        return self._grid
+
+    def _skip_order(self, k: int) -> None:
+        """
+        avance le générateur comme le mélange d'une liste de k positions dont
+        l'ordre ne sert pas (le mode "counter" ne tire rien pour un ordre)
+        """
+        if self._counter is not None:
+            return
+        order = self._order
+        if len(order) > k:
+            del order[k:]
+        else:
+            order.extend(range(len(order), k))
+        self._rng.shuffle(order)
+
+    def _ordered(self, cells: np.ndarray, stream: int) -> np.ndarray:
+        """cases (croissantes) dans l'ordre de passage que leur donnerait Simulation"""
+        order = cells.tolist()
+        if self._counter is None:
+            self._rng.shuffle(order)
+        else:
+            self._counter.shuffle_indices(self._turn, stream, order)
+        return np.array(order, dtype=np.int64)
+
+    def _start(self) -> None:
+        world = self._arrays().world()
+        s, w, _g = self._grid.count()
+        world["age"][world["species"] != EMPTY] += 1
+        self._skip_order(s + w)
+        self._tick_grass()
+
+    def _end(self) -> None:
+        grid = self._arrays()
+        cfg = self._cfg
+        world = grid.world()
+        species, energy, age = (world[name].reshape(-1) for name in ("species", "energy", "age"))
+
+        # Morts : un seul masque pour les deux espèces
+        s, w, _g = grid.count()
+        self._skip_order(s + w)
+        sheep, wolves = species == SHEEP, species == WOLF
+        starved = (sheep | wolves) & (energy <= 0)
+        too_old = (sheep & (age > cfg.sheep_max_age)) | (wolves & (age > cfg.wolf_max_age))
+        grid.remove_animals(np.flatnonzero(starved | too_old))
+        if self._stats is not None:
+            self._stats.deaths_starvation += int(np.count_nonzero(starved))
+            self._stats.deaths_old_age += int(np.count_nonzero(too_old & ~starved))
+
+        # Reproductions : seuls les parents assez riches sont parcourus, dans l'ordre de passage
+        self._births(grid, SHEEP, Sheep, cfg.sheep_reproduction_threshold, cfg.sheep_initial_energy,
+                     STREAM_SHEEP_BIRTH_ORDER, STREAM_SHEEP_BIRTH)
+        self._births(grid, WOLF, Wolf, cfg.wolf_reproduction_threshold, cfg.wolf_initial_energy,
+                     STREAM_WOLF_BIRTH_ORDER, STREAM_WOLF_BIRTH)
+
+    def _births(self, grid: ArrayGrid, code: int, kind: type[Animal], threshold: int, baby_energy: int,
+                order_stream: int, birth_stream: int) -> None:
+        world = grid.world()
+        species, energy = world["species"].reshape(-1), world["energy"].reshape(-1)
+        order = self._ordered(np.flatnonzero(species == code), order_stream)
+        n = self._cfg.grid_size
+        # l'énergie d'un parent ne change qu'à son propre passage : le filtre peut se faire d'avance
+        for i in order[energy[order] > threshold].tolist():
+            energy[i] -= self._cfg.reproduction_energy_cost
+            x, y = i % n, i // n
+            born = grid.try_reproduce((x, y), kind(energy=baby_energy), self._draws(birth_stream, x, y))
+            self._count_birth(born)
+
+
+def _snapshot(sim: Simulation, stats: Optional[TurnStats]) -> tuple[object, ...]:
+    world = sim.grid.export_state()
+    counters = {k: v for k, v in asdict(stats).items() if k not in ("turn", "phase_s")} if stats else {}
+    return (world["grass"].tobytes(), world["timer"].tobytes(), world["species"].tobytes(),
+            world["energy"].tobytes(), world["age"].tobytes(), sim.grid.count(), tuple(sorted(counters.items())))
+
+
+def check_equivalence(config: SimConfig, seed: int, turns: int) -> Optional[int]:
+    """premier tour où FusedSimulation diffère de Simulation (None si aucun)"""
+    sims = [Simulation(config, seed=seed), FusedSimulation(config, seed=seed)]
+    last: list[Optional[TurnStats]] = [None, None]
+    for k, sim in enumerate(sims):
+        sim.initialize()
+        sim.set_observer(lambda stats, k=k: last.__setitem__(k, stats))
+    for _ in range(turns):
+        for sim in sims:
+            sim.step()
+        if _snapshot(sims[0], last[0]) != _snapshot(sims[1], last[1]):
+            return sims[0].turn
+        if sims[0].should_stop():
+            break
+    return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="ecosystem-fused",
+        description="Vérifie que le moteur fusionné reproduit Simulation.step tour par tour, puis compare les vitesses.",
+    )
+    parser.add_argument("--size", type=int, default=40, help="Taille de la grille des vérifications (défaut: 40)")
+    parser.add_argument("--seeds", type=int, default=10, help="Nombre de graines vérifiées (défaut: 10)")
+    parser.add_argument("--turns", type=int, default=100, help="Tours par vérification (défaut: 100)")
+    parser.add_argument("--bench-size", type=int, default=300, help="Taille de la grille du chronométrage (défaut: 300)")
+    parser.add_argument("--bench-turns", type=int, default=20, help="Tours chronométrés (défaut: 20)")
+    args = parser.parse_args()
+
+    area = args.size * args.size
+    base = SimConfig(grid_size=args.size, initial_sheep=area // 6, initial_wolves=area // 60,
+                     max_turns=args.turns, grid_backend="arrays")
+    ok = True
+    for rng_mode in ("shared", "counter"):
+        for batched in (False, True):
+            cfg = replace(base, rng_mode=rng_mode, batched_phases=batched)
+            failures = [(seed, turn) for seed in range(args.seeds)
+                        if (turn := check_equivalence(cfg, seed, args.turns)) is not None]
+            ok &= not failures
+            label = f"rng={rng_mode}, phases {'groupées' if batched else 'une à une'}"
+            print(f"{label:34s} : " + ("identique" if not failures else
+                                       f"DIFFÉRENT (graine, tour) {failures[:5]}"))
+
+    n = args.bench_size
+    bench = SimConfig(grid_size=n, initial_sheep=n * n // 4, initial_wolves=n * n // 40,
+                      max_turns=args.bench_turns, grid_backend="arrays")
+    for cls in (Simulation, FusedSimulation):
+        sim = cls(bench, seed=0)
+        sim.initialize()
+        collector = StatsCollector()
+        sim.set_observer(collector)
+        t0 = time.perf_counter()
+        for _ in range(args.bench_turns):
+            sim.step()
+        elapsed = time.perf_counter() - t0
+        # temps hors phases moutons et loups, qui sont les mêmes dans les deux moteurs
+        other = sum(t for name, t in collector.total.phase_s.items() if name not in ("sheep", "wolves"))
+        print(f"{cls.__name__:16s} {n}x{n} : {args.bench_turns / elapsed:7.2f} tours/s, "
+              f"{other * 1e3 / args.bench_turns:7.1f} ms/tour hors phases moutons et loups")
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,146 @@
 import random
 from dataclasses import dataclass
-from typing import Optional
+from typing import Callable, Optional
+
+import numpy as np
 
 from p25_hackathon.livingbeings import GrassCell, Sheep, Wolf, Animal
 
+# Codes d'espèce (cell_codes, tableaux des backends numpy)
+EMPTY = 0
+SHEEP = 1
+WOLF = 2
+
+# Couleurs ANSI (codes SGR) des symboles de la grille ; "." garde la couleur par défaut
+ANSI_COLORS = {"S": "92", "W": "91", "#": "32"}
+
+# Tirages uniformes dans [0, 1) des cases données (indices y * n + x), chacun
+# ne dépendant que de sa case (CounterRNG.cells pour un tour et un flux fixés)
+CellDraws = Callable[[np.ndarray], np.ndarray]
+
+# Symbole affiché pour chaque code de case (voir Grid.cell_codes)
+_CODE_SYMBOLS = np.frombuffer(b".#SSWW", dtype=np.uint8)
+
+
+def batch_rng(rng: random.Random) -> np.random.Generator:
+    """
+    Générateur numpy pour les tirages groupés, dérivé du générateur de la
+    simulation : avec une graine fixée, les tirages sont reproductibles.
+    """
+    return np.random.default_rng(rng.getrandbits(64))
+
+
+def codes_to_rows(codes: np.ndarray, size: int) -> list[str]:
+    """lignes de symboles (comme Grid.symbol_rows) à partir des codes de cases"""
+    frame = _CODE_SYMBOLS[codes].tobytes().decode("ascii")
+    return [frame[y * size:(y + 1) * size] for y in range(size)]
+
 @dataclass
 class Cell:
     """On représente une cellule de la grille par de l'herbe et éventuellement un animal."""
     grass: GrassCell
     animal: Optional[Animal] = None
 
+class FreeCells:
+    """
+    Ensemble des cases libres (indices y * n + x) avec tirage, ajout et
+    retrait en O(1) : tableau compact des cases libres + position de chaque
+    case dans ce tableau (-1 si occupée). Un retrait échange la case avec la
+    dernière du tableau. Indices sur 32 bits : 8 octets par case en tout.
+    """
+
+    def __init__(self, n_cells: int) -> None:
+        if n_cells > np.iinfo(np.int32).max:
+            raise ValueError("trop de cases pour des indices sur 32 bits")
+        self._cells = np.arange(n_cells, dtype=np.int32)
+        self._slot = np.arange(n_cells, dtype=np.int32)
+        self._count = n_cells
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        return self._cells.nbytes + self._slot.nbytes
+
+    def __contains__(self, i: int) -> bool:
+        return bool(self._slot[i] >= 0)
+
+    def add(self, i: int) -> None:
+        if self._slot[i] >= 0:
+            return
+        self._cells[self._count] = i
+        self._slot[i] = self._count
+        self._count += 1
+
+    def discard(self, i: int) -> None:
+        k = self._slot[i]
+        if k < 0:
+            return
+        self._count -= 1
+        last = self._cells[self._count]
+        self._cells[k] = last
+        self._slot[last] = k
+        self._slot[i] = -1
+
+    def update(self, removed: np.ndarray, added: np.ndarray) -> None:
+        """
+        retire puis ajoute des cases en bloc (déplacements groupés) : le
+        tableau est recompacté en une passe numpy au lieu d'un échange par case
+        """
+        cells = self._cells[:self._count]
+        self._slot[removed] = -1
+        kept = cells[self._slot[cells] >= 0]
+        added = np.unique(added[self._slot[added] < 0])
+        k = len(kept) + len(added)
+        self._cells[:len(kept)] = kept
+        self._cells[len(kept):k] = added
+        self._slot[self._cells[:k]] = np.arange(k)
+        self._count = k
+
+    def cells(self) -> np.ndarray:
+        """cases libres, dans l'ordre interne du tableau (copie)"""
+        return self._cells[:self._count].copy()
+
+    def restore(self, cells: np.ndarray) -> None:
+        """remplace le contenu par les cases données, dans cet ordre"""
+        k = len(cells)
+        self._slot[:] = -1
+        self._cells[:k] = cells
+        self._slot[cells] = np.arange(k)
+        self._count = k
+
+    def sample(self, k: int, rng: random.Random) -> list[int]:
+        """
+        Tire k cases libres distinctes (au plus le nombre de cases libres) et
+        les retire de l'ensemble : Fisher-Yates partiel depuis la fin du
+        tableau, en une seule passe.
+        """
+        k = min(k, self._count)
+        cells, slot = self._cells, self._slot
+        for t in range(self._count - 1, self._count - 1 - k, -1):
+            j = rng.randrange(t + 1)
+            a, b = cells[j], cells[t]
+            cells[j], cells[t] = b, a
+            slot[b], slot[a] = j, t
+        self._count -= k
+        picked = cells[self._count:self._count + k].tolist()
+        slot[picked] = -1
+        return picked
+
+
 class Grid:
-    """La grille de taille (n,n), pas de diagonales"""
+    """La grille de taille (n,n), pas de diagonales
+
+    Les positions des animaux (par espèce) et la quantité d'herbe sont tenues
+    à jour par les méthodes de la grille : `count` est en O(1) et
+    `positions_of` ne coûte que le nombre d'animaux. En mode debug, chaque
+    appel à `count` est comparé à un parcours complet de la grille.
+    Les cases libres sont indexées aussi, pour placer des animaux au hasard
+    sans parcourir la grille.
+    """
 
-    def __init__(self, size: int, grass_regrow_time: int) -> None:
+    def __init__(self, size: int, grass_regrow_time: int, debug: bool = False) -> None:
         if size <= 0:
             raise ValueError("la taille doit être > 0")
         if grass_regrow_time <= 0:
@@ -21,7 +148,20 @@ class Grid:
 
         self._size = size
         self._grass_regrow_time = grass_regrow_time
-        
+        self._debug = debug
+
+        # positions occupées par espèce (indices y * n + x) et effectif d'herbe,
+        # maintenus au fil des modifications
+        self._occupied: dict[type[Animal], set[int]]
+        self._free: FreeCells
+        self._n_grass: int
+        self._reset_indexes()
+
+        self._init_storage()
+
+    def _init_storage(self) -> None:
+        """alloue les cellules (redéfini par les autres backends)"""
+        size = self._size
         self._cells: list[list[Cell]] = [
             [
                Cell(grass=GrassCell(present=False)) for i in range(size)
@@ -29,6 +169,25 @@ class Grid:
             for i in range(size)
         ]
 
+    def _kind_of(self, animal: Optional[Animal]) -> Optional[type[Animal]]:
+        """espèce indexée de l'animal"""
+        for kind in self._occupied:
+            if isinstance(animal, kind):
+                return kind
+        return None
+
+    def _track(self, kind: Optional[type[Animal]], i: int) -> None:
+        """enregistre un animal arrivé sur la case i"""
+        if kind is not None:
+            self._occupied[kind].add(i)
+        self._free.discard(i)
+
+    def _untrack(self, kind: Optional[type[Animal]], i: int) -> None:
+        """oublie un animal parti de la case i"""
+        if kind is not None:
+            self._occupied[kind].discard(i)
+        self._free.add(i)
+
     @property
     def size(self) -> int:
         """taille de self"""
@@ -52,51 +211,75 @@ class Grid:
         return self._cells[y][x]
 
     def place_grass_random(self, coverage: float, rng: random.Random) -> None:
-        """ """
-        for y in range(self._size):
-            for x in range(self._size):
-                if rng.random() < coverage:
-                    self.cell(x, y).grass.present = True
+        """herbe au hasard, un tirage par case (mêmes tirages que ArrayGrid)"""
+        n = self._size
+        draws = batch_rng(rng).random(n * n, dtype=np.float32)
+        for i in np.flatnonzero(draws < coverage).tolist():
+            g = self.cell(i % n, i // n).grass
+            if not g.present:
+                g.present = True
+                self._n_grass += 1
 
     def spawn_animal_random(self, animal: Animal, rng: random.Random) -> bool:
         """Met un animal sur une case libre, si il y en a"""
-        positionslibres=[]
-        for y in range(self._size):
-            for x in range(self._size):
-                if self.cell(x,y).animal is None:
-                    positionslibres.append((x,y))
-        
-        if not positionslibres:
-            return False
-
-        x, y = rng.choice(positionslibres)
+        return self.spawn_animals_random([animal], rng) == 1
+
+    def spawn_animals_random(self, animals: list[Animal], rng: random.Random) -> int:
+        """Met chaque animal sur une case libre distincte ; renvoie le nombre d'animaux placés"""
+        cells = self._free.sample(len(animals), rng)
+        n = self._size
+        for animal, i in zip(animals, cells):
+            self._place(animal, i % n, i // n)
+        return len(cells)
+
+    def _place(self, animal: Animal, x: int, y: int) -> None:
+        """pose un animal sur une case libre"""
         self.cell(x, y).animal = animal
-        return True
+        self._track(self._kind_of(animal), y * self._size + x)
 
     def positions_of(self, kind: type[Animal]) -> list[tuple[int, int]]:
-        """ liste des positions d'un type particulier d'animaux  """
-        l: list[tuple[int, int]] = []
-        for y in range(self._size):
-            for x in range(self._size):
-                a = self.cell(x, y).animal
-                if isinstance(a,kind):
-                    l.append((x, y))
-        return l
-
-    def tick_grass(self, grass_growth_probability: float, rng: random.Random) -> None:
+        """ liste des positions d'un type particulier d'animaux (ordre de lecture de la grille) """
+        indices: list[int] = []
+        for k, positions in self._occupied.items():
+            if issubclass(k, kind):
+                indices.extend(positions)
+        indices.sort()
+        n = self._size
+        return [(i % n, i // n) for i in indices]
+
+    def tick_grass(self, grass_growth_probability: float, rng: random.Random,
+                   draws: Optional[CellDraws] = None) -> None:
         """Met à jour l'herbe : décrémente les timers de repousse et fait pousser aléatoirement sur les cellules libres
+
+        Avec `draws`, le tirage de chaque case lui est propre ; sinon un
+        tableau de tirages est pris dans `rng`.
         """
         if not (0.0 <= grass_growth_probability <= 1.0):
             raise ValueError("La proba doit être dans [0, 1] !")
-
-        for y in range(self._size):
-            for x in range(self._size):
-                c = self.cell(x, y)
-                c.grass.tick()
-
-                if c.grass.present==False and c.grass.regrow_timer == 0:
-                    if rng.random() < grass_growth_probability:
-                        c.grass.present = True
+        n = self._size
+
+        # Repousse : seules les cases dont le timer tourne sont parcourues
+        for i in list(self._regrowing):
+            g = self.cell(i % n, i // n).grass
+            was_present = g.present
+            g.tick()
+            if g.regrow_timer == 0:
+                self._regrowing.discard(i)
+            if g.present and not was_present:
+                self._n_grass += 1
+
+        # Pousse spontanée : un tableau de tirages pour tout le tour (mêmes
+        # tirages que ArrayGrid), seules les cases tirées sont examinées
+        if grass_growth_probability > 0.0:
+            if draws is None:
+                u = batch_rng(rng).random(n * n, dtype=np.float32)
+            else:
+                u = draws(np.arange(n * n))
+            for i in np.flatnonzero(u < grass_growth_probability).tolist():
+                g = self.cell(i % n, i // n).grass
+                if not g.present and g.regrow_timer == 0:
+                    g.present = True
+                    self._n_grass += 1
 
     def move_animal(self, dep: tuple[int, int], arr: tuple[int, int]) -> bool:
         """déplace un animal si la destination est libre"""
@@ -115,11 +298,17 @@ class Grid:
 
         dest.animal = source.animal
         source.animal = None
+        kind = self._kind_of(dest.animal)
+        self._untrack(kind, fy * self._size + fx)
+        self._track(kind, ty * self._size + tx)
         return True
 
     def remove_animal(self, x: int, y: int) -> None:
         """enlève un animal mort"""
-        self.cell(x, y).animal = None
+        c = self.cell(x, y)
+        if c.animal is not None:
+            self._untrack(self._kind_of(c.animal), y * self._size + x)
+        c.animal = None
 
     def try_reproduce(self, parent: tuple[int, int], baby: Animal, rng: random.Random) -> bool:
         """assure la reproduction des espèces"""
@@ -133,17 +322,20 @@ class Grid:
             return False
 
         bx, by = rng.choice(options)
-        self.cell(bx, by).animal = baby
+        self._place(baby, bx, by)
         return True
 
     def eat_grass_if_present(self, x: int, y: int) -> bool:
         c = self.cell(x, y)
         if c.grass.present:
             c.grass.eat(regrow_time=self._grass_regrow_time)
+            self._n_grass -= 1
+            self._regrowing.add(y * self._size + x)
             return True
         return False
 
-    def render_ascii(self, use_color: bool) -> str:
+    def symbol_rows(self) -> list[str]:
+        """lignes de symboles sans couleur : S mouton, W loup, # herbe, . vide"""
         lignes: list[str] = []
         for y in range(self._size):
             row_chars: list[str] = []
@@ -156,12 +348,113 @@ class Grid:
                     ch = "S"
                 elif isinstance(c.animal, Wolf):
                     ch = "W"
-                row_chars.append(self._colorize(ch, use_color))
+                row_chars.append(ch)
 
             lignes.append("".join(row_chars))
+        return lignes
+
+    def export_state(self) -> dict[str, np.ndarray]:
+        """
+        état complet de la grille en tableaux plats (indice y * n + x) :
+        herbe, timer de repousse, espèce, énergie, âge, et ordre de l'index
+        des cases libres (pour qu'une reprise tire exactement les mêmes cases)
+        """
+        n = self._size
+        state = {
+            "grass": np.zeros(n * n, dtype=np.bool_),
+            "timer": np.zeros(n * n, dtype=np.uint16),
+            "species": np.zeros(n * n, dtype=np.uint8),
+            "energy": np.zeros(n * n, dtype=np.int32),
+            "age": np.zeros(n * n, dtype=np.int32),
+        }
+        for y in range(n):
+            for x in range(n):
+                i = y * n + x
+                c = self.cell(x, y)
+                state["grass"][i] = c.grass.present
+                state["timer"][i] = c.grass.regrow_timer
+                if c.animal is not None:
+                    state["species"][i] = SHEEP if isinstance(c.animal, Sheep) else WOLF
+                    state["energy"][i] = c.animal.energy
+                    state["age"][i] = c.animal.age
+        state["free"] = self._free.cells()
+        return state
+
+    def import_state(self, state: dict[str, np.ndarray]) -> None:
+        """remplace tout le contenu de la grille par un état produit par export_state"""
+        n = self._size
+        if state["species"].shape != (n * n,):
+            raise ValueError(f"état de taille {state['species'].shape} pour une grille {n}x{n}")
+
+        self._reset_indexes()
+        self._init_storage()
+        kinds: dict[int, type[Animal]] = {SHEEP: Sheep, WOLF: Wolf}
+        for i in range(n * n):
+            y, x = divmod(i, n)
+            c = self.cell(x, y)
+            c.grass.present = bool(state["grass"][i])
+            c.grass.regrow_timer = int(state["timer"][i])
+            self._n_grass += c.grass.present
+            if c.grass.regrow_timer > 0:
+                self._regrowing.add(i)
+            code = int(state["species"][i])
+            if code != EMPTY:
+                self._place(kinds[code](energy=int(state["energy"][i]), age=int(state["age"][i])), x, y)
+        self._free.restore(state["free"])
+
+    def _reset_indexes(self) -> None:
+        self._occupied = {Sheep: set(), Wolf: set()}
+        self._free = FreeCells(self._size * self._size)
+        self._n_grass = 0
+        # cases dont l'herbe repousse (timer > 0), parcourues par tick_grass
+        self._regrowing: set[int] = set()
+
+    def cell_codes(self) -> np.ndarray:
+        """
+        code de chaque case (indice y * n + x), sur un octet :
+        bit 0 = herbe, bits 1-2 = espèce (EMPTY, SHEEP ou WOLF)
+        """
+        n = self._size
+        codes = np.zeros(n * n, dtype=np.uint8)
+        for y in range(n):
+            for x in range(n):
+                if self.cell(x, y).grass.present:
+                    codes[y * n + x] = 1
+        codes[list(self._occupied[Sheep])] |= SHEEP << 1
+        codes[list(self._occupied[Wolf])] |= WOLF << 1
+        return codes
+
+    def cell_energies(self) -> np.ndarray:
+        """énergie de l'animal de chaque case (indice y * n + x), 0 si la case est vide"""
+        n = self._size
+        energies = np.zeros(n * n, dtype=np.int32)
+        for cells in self._occupied.values():
+            for i in cells:
+                y, x = divmod(i, n)
+                animal = self.cell(x, y).animal
+                assert animal is not None
+                energies[i] = animal.energy
+        return energies
+
+    def render_ascii(self, use_color: bool) -> str:
+        lignes = self.symbol_rows()
+        if use_color:
+            lignes = ["".join(self._colorize(ch, use_color) for ch in row) for row in lignes]
         return "\n".join(lignes)
 
     def count(self) -> tuple[int, int, int]:
+        """effectifs (moutons, loups, herbe), en O(1)"""
+        counts = (len(self._occupied[Sheep]), len(self._occupied[Wolf]), self._n_grass)
+        if self._debug:
+            scanned = self._count_scan()
+            if scanned != counts:
+                raise RuntimeError(f"compteurs incohérents : {counts} au lieu de {scanned}")
+            if len(self._free) + counts[0] + counts[1] != self._size * self._size:
+                raise RuntimeError(f"index des cases libres incohérent : {len(self._free)} cases libres")
+        return counts
+
+    def _count_scan(self) -> tuple[int, int, int]:
+        """recompte tout en parcourant la grille (vérification en mode debug)"""
         sheep = 0
         wolf = 0
         grass = 0
@@ -184,13 +477,10 @@ class Grid:
         if not use_color:
             return ch
 
-        if ch == "S":
-            return f"\x1b[92m{ch}\x1b[0m"
-        if ch == "W":
-            return f"\x1b[91m{ch}\x1b[0m"
-        if ch == "#":
-            return f"\x1b[32m{ch}\x1b[0m"
-        return ch
+        color = ANSI_COLORS.get(ch)
+        if color is None:
+            return ch
+        return f"\x1b[{color}m{ch}\x1b[0m"
 
 def main() -> None:
     print("Testing Grid...")
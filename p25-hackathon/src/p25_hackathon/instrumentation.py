@@ -0,0 +1,54 @@
+from dataclasses import dataclass, field, fields
+
+
+@dataclass
+class TurnStats:
+    """
+    Mesures d'un tour (ou cumul de plusieurs tours) :
+    temps passé dans chaque phase et compteurs d'événements
+    """
+    turn: int = 0
+    phase_s: dict[str, float] = field(default_factory=dict)
+
+    moves_attempted: int = 0
+    moves_failed: int = 0          # aucune case libre autour
+    grass_eaten: int = 0
+    sheep_eaten: int = 0
+    deaths_starvation: int = 0
+    deaths_old_age: int = 0
+    births: int = 0
+    births_failed: int = 0         # reproduction sans case libre pour le petit
+
+    def add(self, other: "TurnStats") -> None:
+        """ajoute les mesures d'un autre tour"""
+        self.turn = max(self.turn, other.turn)
+        for name, seconds in other.phase_s.items():
+            self.phase_s[name] = self.phase_s.get(name, 0.0) + seconds
+        for f in fields(self):
+            if f.name not in ("turn", "phase_s"):
+                setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
+
+class StatsCollector:
+    """Observateur qui cumule les TurnStats de chaque tour (à passer à Simulation.set_observer)."""
+
+    def __init__(self) -> None:
+        self.turns = 0
+        self.total = TurnStats()
+
+    def __call__(self, stats: TurnStats) -> None:
+        self.turns += 1
+        self.total.add(stats)
+
+    def summary(self) -> str:
+        """résumé lisible : temps moyen par phase et compteurs cumulés"""
+        total = self.total
+        elapsed = sum(total.phase_s.values())
+        lines = [f"{self.turns} tours, {elapsed:.3f} s dans les phases"]
+        for name, seconds in total.phase_s.items():
+            share = seconds / elapsed if elapsed > 0 else 0.0
+            lines.append(f"  {name:13s} {seconds * 1e3 / max(self.turns, 1):9.3f} ms/tour  {share:6.1%}")
+        for f in fields(total):
+            if f.name not in ("turn", "phase_s"):
+                lines.append(f"  {f.name:18s} {getattr(total, f.name)}")
+        return "\n".join(lines)
@@ -1,14 +1,65 @@
+import numpy as np
 import pyxel
 from typing import Optional, Any
 
+from p25_hackathon.grid import SHEEP, WOLF
+from p25_hackathon.pipeline import Frame, FramePipeline
+from p25_hackathon.replay import Replay, ReplayRecorder
 from p25_hackathon.simulation import SimConfig, Simulation
+from p25_hackathon.stats import StatsSink, make_stats_sink
+
+
+def paint_cells(world: pyxel.Image, codes: np.ndarray, previous: Optional[np.ndarray], n: int, s: int) -> None:
+    """
+    Dessine dans `world` les cases dont le code (voir Grid.cell_codes) diffère
+    de `previous` ; toutes les cases si `previous` est None.
+    """
+    if previous is None:
+        changed = np.arange(codes.size)
+    else:
+        changed = np.flatnonzero(codes != previous)
+
+    for i, code in zip(changed.tolist(), codes[changed].tolist()):
+        y, x = divmod(i, n)
+        px = x * s
+        py_ = y * s
+
+        # Couleurs Pyxel (0..15). Choix simples:
+        # 0=black, 3=green, 7=white, 8=red, 1=darkblue/dark
+        if code & 1:
+            base = 3   # herbe (vert)
+        else:
+            base = 4   # vide (marron, requested by user)
+
+        # Case
+        world.rect(px, py_, s, s, base)
+
+        # Animal par-dessus (rectangle plus petit)
+        species = code >> 1
+        if species == SHEEP:
+            world.rect(px + s // 4, py_ + s // 4, s // 2, s // 2, 7) # Sheep: White
+        elif species == WOLF:
+            world.rect(px + s // 4, py_ + s // 4, s // 2, s // 2, 0) # Wolf: Black
 
 
 class PyxelApp:
-    """Interface Pyxel pour afficher et piloter la simulation."""
+    """Interface Pyxel pour afficher et piloter la simulation.
 
-    def __init__(self, cfg: SimConfig, seed: Optional[int], cell_px: int, fps: int) -> None:
+    Le monde est dessiné dans une image en cache, mise à jour seulement quand
+    le tour change et seulement pour les cases modifiées ; chaque frame se
+    contente de la copier à l'écran. Le texte du bandeau est aussi calculé
+    une fois par tour.
+
+    Avec `pipelined`, la simulation tourne dans un thread (FramePipeline) et
+    chaque frame affiche la dernière image publiée : un tour lent ne fait
+    plus saccader l'affichage.
+    """
+
+    def __init__(self, cfg: SimConfig, seed: Optional[int], cell_px: int, fps: int,
+                 recorder: Optional[ReplayRecorder] = None, stats: Optional[StatsSink] = None,
+                 pipelined: bool = False) -> None:
         self.cfg = cfg
+        self.recorder = recorder
         self.seed = seed
         self.cell_px = cell_px
         self.hud_h = 16  # hauteur bandeau texte
@@ -17,18 +68,28 @@ class PyxelApp:
         # Convert delay (seconds) to frames. Ensure at least 1 frame wait.
         self.update_interval = max(1, int(fps * cfg.delay_s))
 
-        self.stats = {
-            "turns": [],
-            "sheep": [],
-            "wolves": [],
-            "grass": []
-        }
+        self.stats = stats if stats is not None else make_stats_sink()
 
         self.sim = Simulation(cfg, seed=seed)
         self.sim.initialize()
+
+        # Mode pipeline : producteur en arrière-plan et dernière image reçue
+        self.pipelined = pipelined
+        self._pipeline: Optional[FramePipeline] = None
+        self._frame: Optional[Frame] = None
+
+        # Cache du monde : image (créée après pyxel.init) et codes des cases dessinées
+        self._world: Optional[pyxel.Image] = None
+        self._world_codes: Optional[np.ndarray] = None
+        self._world_turn = -1
+        # Cache du bandeau : (tour, ligne de texte sans le statut, simulation terminée)
+        self._hud: Optional[tuple[int, str, bool]] = None
         
-        # We record initial state
-        self._record_stats()
+        # We record initial state (en mode pipeline, c'est le producteur qui enregistre)
+        if pipelined:
+            self._start_pipeline()
+        else:
+            self._record_stats()
 
     def start(self) -> None:
         w = self.cfg.grid_size * self.cell_px
@@ -42,8 +103,33 @@ class PyxelApp:
         # Note: pyxel.run ne retourne pas avant la fermeture de la fenêtre.
 
     def reset(self) -> None:
+        self.close()
+        # le journal de rejeu ne couvre que la première simulation : une
+        # nouvelle partie repart du tour 0, que Replay ne saurait pas indexer
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
         self.sim = Simulation(self.cfg, seed=self.seed)
         self.sim.initialize()
+        self._invalidate_caches()
+        if self.pipelined:
+            self._start_pipeline()
+
+    def close(self) -> None:
+        """arrête le producteur du mode pipeline"""
+        if self._pipeline is not None:
+            self._pipeline.stop()
+            self._pipeline = None
+
+    def _start_pipeline(self) -> None:
+        self._pipeline = FramePipeline(self.sim, on_turn=lambda _sim: self._record_stats())
+        self._pipeline.start()
+        self._frame = self._pipeline.latest()
+
+    def _invalidate_caches(self) -> None:
+        self._world_codes = None
+        self._world_turn = -1
+        self._hud = None
 
     def update(self) -> None:
         # Quitter
@@ -66,6 +152,10 @@ class PyxelApp:
         step_once = pyxel.btnp(pyxel.KEY_N)
 
         # Simulation
+        if self._pipeline is not None:
+            self._update_pipelined(step_once)
+            return
+
         if (not self.paused) or step_once:
             # Control speed: update only if step_once (manual) OR enough frames passed
             self.frame_counter += 1
@@ -77,12 +167,27 @@ class PyxelApp:
                 else:
                     self.paused = True
 
+    def _update_pipelined(self, step_once: bool) -> None:
+        """pause et pas à pas transmis au producteur, puis dernière image publiée"""
+        assert self._pipeline is not None
+        if self._pipeline.paused != self.paused:
+            self._pipeline.pause(self.paused)
+        if step_once:
+            self._pipeline.advance()
+        frame = self._pipeline.latest(0)
+        if frame is not None:
+            self._frame = frame
+            if frame.last:
+                self.paused = True
+
+    def _shown_turn(self) -> int:
+        return self._frame.turn if self._frame is not None else self.sim.turn
+
     def _record_stats(self) -> None:
         s, w, g = self.sim.grid.count()
-        self.stats["turns"].append(self.sim.turn)
-        self.stats["sheep"].append(s)
-        self.stats["wolves"].append(w)
-        self.stats["grass"].append(g)
+        if self.recorder is not None:
+            self.recorder.record(self.sim.turn, self.sim.grid.cell_codes(), (s, w, g))
+        self.stats.record(self.sim.turn, (s, w, g))
 
 
     def draw(self) -> None:
@@ -93,56 +198,134 @@ class PyxelApp:
         self._draw_hud()
 
     def _draw_world(self) -> None:
-        grid = self.sim.grid
-        s = self.cell_px
-
-        # Imports locaux (évite d'imposer Pyxel partout)
-        from p25_hackathon.livingbeings import Sheep, Wolf  # noqa: PLC0415
-
-        for y in range(self.cfg.grid_size):
-            for x in range(self.cfg.grid_size):
-                cell = grid.cell(x, y)
-
-                # Couleurs Pyxel (0..15). Choix simples:
-                # 0=black, 3=green, 7=white, 8=red, 1=darkblue/dark
-                if cell.grass.present:
-                    base = 3   # herbe (vert)
-                else:
-                    base = 4   # vide (marron, requested by user)
-
+        if self._world is None:
+            size = self.cfg.grid_size * self.cell_px
+            self._world = pyxel.Image(size, size)
 
-                px = x * s
-                py_ = y * s
+        if self._world_turn != self._shown_turn():
+            self._refresh_world(self._world)
+            self._world_turn = self._shown_turn()
 
-                # Case
-                pyxel.rect(px, py_, s, s, base)
-
-                # Animal par-dessus (rectangle plus petit)
-                a = cell.animal
-                if isinstance(a, Sheep):
-                    pyxel.rect(px + s // 4, py_ + s // 4, s // 2, s // 2, 7) # Sheep: White
-                elif isinstance(a, Wolf):
-                    pyxel.rect(px + s // 4, py_ + s // 4, s // 2, s // 2, 0) # Wolf: Black
+        size = self.cfg.grid_size * self.cell_px
+        pyxel.blt(0, 0, self._world, 0, 0, size, size)
 
+    def _refresh_world(self, world: pyxel.Image) -> None:
+        """redessine dans l'image en cache les cases qui ont changé depuis le dernier tour dessiné"""
+        codes = self._frame.codes if self._frame is not None else self.sim.grid.cell_codes()
+        paint_cells(world, codes, self._world_codes, self.cfg.grid_size, self.cell_px)
+        self._world_codes = codes
 
     def _draw_hud(self) -> None:
-        sheep, wolves, grass = self.sim.grid.count()
+        if self._hud is None or self._hud[0] != self._shown_turn():
+            if self._frame is not None:
+                (sheep, wolves, grass), stopped = self._frame.counts, self._frame.last
+            else:
+                (sheep, wolves, grass), stopped = self.sim.grid.count(), self.sim.should_stop()
+            text = f"Turn {self._shown_turn()}/{self.cfg.max_turns} S:{sheep} W:{wolves} G:{grass}"
+            self._hud = (self._shown_turn(), text, stopped)
+
+        _turn, text, stopped = self._hud
         status = "PAUSE" if self.paused else "RUN"
-        if self.sim.should_stop():
+        if stopped:
             status = "STOP"
 
         y = self.cfg.grid_size * self.cell_px + 2
 
-        line1 = f"Turn {self.sim.turn}/{self.cfg.max_turns} S:{sheep} W:{wolves} G:{grass} {status}"
+        line1 = f"{text} {status}"
         line2 = "SPACE pause | N step | R reset | ESC quit"
 
         pyxel.text(2, y, line1, 7)
         pyxel.text(2, y + 8, line2, 6)
 
 
-def run_pyxel(cfg: SimConfig, seed: Optional[int], cell_size: int = 8, fps: int = 30) -> dict[str, list[Any]]:
+class ReplayApp:
+    """Relecture Pyxel d'un journal de rejeu : lecture avant/arrière, vitesse et saut à un tour."""
+
+    SPEEDS = (1, 2, 5, 10, 50, 100)
+
+    def __init__(self, replay: Replay, start: int, cell_px: int, fps: int) -> None:
+        self.replay = replay
+        self.cell_px = cell_px
+        self.hud_h = 16
+        self.fps = fps
+        self.paused = False
+        self.direction = 1
+        self.speed_idx = 0
+        self.replay.seek(replay.index_of_turn(start))
+
+        self._world: Optional[pyxel.Image] = None
+        self._world_codes: Optional[np.ndarray] = None
+
+    def start(self) -> None:
+        size = self.replay.size * self.cell_px
+        pyxel.init(size, size + self.hud_h, title="P25 Hackathon — Rejeu", fps=self.fps)
+        pyxel.run(self.update, self.draw)
+
+    def update(self) -> None:
+        if pyxel.btnp(pyxel.KEY_ESCAPE):
+            pyxel.quit()
+        if pyxel.btnp(pyxel.KEY_SPACE):
+            self.paused = not self.paused
+        if pyxel.btnp(pyxel.KEY_B):
+            self.direction = -self.direction
+        if pyxel.btnp(pyxel.KEY_UP):
+            self.speed_idx = min(self.speed_idx + 1, len(self.SPEEDS) - 1)
+        if pyxel.btnp(pyxel.KEY_DOWN):
+            self.speed_idx = max(self.speed_idx - 1, 0)
+
+        # Sauts : flèches = un tour, PAGE = un dixième du journal, HOME/END = extrémités
+        last = len(self.replay) - 1
+        jump = max(1, len(self.replay) // 10)
+        if pyxel.btnp(pyxel.KEY_RIGHT, repeat=4):
+            self.replay.step(1)
+        elif pyxel.btnp(pyxel.KEY_LEFT, repeat=4):
+            self.replay.step(-1)
+        elif pyxel.btnp(pyxel.KEY_PAGEUP):
+            self.replay.seek(self.replay.index + jump)
+        elif pyxel.btnp(pyxel.KEY_PAGEDOWN):
+            self.replay.seek(self.replay.index - jump)
+        elif pyxel.btnp(pyxel.KEY_HOME):
+            self.replay.seek(0)
+        elif pyxel.btnp(pyxel.KEY_END):
+            self.replay.seek(last)
+        elif not self.paused:
+            self.replay.step(self.direction * self.SPEEDS[self.speed_idx])
+            if self.replay.index in (0, last):
+                self.paused = True
+
+    def draw(self) -> None:
+        pyxel.cls(0)
+        size = self.replay.size * self.cell_px
+        if self._world is None:
+            self._world = pyxel.Image(size, size)
+        paint_cells(self._world, self.replay.codes, self._world_codes, self.replay.size, self.cell_px)
+        self._world_codes = self.replay.codes.copy()
+        pyxel.blt(0, 0, self._world, 0, 0, size, size)
+
+        sheep, wolves, grass = self.replay.counts[self.replay.index]
+        turn = self.replay.turns[self.replay.index]
+        status = "PAUSE" if self.paused else ("<<" if self.direction < 0 else ">>")
+        line1 = f"Turn {turn}/{self.replay.turns[-1]} S:{sheep} W:{wolves} G:{grass} {status} x{self.SPEEDS[self.speed_idx]}"
+        line2 = "SPACE pause | B reverse | UP/DOWN speed | LEFT/RIGHT step | PGUP/PGDN/HOME/END seek"
+        pyxel.text(2, size + 2, line1, 7)
+        pyxel.text(2, size + 10, line2, 6)
+
+
+def run_pyxel_replay(replay: Replay, start: int = 0, cell_size: int = 8, fps: int = 30) -> None:
+    """Point d'entrée Pyxel pour rejouer un journal."""
+    app = ReplayApp(replay, start=start, cell_px=cell_size, fps=fps)
+    try:
+        app.start()
+    except (SystemExit, KeyboardInterrupt):
+        pass
+
+
+def run_pyxel(cfg: SimConfig, seed: Optional[int], cell_size: int = 8, fps: int = 30,
+              recorder: Optional[ReplayRecorder] = None, stats: Optional[StatsSink] = None,
+              pipelined: bool = False) -> dict[str, list[Any]]:
     """Point d'entrée Pyxel (semblable à run_pygame)."""
-    app = PyxelApp(cfg=cfg, seed=seed, cell_px=cell_size, fps=fps)
+    app = PyxelApp(cfg=cfg, seed=seed, cell_px=cell_size, fps=fps, recorder=recorder, stats=stats,
+                   pipelined=pipelined)
     try:
         print("DEBUG: Lancement de Pyxel...")
         app.start()
@@ -154,5 +337,7 @@ def run_pyxel(cfg: SimConfig, seed: Optional[int], cell_size: int = 8, fps: int
     except Exception as e:
         print(f"DEBUG: Exception inattendue : {e}")
     finally:
-        print(f"DEBUG: Retour des stats ({len(app.stats['turns'])} tours).")
-        return app.stats
\ No newline at end of file
+        app.close()
+        series = app.stats.series()
+        print(f"DEBUG: Retour des stats ({len(series['turns'])} points).")
+        return series
\ No newline at end of file
@@ -0,0 +1,312 @@
+"""
+Tour synchrone vectorisé : toutes les cases sont traitées en même temps.
+
+Les règles sont celles de Simulation.step (mêmes phases, dans le même ordre),
+mais les animaux d'une espèce agissent ensemble au lieu d'un par un :
+chacun choisit une case voisine, et quand plusieurs visent la même case, la
+plus forte priorité (tirée au hasard) l'emporte. Les perdants retentent leur
+chance au tour de résolution suivant (MOVE_ROUNDS).
+
+Les tableaux ont la forme (..., H, W) : la grille entière (n, n), une bande
+de lignes (voir parallel.py) ou une pile de K grilles (K, n, n). Chaque
+tirage aléatoire dépend seulement de (graine, tour, flux, case) : le
+résultat ne dépend ni de l'ordre de calcul, ni du découpage de la grille.
+"""
+
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING, Callable, Union
+
+import numpy as np
+
+from p25_hackathon.grid import EMPTY, SHEEP, WOLF
+from p25_hackathon.rng import cell_uniform
+
+if TYPE_CHECKING:
+    from p25_hackathon.simulation import SimConfig
+
+# Voisins (dx, dy), dans le même ordre que Grid.neighbors4
+NEIGHBORS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+OPPOSITE = (1, 0, 3, 2)
+NO_DIR = -1
+
+# Nombre de tours de résolution des conflits pour les déplacements
+MOVE_ROUNDS = 2
+
+# Lignes voisines lues par une phase pour calculer une case : choix de la
+# cible (±1), résolution des conflits sur la cible (±2), départ de la case
+# d'origine si elle a gagné (±3)
+HALO = 3
+
+# Champs d'un monde (mêmes noms que Grid.export_state) ; "flag" marque les
+# animaux qui ont déjà agi dans la phase en cours
+FIELDS = {
+    "grass": np.bool_,
+    "timer": np.uint16,
+    "species": np.uint8,
+    "energy": np.int32,
+    "age": np.int32,
+    "flag": np.uint8,
+}
+
+World = dict[str, np.ndarray]
+
+
+@dataclass(frozen=True)
+class Window:
+    """
+    Position d'un morceau de monde dans la grille : lignes row0.. d'une grille
+    de largeur n, au tour `turn`. `seed` est diffusé contre (H, W).
+    """
+    seed: Union[int, np.ndarray]
+    turn: int
+    row0: int
+    n: int
+
+    def uniform(self, stream: int, shape: tuple[int, ...]) -> np.ndarray:
+        h, w = shape[-2:]
+        cells = (np.arange(self.row0, self.row0 + h, dtype=np.int64)[:, None] * self.n
+                 + np.arange(w, dtype=np.int64)[None, :])
+        return np.broadcast_to(cell_uniform(self.seed, self.turn, stream, cells), shape)
+
+    def at(self, stream: int, cells: np.ndarray) -> np.ndarray:
+        """tirages de quelques cases seulement (indices plats dans la fenêtre)"""
+        return cell_uniform(self.seed, self.turn, stream, cells + self.row0 * self.n)
+
+
+# --- Noyaux ---
+
+def shift(a: np.ndarray, dx: int, dy: int, fill: Union[int, float, bool]) -> np.ndarray:
+    """b[..., y, x] = a[..., y + dy, x + dx], `fill` hors du tableau"""
+    out = np.full_like(a, fill)
+    h, w = a.shape[-2:]
+    dst_y = slice(max(0, -dy), h - max(0, dy))
+    dst_x = slice(max(0, -dx), w - max(0, dx))
+    src_y = slice(max(0, dy), h - max(0, -dy))
+    src_x = slice(max(0, dx), w - max(0, -dx))
+    out[..., dst_y, dst_x] = a[..., src_y, src_x]
+    return out
+
+
+def neighbor_options(mask: np.ndarray) -> np.ndarray:
+    """options[d] = le voisin dans la direction d vérifie `mask` (forme (4, ..., H, W))"""
+    return np.stack([shift(mask, dx, dy, False) for dx, dy in NEIGHBORS])
+
+
+def choose(options: np.ndarray, u: np.ndarray) -> np.ndarray:
+    """
+    direction tirée uniformément parmi les options de chaque case (comme
+    rng.choice sur la liste des voisins), NO_DIR s'il n'y en a aucune
+    """
+    k = options.sum(axis=0, dtype=np.int8)
+    pick = np.minimum((u * k).astype(np.int8), np.maximum(k - 1, 0))
+    # la direction choisie est l'option de rang `pick` (au plus 4 : boucle sur les directions)
+    out = np.full(k.shape, NO_DIR, dtype=np.int8)
+    seen = np.zeros(k.shape, dtype=np.int8)
+    for d in range(len(NEIGHBORS)):
+        np.copyto(out, np.int8(d), where=options[d] & (seen == pick))
+        seen += options[d]
+    return out
+
+
+def claims(direction: np.ndarray, priority: np.ndarray) -> np.ndarray:
+    """
+    pour chaque case, direction du voisin qui l'obtient parmi ceux qui la
+    visent (plus forte priorité ; à égalité, le premier dans l'ordre des
+    voisins), NO_DIR si personne ne la vise
+    """
+    best = np.full(priority.shape, -1.0)
+    winner = np.full(direction.shape, NO_DIR, dtype=np.int8)
+    for d, (dx, dy) in enumerate(NEIGHBORS):
+        contender = shift(direction, dx, dy, NO_DIR) == OPPOSITE[d]
+        p = shift(priority, dx, dy, -1.0)
+        better = contender & (p > best)
+        best = np.where(better, p, best)
+        winner[better] = d
+    return winner
+
+
+def won(direction: np.ndarray, winner_from: np.ndarray) -> np.ndarray:
+    """les cases dont l'animal a obtenu la case visée"""
+    out = np.zeros(direction.shape, dtype=np.bool_)
+    for d, (dx, dy) in enumerate(NEIGHBORS):
+        out |= (direction == d) & (shift(winner_from, dx, dy, NO_DIR) == OPPOSITE[d])
+    return out
+
+
+def gather(field: np.ndarray, winner_from: np.ndarray) -> np.ndarray:
+    """valeur de `field` sur la case du gagnant, pour chaque case obtenue (0 ailleurs)"""
+    out = np.zeros_like(field)
+    for d, (dx, dy) in enumerate(NEIGHBORS):
+        m = winner_from == d
+        out[m] = shift(field, dx, dy, 0)[m]
+    return out
+
+
+def apply_moves(w: World, direction: np.ndarray, winner_from: np.ndarray, energy_gain: int = 0) -> np.ndarray:
+    """
+    déplace les animaux gagnants vers leur case (ce qui s'y trouvait est
+    remplacé : mouton mangé) ; ils sont marqués comme ayant agi. Renvoie les
+    cases d'origine des gagnants.
+    """
+    moved = won(direction, winner_from)
+    arrived = winner_from != NO_DIR
+    for name in ("species", "energy", "age"):
+        incoming = gather(w[name], winner_from)
+        w[name][moved] = 0
+        w[name][arrived] = incoming[arrived]
+    w["flag"][moved] = 0
+    w["flag"][arrived] = 1
+    if energy_gain:
+        w["energy"][arrived] += energy_gain
+    return moved
+
+
+# --- Phases d'un tour synchrone ---
+
+@dataclass(frozen=True)
+class SyncParams:
+    """Paramètres de SimConfig utilisés par les phases synchrones."""
+    grass_growth_probability: float
+    grass_regrowth_time: int
+    sheep_initial_energy: int
+    wolf_initial_energy: int
+    sheep_energy_from_grass: int
+    wolf_energy_from_sheep: int
+    sheep_energy_loss_per_turn: int
+    wolf_energy_loss_per_turn: int
+    sheep_reproduction_threshold: int
+    wolf_reproduction_threshold: int
+    reproduction_energy_cost: int
+    sheep_max_age: int
+    wolf_max_age: int
+
+    @classmethod
+    def from_config(cls, config: "SimConfig") -> "SyncParams":
+        return cls(**{f.name: getattr(config, f.name) for f in fields(cls)})
+
+
+# Flux de tirages (un par usage, voir cell_uniform)
+STREAM_GRASS = 1
+STREAM_SHEEP_MOVE = 10     # + 2 * tour de résolution (choix), + 1 (priorité)
+STREAM_HUNT = 30
+STREAM_WOLF_MOVE = 40
+STREAM_SHEEP_BIRTH = 60
+STREAM_WOLF_BIRTH = 70
+
+
+def phase_start(w: World, win: Window, params: SyncParams) -> None:
+    """vieillissement et herbe (local)"""
+    animal = w["species"] != EMPTY
+    w["age"][animal] += 1
+
+    timer, grass = w["timer"], w["grass"]
+    regrowing = timer > 0
+    timer[regrowing] -= 1
+    ready = timer == 0
+    grown = regrowing & ready
+    if params.grass_growth_probability > 0.0:
+        grown |= ready & (win.uniform(STREAM_GRASS, grass.shape) < params.grass_growth_probability)
+    grass |= grown & ~grass
+    w["flag"][:] = 0
+
+
+def _move_round(w: World, win: Window, species: int, stream: int, prefer_grass: bool) -> None:
+    """un tour de résolution : les animaux qui n'ont pas encore agi visent une case libre voisine"""
+    active = (w["species"] == species) & (w["flag"] == 0)
+    options = neighbor_options(w["species"] == EMPTY)
+    if prefer_grass:
+        grassy = options & neighbor_options(w["grass"])
+        options = np.where(grassy.any(axis=0), grassy, options)
+
+    shape = active.shape
+    direction = np.where(active, choose(options, win.uniform(stream, shape)), NO_DIR).astype(np.int8)
+    # sans case libre, l'animal reste sur place : il a agi
+    w["flag"][active & (direction == NO_DIR)] = 1
+    apply_moves(w, direction, claims(direction, win.uniform(stream + 1, shape)))
+
+
+def _sheep_move(round_: int) -> Callable[[World, Window, SyncParams], None]:
+    def phase(w: World, win: Window, params: SyncParams) -> None:
+        _move_round(w, win, SHEEP, STREAM_SHEEP_MOVE + 2 * round_, prefer_grass=True)
+    return phase
+
+
+def _wolf_move(round_: int) -> Callable[[World, Window, SyncParams], None]:
+    def phase(w: World, win: Window, params: SyncParams) -> None:
+        _move_round(w, win, WOLF, STREAM_WOLF_MOVE + 2 * round_, prefer_grass=False)
+    return phase
+
+
+def phase_sheep_eat(w: World, win: Window, params: SyncParams) -> None:
+    """les moutons mangent l'herbe de leur case et perdent de l'énergie (local)"""
+    sheep = w["species"] == SHEEP
+    ate = sheep & w["grass"]
+    w["grass"][ate] = False
+    w["timer"][ate] = params.grass_regrowth_time
+    w["energy"][ate] += params.sheep_energy_from_grass
+    w["energy"][sheep] -= params.sheep_energy_loss_per_turn
+    w["flag"][:] = 0
+
+
+def phase_hunt(w: World, win: Window, params: SyncParams) -> None:
+    """chaque loup vise un mouton voisin ; chaque mouton est mangé par au plus un loup"""
+    wolves = w["species"] == WOLF
+    options = neighbor_options(w["species"] == SHEEP)
+    shape = wolves.shape
+    direction = np.where(wolves, choose(options, win.uniform(STREAM_HUNT, shape)), NO_DIR).astype(np.int8)
+    apply_moves(w, direction, claims(direction, win.uniform(STREAM_HUNT + 1, shape)),
+                energy_gain=params.wolf_energy_from_sheep)
+
+
+def phase_dead(w: World, win: Window, params: SyncParams) -> None:
+    """perte d'énergie des loups, puis retrait des morts (local)"""
+    sheep = w["species"] == SHEEP
+    wolves = w["species"] == WOLF
+    w["energy"][wolves] -= params.wolf_energy_loss_per_turn
+    dead = ((sheep | wolves) & (w["energy"] <= 0)) \
+        | (sheep & (w["age"] > params.sheep_max_age)) \
+        | (wolves & (w["age"] > params.wolf_max_age))
+    for name in ("species", "energy", "age"):
+        w[name][dead] = 0
+    w["flag"][:] = 0
+
+
+def _birth(species: int, threshold_attr: str, energy_attr: str, stream: int) -> Callable[[World, Window, SyncParams], None]:
+    def phase(w: World, win: Window, params: SyncParams) -> None:
+        parents = (w["species"] == species) & (w["energy"] > getattr(params, threshold_attr))
+        w["energy"][parents] -= params.reproduction_energy_cost
+        options = neighbor_options(w["species"] == EMPTY)
+        shape = parents.shape
+        direction = np.where(parents, choose(options, win.uniform(stream, shape)), NO_DIR).astype(np.int8)
+        born = claims(direction, win.uniform(stream + 1, shape)) != NO_DIR
+        w["species"][born] = species
+        w["energy"][born] = getattr(params, energy_attr)
+        w["age"][born] = 0
+    return phase
+
+
+Phase = Callable[[World, Window, SyncParams], None]
+
+# Phases d'un tour : (nom, lignes voisines lues, fonction)
+SYNC_PHASES: list[tuple[str, int, Phase]] = [
+    ("start", 0, phase_start),
+    *((f"sheep_move{r}", HALO, _sheep_move(r)) for r in range(MOVE_ROUNDS)),
+    ("sheep_eat", 0, phase_sheep_eat),
+    ("hunt", HALO, phase_hunt),
+    *((f"wolf_move{r}", HALO, _wolf_move(r)) for r in range(MOVE_ROUNDS)),
+    ("dead", 0, phase_dead),
+    ("sheep_birth", HALO, _birth(SHEEP, "sheep_reproduction_threshold", "sheep_initial_energy", STREAM_SHEEP_BIRTH)),
+    ("wolf_birth", HALO, _birth(WOLF, "wolf_reproduction_threshold", "wolf_initial_energy", STREAM_WOLF_BIRTH)),
+]
+
+
+def empty_world(shape: tuple[int, ...]) -> World:
+    """monde vide de forme (..., H, W)"""
+    return {name: np.zeros(shape, dtype=dtype) for name, dtype in FIELDS.items()}
+
+
+def world_counts(w: World) -> tuple[int, int, int]:
+    """effectifs (moutons, loups, herbe)"""
+    return (int(np.count_nonzero(w["species"] == SHEEP)),
+            int(np.count_nonzero(w["species"] == WOLF)),
+            int(np.count_nonzero(w["grass"])))
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# Tour synchrone réparti sur plusieurs processus, par bandes de lignes en mémoire partagée
+
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional
+
+import numpy as np
+
+from p25_hackathon.kernels import FIELDS, SYNC_PHASES, SyncParams, Window, World, world_counts
+from p25_hackathon.rng import seed64
+from p25_hackathon.simulation import SimConfig, Simulation
+
+
+class _SharedWorld:
+    """
+    Deux mondes (n, n) en mémoire partagée : chaque phase lit l'un et écrit
+    l'autre, puis les rôles s'échangent.
+    """
+
+    def __init__(self, shm: SharedMemory, n: int) -> None:
+        self.shm = shm
+        self.n = n
+        self.buffers: list[World] = [{}, {}]
+        offset = 0
+        for b in (0, 1):
+            for name, dtype in FIELDS.items():
+                arr = np.ndarray((n, n), dtype=dtype, buffer=shm.buf, offset=offset)
+                self.buffers[b][name] = arr
+                offset += arr.nbytes
+
+    @staticmethod
+    def nbytes(n: int) -> int:
+        return 2 * sum(np.dtype(dtype).itemsize for dtype in FIELDS.values()) * n * n
+
+    def release(self) -> None:
+        self.buffers = [{}, {}]
+        self.shm.close()
+
+
+# Monde partagé vu par le processus courant (travailleur ou processus principal)
+_SHARED: Optional[_SharedWorld] = None
+_PARAMS: Optional[SyncParams] = None
+_SEED = 0
+
+
+def _attach(name: str, n: int, params: SyncParams, seed: int) -> None:
+    """initialisation d'un processus travailleur"""
+    global _SHARED, _PARAMS, _SEED
+    _SHARED = _SharedWorld(SharedMemory(name=name, track=False), n)
+    _PARAMS = params
+    _SEED = seed
+
+
+# Lignes voisines à lire pour enchaîner toutes les phases d'un tour sans
+# synchronisation : chaque phase fausse `halo` lignes de plus au bord du bloc
+TURN_HALO = sum(halo for _name, halo, _fn in SYNC_PHASES)
+
+
+def _run_stripe(turn: int, src: int, y0: int, y1: int) -> None:
+    """
+    Calcule les lignes [y0, y1) d'un tour complet : lit la bande élargie de
+    TURN_HALO lignes de chaque côté dans le monde `src`, y enchaîne toutes
+    les phases, puis écrit les lignes de la bande dans l'autre monde. Les
+    lignes du bord, faussées faute de voisins, ne sont pas recopiées.
+    """
+    assert _SHARED is not None and _PARAMS is not None
+    n = _SHARED.n
+    lo, hi = max(0, y0 - TURN_HALO), min(n, y1 + TURN_HALO)
+    world = {name: arr[lo:hi].copy() for name, arr in _SHARED.buffers[src].items()}
+    for _name, _halo, fn in SYNC_PHASES:
+        fn(world, Window(_SEED, turn, lo, n), _PARAMS)
+    for name, arr in _SHARED.buffers[1 - src].items():
+        arr[y0:y1] = world[name][y0 - lo:y1 - lo]
+
+
+def stripes(n: int, parts: int) -> list[tuple[int, int]]:
+    """découpe les lignes 0..n en `parts` bandes contiguës (au plus n)"""
+    parts = max(1, min(parts, n))
+    bounds = [n * k // parts for k in range(parts + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+class ParallelSimulation:
+    """
+    Simulation au tour synchrone (voir kernels.py) répartie sur `workers`
+    processus, chacun calculant une bande de lignes.
+
+    Chaque travailleur joue toutes les phases d'un tour sur sa bande élargie
+    des lignes voisines (TURN_HALO), lues dans le monde du tour précédent :
+    une seule barrière par tour, au prix de quelques lignes calculées en
+    double. Un déplacement, une chasse ou une naissance qui traverse une
+    frontière est donc décidé de la même façon des deux côtés, et comme chaque tirage ne dépend que de
+    (graine, tour, flux, case), le résultat pour une graine est identique
+    quel que soit le nombre de travailleurs.
+
+    L'état initial est celui de Simulation.initialize (même graine).
+    """
+
+    def __init__(self, config: SimConfig, seed: Optional[int], workers: int = 1) -> None:
+        if workers <= 0:
+            raise ValueError("il faut au moins un travailleur")
+        self._cfg = config
+        self._seed = seed if seed is not None else random.SystemRandom().getrandbits(63)
+        self._params = SyncParams.from_config(config)
+        self._turn = 0
+        self._current = 0
+
+        n = config.grid_size
+        self._stripes = stripes(n, workers)
+        shm = SharedMemory(create=True, size=_SharedWorld.nbytes(n))
+        self._shared = _SharedWorld(shm, n)
+        for arr in self._shared.buffers[0].values():
+            arr[:] = 0
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        if len(self._stripes) > 1:
+            self._pool = ProcessPoolExecutor(
+                max_workers=len(self._stripes),
+                initializer=_attach,
+                initargs=(shm.name, n, self._params, seed64(self._seed)),
+            )
+        else:
+            global _SHARED, _PARAMS, _SEED
+            _SHARED, _PARAMS, _SEED = self._shared, self._params, seed64(self._seed)
+
+    def __enter__(self) -> "ParallelSimulation":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """arrête les travailleurs et libère la mémoire partagée"""
+        global _SHARED
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if _SHARED is self._shared:
+            _SHARED = None
+        shm = self._shared.shm
+        self._shared.release()
+        shm.unlink()
+
+    @property
+    def turn(self) -> int:
+        return self._turn
+
+    @property
+    def world(self) -> World:
+        """état courant (vues (n, n) sur la mémoire partagée)"""
+        return self._shared.buffers[self._current]
+
+    def initialize(self) -> None:
+        """placement initial, identique à Simulation.initialize avec la même graine"""
+        sim = Simulation(replace(self._cfg, grid_backend="arrays"), seed=self._seed)
+        sim.initialize()
+        state = sim.grid.export_state()
+        n = self._cfg.grid_size
+        for name, arr in self.world.items():
+            arr[:] = state[name].reshape(n, n) if name in state else 0
+
+    def step(self) -> None:
+        """Exécute un tour complet."""
+        self._turn += 1
+        src = self._current
+        if self._pool is None:
+            _run_stripe(self._turn, src, 0, self._cfg.grid_size)
+        else:
+            futures = [self._pool.submit(_run_stripe, self._turn, src, y0, y1) for y0, y1 in self._stripes]
+            for f in futures:
+                f.result()
+        self._current = 1 - src
+
+    def count(self) -> tuple[int, int, int]:
+        """effectifs (moutons, loups, herbe)"""
+        return world_counts(self.world)
+
+    def cell_codes(self) -> np.ndarray:
+        """codes des cases, comme Grid.cell_codes"""
+        w = self.world
+        return (w["grass"].astype(np.uint8) | (w["species"] << 1)).ravel()
+
+    def should_stop(self) -> bool:
+        if self._turn >= self._cfg.max_turns:
+            return True
+        s, w, _g = self.count()
+        return (s + w) == 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="ecosystem-parallel",
+        description="Tour synchrone réparti sur plusieurs processus : vitesse et reproductibilité.",
+    )
+    parser.add_argument("--size", type=int, default=1000, help="Taille n de la grille (défaut: 1000)")
+    parser.add_argument("--sheep", type=float, default=0.10, help="Densité initiale de moutons (défaut: 0.10)")
+    parser.add_argument("--wolves", type=float, default=0.01, help="Densité initiale de loups (défaut: 0.01)")
+    parser.add_argument("--turns", type=int, default=20, help="Nombre de tours (défaut: 20)")
+    parser.add_argument("--seed", type=int, default=0, help="Graine (défaut: 0)")
+    parser.add_argument("--workers", type=int, action="append", default=[],
+                        help="Nombre de processus (répétable pour comparer, défaut: 1 et 4)")
+    args = parser.parse_args()
+
+    area = args.size * args.size
+    cfg = SimConfig(grid_size=args.size, initial_sheep=int(area * args.sheep),
+                    initial_wolves=int(area * args.wolves), max_turns=args.turns)
+
+    reference: Optional[np.ndarray] = None
+    for workers in args.workers or [1, 4]:
+        with ParallelSimulation(cfg, seed=args.seed, workers=workers) as sim:
+            sim.initialize()
+            t0 = time.perf_counter()
+            for _ in range(args.turns):
+                sim.step()
+            elapsed = time.perf_counter() - t0
+            state = np.concatenate((sim.cell_codes(), sim.world["energy"].ravel(), sim.world["age"].ravel()))
+            identical = reference is None or bool(np.array_equal(state, reference))
+            reference = state if reference is None else reference
+            print(f"{workers:3d} processus : {args.turns / elapsed:8.2f} tours/s  "
+                  f"effectifs {sim.count()}  {'identique' if identical else 'DIFFÉRENT'}")
+            if not identical:
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Simulation et affichage découplés : la simulation tourne dans un thread
+(producteur) et publie une image par tour dans une file bornée ; l'affichage
+(consommateur) ne prend que la plus récente et jette les autres.
+
+Le producteur ne bloque jamais sur la file : quand elle est pleine, l'image
+la plus ancienne est jetée. La simulation avance donc à sa propre vitesse,
+et un affichage lent saute des tours au lieu de la ralentir.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+
+from p25_hackathon.simulation import Simulation
+
+
+@dataclass(frozen=True)
+class Frame:
+    """image publiée après un tour : codes des cases (Grid.cell_codes) et effectifs"""
+    turn: int
+    codes: np.ndarray
+    counts: tuple[int, int, int]
+    last: bool  # la simulation est terminée, plus aucune image ne suivra
+
+
+class FramePipeline:
+    """
+    Fait tourner `sim` dans un thread jusqu'à sim.should_stop() (ou stop()).
+
+    `on_turn(sim)` est appelé dans ce thread pour l'état initial puis après
+    chaque tour, avant la publication de l'image : c'est là que vont les
+    traitements qui doivent voir tous les tours (effectifs, journaux,
+    sauvegardes). Le thread appelant ne doit plus toucher à `sim` tant que
+    le pipeline tourne ; il lit les images avec latest().
+    """
+
+    def __init__(self, sim: Simulation, capacity: int = 2,
+                 on_turn: Optional[Callable[[Simulation], None]] = None) -> None:
+        if capacity < 1:
+            raise ValueError("la file doit pouvoir contenir au moins une image")
+        self._sim = sim
+        self._on_turn = on_turn
+        self._frames: "queue.Queue[Frame]" = queue.Queue(maxsize=capacity)
+        self._thread = threading.Thread(target=self._run, name="simulation", daemon=True)
+        self._stop = threading.Event()
+        # pause : le producteur attend, sauf pour les tours accordés par advance()
+        self._cond = threading.Condition()
+        self._paused = False
+        self._steps = 0
+        self._error: Optional[BaseException] = None
+        # chaque compteur n'est modifié que par un thread (producteur, consommateur)
+        self._published = 0
+        self._returned = 0
+
+    def __enter__(self) -> "FramePipeline":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    @property
+    def dropped(self) -> int:
+        """
+        images publiées jamais rendues par latest() : jetées quand la file
+        était pleine, sautées par latest() au profit d'une plus récente, ou
+        encore en file à l'arrêt
+        """
+        return self._published - self._returned
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """arrête le producteur après le tour en cours et attend sa fin"""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread.is_alive():
+            self._thread.join()
+        self._raise_error()
+
+    def pause(self, paused: bool = True) -> None:
+        with self._cond:
+            self._paused = paused
+            self._steps = 0
+            self._cond.notify_all()
+
+    def advance(self, turns: int = 1) -> None:
+        """pendant une pause, laisse le producteur jouer `turns` tours"""
+        with self._cond:
+            self._steps += turns
+            self._cond.notify_all()
+
+    def latest(self, timeout: Optional[float] = None) -> Optional[Frame]:
+        """
+        image la plus récente, en jetant les plus anciennes ; attend au plus
+        `timeout` secondes (indéfiniment si None) quand la file est vide, et
+        renvoie None si aucune image n'est arrivée ou si le producteur a fini
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        frame: Optional[Frame] = None
+        while True:
+            # état du producteur lu avant de vider la file : une image publiée
+            # juste avant sa fin est encore vue
+            alive = self.running
+            try:
+                while True:
+                    frame = self._frames.get_nowait()
+            except queue.Empty:
+                pass
+            if frame is not None or not alive:
+                break
+            wait = 0.05 if deadline is None else min(0.05, deadline - time.monotonic())
+            if wait <= 0:
+                break
+            try:
+                frame = self._frames.get(timeout=wait)
+            except queue.Empty:
+                pass
+        if frame is None:
+            self._raise_error()
+        else:
+            self._returned += 1
+        return frame
+
+    # --- Producteur ---
+
+    def _run(self) -> None:
+        sim = self._sim
+        try:
+            self._publish()
+            while not sim.should_stop() and self._wait_turn():
+                sim.step()
+                self._publish()
+        except BaseException as exc:  # remonté au consommateur par latest()/stop()
+            self._error = exc
+
+    def _wait_turn(self) -> bool:
+        """attend la permission de jouer un tour ; False si le pipeline est arrêté"""
+        with self._cond:
+            while self._paused and self._steps == 0 and not self._stop.is_set():
+                self._cond.wait()
+            if self._stop.is_set():
+                return False
+            if self._paused:
+                self._steps -= 1
+            return True
+
+    def _publish(self) -> None:
+        sim = self._sim
+        if self._on_turn is not None:
+            self._on_turn(sim)
+        frame = Frame(sim.turn, sim.grid.cell_codes(), sim.grid.count(), sim.should_stop())
+        self._published += 1
+        while True:
+            try:
+                self._frames.put_nowait(frame)
+                return
+            except queue.Full:
+                try:
+                    self._frames.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
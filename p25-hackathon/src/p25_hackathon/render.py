@@ -0,0 +1,124 @@
+import itertools
+import sys
+import time
+from typing import Optional, TextIO
+
+import numpy as np
+
+from p25_hackathon.grid import ANSI_COLORS
+
+# Deux changements d'une même ligne séparés par moins de MERGE_GAP cases
+# identiques sont réécrits d'un bloc : moins cher qu'un nouveau positionnement
+MERGE_GAP = 8
+
+
+class DiffRenderer:
+    """
+    Affichage différentiel de la grille dans le terminal.
+
+    On garde la dernière image affichée et on ne réécrit que les cases qui
+    ont changé, après un positionnement du curseur (séquences ANSI). Les
+    cases consécutives de même couleur partagent une seule séquence de
+    couleur, et chaque image part en une seule écriture.
+    La ligne 1 du terminal est un bandeau de texte, la grille commence en ligne 2.
+    """
+
+    def __init__(self, use_color: bool, out: Optional[TextIO] = None) -> None:
+        self._use_color = use_color
+        self._out = out if out is not None else sys.stdout
+        self._frame: Optional[np.ndarray] = None
+        self._rows: list[str] = []
+
+    def draw(self, header: str, rows: list[str]) -> None:
+        """affiche le bandeau et la grille (lignes de symboles sans couleur)"""
+        frame = np.frombuffer("".join(rows).encode("ascii"), dtype=np.uint8)
+        parts = [f"\x1b[1;1H{header}\x1b[K"]
+
+        if self._frame is None or self._frame.shape != frame.shape or len(rows) != len(self._rows):
+            # Première image (ou taille changée) : effacement et image complète
+            parts.insert(0, "\x1b[2J")
+            for y, row in enumerate(rows):
+                parts.append(f"\x1b[{y + 2};1H")
+                parts.append(self._paint(row))
+        else:
+            parts.extend(self._diff(frame, rows))
+
+        self._out.write("".join(parts))
+        self._out.flush()
+        self._frame = frame
+        self._rows = rows
+
+    def close(self) -> None:
+        """replace le curseur sous la grille"""
+        self._out.write(f"\x1b[{len(self._rows) + 2};1H\n")
+        self._out.flush()
+
+    def _diff(self, frame: np.ndarray, rows: list[str]) -> list[str]:
+        assert self._frame is not None
+        width = len(rows[0]) if rows else 0
+        changed = np.flatnonzero(frame != self._frame)
+        if changed.size == 0:
+            return []
+
+        # Découpage en segments : nouvelle ligne ou trou trop grand => nouveau segment
+        gaps = np.diff(changed)
+        cuts = np.flatnonzero((gaps > MERGE_GAP) | (np.diff(changed // width) != 0)) + 1
+        starts = np.concatenate(([0], cuts))
+        ends = np.concatenate((cuts, [changed.size])) - 1
+
+        parts: list[str] = []
+        for first, last in zip(changed[starts].tolist(), changed[ends].tolist()):
+            y, x0 = divmod(first, width)
+            x1 = last % width
+            parts.append(f"\x1b[{y + 2};{x0 + 1}H")
+            parts.append(self._paint(rows[y][x0:x1 + 1]))
+        return parts
+
+    def _paint(self, segment: str) -> str:
+        """colore un segment en fusionnant les cases consécutives de même couleur"""
+        if not self._use_color:
+            return segment
+        parts = []
+        for ch, run in itertools.groupby(segment):
+            color = ANSI_COLORS.get(ch, "39")
+            parts.append(f"\x1b[{color}m{''.join(run)}")
+        parts.append("\x1b[0m")
+        return "".join(parts)
+
+
+class StatusLine:
+    """
+    Ligne d'état réécrite sur place (retour chariot) : tour, effectifs et
+    vitesse en tours/s depuis la mise à jour précédente. Les mises à jour
+    plus rapprochées que `interval_s` sont ignorées, pour que le terminal ne
+    ralentisse pas la simulation.
+    """
+
+    def __init__(self, interval_s: float = 0.25, out: Optional[TextIO] = None) -> None:
+        self._out = out if out is not None else sys.stdout
+        self._interval = interval_s
+        self._last = time.perf_counter()
+        self._first_turn: Optional[int] = None
+        self._last_turn = 0
+        self._width = 0
+
+    def update(self, turn: int, counts: tuple[int, int, int], force: bool = False) -> None:
+        now = time.perf_counter()
+        if self._first_turn is None:
+            self._first_turn = self._last_turn = turn
+        elif not force and now - self._last < self._interval:
+            return
+        rate = (turn - self._last_turn) / (now - self._last) if now > self._last else 0.0
+        s, w, g = counts
+        line = f"Tour: {turn} | Sheep: {s} | Wolves: {w} | Grass: {g} | {rate:,.0f} tours/s"
+        self._out.write("\r" + line.ljust(self._width))
+        self._out.flush()
+        self._width = len(line)
+        self._last, self._last_turn = now, turn
+
+    def close(self) -> None:
+        """passe à la ligne suivante"""
+        if self._width:
+            self._out.write("\n")
+            self._out.flush()
+
@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+# Journal de rejeu : enregistrement des tours (images clés + différences) et relecture
+
+import argparse
+import bisect
+import struct
+import sys
+import time
+import zlib
+from typing import BinaryIO, Optional
+
+import numpy as np
+
+from p25_hackathon.grid import codes_to_rows
+from p25_hackathon.render import DiffRenderer
+
+# Format du journal :
+#   en-tête : MAGIC (8 octets) | version | taille de grille | intervalle entre images clés
+#   puis un enregistrement par tour : type | tour | taille des données | moutons | loups | herbe,
+#   suivi des données compressées (zlib) :
+#   - image clé : le code de chaque case (voir Grid.cell_codes)
+#   - différence : nombre m de cases modifiées, écarts entre indices successifs (m × uint32,
+#     petits donc bien compressés), anciens codes, nouveaux codes (les anciens codes
+#     permettent de reculer d'un tour sans repartir d'une image clé)
+MAGIC = b"P25RPLY\0"
+VERSION = 1
+KEYFRAME = 0
+DELTA = 1
+
+_HEADER = struct.Struct("<8sIII")
+_RECORD = struct.Struct("<BIIIII")
+
+
+class ReplayRecorder:
+    """Enregistre les tours d'une simulation dans un journal de rejeu."""
+
+    def __init__(self, path: str, grid_size: int, keyframe_every: int = 100) -> None:
+        if keyframe_every <= 0:
+            raise ValueError("l'intervalle entre images clés doit être > 0")
+        self._file: BinaryIO = open(path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, VERSION, grid_size, keyframe_every))
+        self._size = grid_size
+        self._keyframe_every = keyframe_every
+        self._prev: Optional[np.ndarray] = None
+        self._frames = 0
+        self._last_turn: Optional[int] = None
+
+    def record(self, turn: int, codes: np.ndarray, counts: tuple[int, int, int]) -> None:
+        """
+        ajoute l'état d'un tour (codes des cases et effectifs) ; les tours
+        doivent croître strictement (Replay les cherche par dichotomie)
+        """
+        if self._last_turn is not None and turn <= self._last_turn:
+            raise ValueError(f"tour {turn} enregistré après le tour {self._last_turn}")
+        codes = np.asarray(codes, dtype=np.uint8)
+        if self._prev is None or self._frames % self._keyframe_every == 0:
+            kind, payload = KEYFRAME, codes.tobytes()
+        else:
+            changed = np.flatnonzero(codes != self._prev).astype(np.uint32)
+            payload = b"".join((
+                struct.pack("<I", changed.size),
+                np.diff(changed, prepend=np.uint32(0)).tobytes(),
+                self._prev[changed].tobytes(),
+                codes[changed].tobytes(),
+            ))
+            kind = DELTA
+
+        data = zlib.compress(payload, 6)
+        self._file.write(_RECORD.pack(kind, turn, len(data), *counts))
+        self._file.write(data)
+        self._prev = codes.copy()
+        self._frames += 1
+        self._last_turn = turn
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class Replay:
+    """
+    Lecture d'un journal de rejeu. On peut se placer sur n'importe quel tour
+    (au plus keyframe_every différences à appliquer depuis l'image clé
+    précédente), puis avancer ou reculer d'un tour à la fois.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._file: BinaryIO = open(path, "rb")
+        magic, version, size, keyframe_every = _HEADER.unpack(self._file.read(_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path!r} n'est pas un journal de rejeu")
+        if version != VERSION:
+            raise ValueError(f"version de journal non prise en charge : {version}")
+        self.size = size
+        self.keyframe_every = keyframe_every
+
+        # Index des enregistrements (on ne lit que les en-têtes) ;
+        # un enregistrement tronqué en fin de fichier (arrêt brutal) est ignoré
+        self.turns: list[int] = []
+        self.counts: list[tuple[int, int, int]] = []
+        self._offsets: list[int] = []
+        self._kinds: list[int] = []
+        self._keyframes: list[int] = []
+        offset = _HEADER.size
+        while True:
+            raw = self._file.read(_RECORD.size)
+            if len(raw) < _RECORD.size:
+                break
+            kind, turn, length, sheep, wolves, grass = _RECORD.unpack(raw)
+            if len(self._file.read(length)) < length:
+                break
+            if kind == KEYFRAME:
+                self._keyframes.append(len(self.turns))
+            self.turns.append(turn)
+            self.counts.append((sheep, wolves, grass))
+            self._offsets.append(offset + _RECORD.size)
+            self._kinds.append(kind)
+            offset += _RECORD.size + length
+
+        self._index = -1
+        self._codes = np.zeros(size * size, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self.turns)
+
+    @property
+    def index(self) -> int:
+        """position courante (numéro d'enregistrement)"""
+        return self._index
+
+    @property
+    def codes(self) -> np.ndarray:
+        """codes des cases à la position courante"""
+        return self._codes
+
+    def index_of_turn(self, turn: int) -> int:
+        """position du dernier enregistrement dont le tour est <= turn"""
+        return max(0, bisect.bisect_right(self.turns, turn) - 1)
+
+    def seek(self, index: int) -> np.ndarray:
+        """se place sur l'enregistrement `index` : image clé précédente puis différences"""
+        index = min(max(index, 0), len(self) - 1)
+        if not (self._index <= index and index - self._index <= self.keyframe_every):
+            key = self._keyframes[bisect.bisect_right(self._keyframes, index) - 1]
+            self._codes = np.frombuffer(self._payload(key), dtype=np.uint8).copy()
+            self._index = key
+        while self._index < index:
+            self._forward()
+        return self._codes
+
+    def step(self, delta: int = 1) -> np.ndarray:
+        """avance (delta > 0) ou recule (delta < 0) de |delta| enregistrements"""
+        target = min(max(self._index + delta, 0), len(self) - 1)
+        if target < self._index and self._index - target <= self.keyframe_every:
+            while self._index > target:
+                self._backward()
+            return self._codes
+        return self.seek(target)
+
+    def _payload(self, index: int) -> bytes:
+        self._file.seek(self._offsets[index] - _RECORD.size)
+        _kind, _turn, length, *_counts = _RECORD.unpack(self._file.read(_RECORD.size))
+        return zlib.decompress(self._file.read(length))
+
+    def _delta(self, index: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        payload = self._payload(index)
+        (m,) = struct.unpack_from("<I", payload)
+        idx = np.cumsum(np.frombuffer(payload, dtype=np.uint32, count=m, offset=4), dtype=np.uint32)
+        old = np.frombuffer(payload, dtype=np.uint8, count=m, offset=4 + 4 * m)
+        new = np.frombuffer(payload, dtype=np.uint8, count=m, offset=4 + 5 * m)
+        return idx, old, new
+
+    def _forward(self) -> None:
+        nxt = self._index + 1
+        if self._kinds[nxt] == KEYFRAME:
+            self._codes = np.frombuffer(self._payload(nxt), dtype=np.uint8).copy()
+        else:
+            idx, _old, new = self._delta(nxt)
+            self._codes[idx] = new
+        self._index = nxt
+
+    def _backward(self) -> None:
+        if self._kinds[self._index] == KEYFRAME:
+            # pas d'anciens codes dans une image clé : on repart de la précédente
+            self.seek(self._index - 1)
+            return
+        idx, old, _new = self._delta(self._index)
+        self._codes[idx] = old
+        self._index -= 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def play_terminal(replay: Replay, start: int, speed: float, fps: float, reverse: bool, use_color: bool) -> None:
+    """
+    Rejoue le journal dans le terminal. `speed` est le nombre de tours
+    avancés par image (fractionnaire pour ralentir) ; `reverse` rejoue à l'envers.
+    """
+    renderer = DiffRenderer(use_color=use_color)
+    position = float(replay.index_of_turn(start))
+    direction = -1 if reverse else 1
+    try:
+        while True:
+            target = int(position)
+            if target < replay.index:
+                replay.step(target - replay.index)
+            else:
+                replay.seek(target)
+            s, w, g = replay.counts[replay.index]
+            header = f"Rejeu | Tour: {replay.turns[replay.index]} | Sheep: {s} | Wolves: {w} | Grass: {g} | x{speed:g}"
+            renderer.draw(header, codes_to_rows(replay.codes, replay.size))
+
+            position += direction * speed
+            if not (0 <= position <= len(replay) - 1):
+                break
+            time.sleep(1.0 / fps)
+    except KeyboardInterrupt:
+        pass
+    renderer.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ecosystem-replay",
+        description="Rejoue un journal enregistré avec --record (terminal ou Pyxel).",
+    )
+    parser.add_argument("path", help="Journal de rejeu")
+    parser.add_argument("--from", dest="start", type=int, default=0,
+                        help="Tour de départ (défaut: 0)")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Tours par image, ex: 10 pour x10, 0.5 pour ralentir (défaut: 1)")
+    parser.add_argument("--reverse", action="store_true",
+                        help="Rejouer à l'envers depuis le tour de départ")
+    parser.add_argument("--fps", type=float, default=20.0,
+                        help="Images par seconde (défaut: 20)")
+    parser.add_argument("--no-color", action="store_true",
+                        help="Désactiver les couleurs ANSI")
+    parser.add_argument("--pyxel", action="store_true",
+                        help="Rejouer dans l'interface graphique")
+    parser.add_argument("--cell-size", type=int, default=8,
+                        help="Taille des cellules dans l'interface graphique (défaut: 8)")
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    replay = Replay(args.path)
+    if len(replay) == 0:
+        print("Journal vide.")
+        return 1
+
+    if args.pyxel:
+        # Import local (évite d'imposer Pyxel pour le rejeu dans le terminal)
+        from p25_hackathon.interface import run_pyxel_replay  # noqa: PLC0415
+        run_pyxel_replay(replay, start=args.start, cell_size=args.cell_size, fps=int(args.fps))
+    else:
+        play_terminal(replay, args.start, args.speed, args.fps, args.reverse, use_color=not args.no_color)
+    replay.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
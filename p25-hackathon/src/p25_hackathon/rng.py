@@ -0,0 +1,148 @@
+"""
+Générateur aléatoire « à compteur » : chaque tirage est un hachage de
+(graine, tour, flux, identifiant), sans état partagé.
+
+Avec un générateur classique, chaque tirage dépend de tous ceux qui l'ont
+précédé : changer l'ordre de traitement change toute la suite. Ici, le
+tirage d'une case (ou d'un animal, repéré par sa case) à un tour et pour un
+usage donnés est toujours le même, quel que soit l'ordre de calcul, le
+processus qui le fait, ou qu'il soit fait seul ou par lots (cell_uniform).
+"""
+
+import random
+from typing import Sequence, TypeVar, Union
+
+import numpy as np
+
+T = TypeVar("T")
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+_C1 = 0xBF58476D1CE4E5B9
+_C2 = 0x94D049BB133111EB
+_STREAM_MUL = 0xD1B54A32D192ED03
+
+
+def _mix(z: int) -> int:
+    """finaliseur de splitmix64 sur un entier Python"""
+    z = ((z ^ (z >> 30)) * _C1) & _MASK64
+    z = ((z ^ (z >> 27)) * _C2) & _MASK64
+    return z ^ (z >> 31)
+
+
+def _mix64(z: np.ndarray) -> np.ndarray:
+    """même finaliseur sur un tableau uint64 (calcul modulo 2**64)"""
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(_C1)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(_C2)
+    return z ^ (z >> np.uint64(31))
+
+
+def seed64(seed: int) -> int:
+    """graine ramenée sur 64 bits : une graine négative reste utilisable en uint64"""
+    return int(seed) & _MASK64
+
+
+def stream_key(seed: int, turn: int, stream: int) -> int:
+    """clé d'un flux : tout ce qui précède l'identifiant dans le hachage"""
+    key = _mix((seed + _GOLDEN) & _MASK64 ^ (turn * _GOLDEN) & _MASK64)
+    return _mix(key ^ (stream * _STREAM_MUL) & _MASK64)
+
+
+def hash64(key: int, ident: int) -> int:
+    """entier de 64 bits pour un identifiant dans un flux"""
+    return _mix(key ^ (ident * _GOLDEN) & _MASK64)
+
+
+def cell_uniform(seed: Union[int, np.ndarray], turn: int, stream: int, cells: np.ndarray) -> np.ndarray:
+    """
+    Réel uniforme dans [0, 1) pour chaque case de `cells` (indices y * n + x),
+    égal à CounterRNG(seed).uniform(turn, stream, case). `seed` peut être un
+    tableau (une graine par grille d'une pile), diffusé contre `cells`.
+    """
+    seeds = np.asarray(seed, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        key = _mix64(seeds + np.uint64(_GOLDEN) ^ np.uint64((turn * _GOLDEN) & _MASK64))
+        key = _mix64(key ^ np.uint64((stream * _STREAM_MUL) & _MASK64))
+        h = _mix64(key ^ (cells.astype(np.uint64) * np.uint64(_GOLDEN)))
+    return (h >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+class CounterRNG(random.Random):
+    """
+    Tirages fonction de (graine, tour, flux, identifiant).
+
+    Les méthodes *_at et shuffle_cells donnent directement le tirage d'un
+    identifiant. `at(tour, flux, identifiant)` positionne aussi le
+    générateur comme un random.Random ordinaire (random, choice, shuffle...)
+    dont la suite de tirages ne dépend que de ce triplet : on peut le passer
+    aux méthodes de la grille qui attendent un random.Random.
+    """
+
+    def __init__(self, seed: int) -> None:
+        self._seed = seed64(seed)
+        self._key = 0
+        self._counter = 0
+        super().__init__(seed)
+
+    def seed(self, a: object = None, version: int = 2) -> None:
+        if a is not None:
+            self._seed = seed64(a)  # type: ignore[arg-type]
+        self._key = stream_key(self._seed, 0, 0)
+        self._counter = 0
+
+    @property
+    def seed_value(self) -> int:
+        return self._seed
+
+    def at(self, turn: int, stream: int, ident: int = 0) -> "CounterRNG":
+        """se place au début de la suite de (tour, flux, identifiant)"""
+        self._key = hash64(stream_key(self._seed, turn, stream), ident)
+        self._counter = 0
+        return self
+
+    def random(self) -> float:
+        self._counter += 1
+        return (hash64(self._key, self._counter) >> 11) * (1.0 / (1 << 53))
+
+    def getrandbits(self, k: int) -> int:
+        bits = 0
+        filled = 0
+        while filled < k:
+            self._counter += 1
+            bits |= hash64(self._key, self._counter) << filled
+            filled += 64
+        return bits & ((1 << k) - 1)
+
+    def getstate(self) -> tuple[int, int, int]:  # type: ignore[override]
+        return self._seed, self._key, self._counter
+
+    def setstate(self, state: tuple[int, int, int]) -> None:  # type: ignore[override]
+        self._seed, self._key, self._counter = state
+
+    # --- Tirages directs ---
+
+    def uniform_at(self, turn: int, stream: int, ident: int) -> float:
+        """réel uniforme dans [0, 1) de (tour, flux, identifiant)"""
+        return (hash64(stream_key(self._seed, turn, stream), ident) >> 11) * (1.0 / (1 << 53))
+
+    def choice_at(self, turn: int, stream: int, ident: int, options: Sequence[T]) -> T:
+        """élément de `options` choisi par (tour, flux, identifiant)"""
+        return options[int(self.uniform_at(turn, stream, ident) * len(options))]
+
+    def shuffle_cells(self, turn: int, stream: int, positions: list[tuple[int, int]], n: int) -> None:
+        """
+        mélange des positions (x, y) d'une grille n×n : chaque case reçoit
+        une clé de tri hachée, donc l'ordre obtenu ne dépend pas de l'ordre
+        de départ de la liste
+        """
+        key = stream_key(self._seed, turn, stream)
+        positions.sort(key=lambda p: hash64(key, p[1] * n + p[0]))
+
+    def shuffle_indices(self, turn: int, stream: int, cells: list[int]) -> None:
+        """même mélange que shuffle_cells, pour des indices de cases y * n + x"""
+        key = stream_key(self._seed, turn, stream)
+        cells.sort(key=lambda i: hash64(key, i))
+
+    def cells(self, turn: int, stream: int, cells: np.ndarray) -> np.ndarray:
+        """tirages de plusieurs cases d'un coup (égaux à uniform_at case par case)"""
+        return cell_uniform(self._seed, turn, stream, cells)
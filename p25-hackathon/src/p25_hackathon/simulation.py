@@ -1,9 +1,51 @@
 import random
-from dataclasses import dataclass
-from typing import Optional
+import time
+from functools import partial
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional
 
-from p25_hackathon.livingbeings import Sheep, Wolf
+import numpy as np
+
+from p25_hackathon.livingbeings import Animal, Sheep, Wolf
 from p25_hackathon.grid import Grid
+from p25_hackathon.arraygrid import ArrayGrid, batch_rng
+from p25_hackathon.batched import GeneratorWindow, sheep_phase, wolf_phase
+from p25_hackathon.chunkedgrid import ChunkedGrid
+from p25_hackathon.checkpoint import read_checkpoint, write_checkpoint
+from p25_hackathon.convergence import STOP_EXTINCTION, STOP_MAX_TURNS, ConvergenceDetector
+from p25_hackathon.instrumentation import TurnStats
+from p25_hackathon.kernels import SyncParams, Window
+from p25_hackathon.rng import CounterRNG
+
+# Backends de stockage de la grille : objets Python, tableaux numpy ou tuiles allouées à la demande
+GRID_BACKENDS = ("objects", "arrays", "chunked")
+
+# Générateurs aléatoires : un random.Random partagé (tirages dans l'ordre de
+# traitement) ou des tirages à compteur fonction de (graine, tour, flux, case)
+RNG_MODES = ("shared", "counter")
+
+# Version du moteur : à augmenter dès qu'un changement modifie les trajectoires
+# obtenues pour une configuration et une graine (invalide le cache de résultats)
+ENGINE_VERSION = 2
+
+# Flux de tirages du mode "counter", un par usage ; les phases groupées
+# utilisent les flux qui suivent celui de l'ordre de passage de leur phase
+STREAM_INIT_GRASS = 1
+STREAM_INIT_SHEEP = 2
+STREAM_INIT_WOLVES = 3
+STREAM_AGES = 10
+STREAM_GRASS = 11
+STREAM_SHEEP_ORDER = 100
+STREAM_SHEEP_GRASS = 101
+STREAM_SHEEP_FREE = 102
+STREAM_WOLF_ORDER = 200
+STREAM_WOLF_PREY = 201
+STREAM_WOLF_FREE = 202
+STREAM_DEAD = 300
+STREAM_SHEEP_BIRTH_ORDER = 400
+STREAM_SHEEP_BIRTH = 401
+STREAM_WOLF_BIRTH_ORDER = 500
+STREAM_WOLF_BIRTH = 501
 
 @dataclass(frozen=True)
 class SimConfig:
@@ -34,6 +76,27 @@ class SimConfig:
     max_turns: int = 500
     delay_s: float = 0.05
     use_color: bool = True
+    grid_backend: str = "objects"
+    debug_counts: bool = False
+    rng_mode: str = "shared"
+    batched_phases: bool = False
+
+    # Arrêt anticipé quand la dynamique est établie (voir convergence.py)
+    stop_on_convergence: bool = False
+    convergence_window: int = 200
+    convergence_tolerance: float = 0.02
+
+def make_grid(config: SimConfig) -> Grid:
+    """Construit la grille avec le backend choisi dans la configuration."""
+    if config.grid_backend == "objects":
+        grid_cls: type[Grid] = Grid
+    elif config.grid_backend == "arrays":
+        grid_cls = ArrayGrid
+    elif config.grid_backend == "chunked":
+        grid_cls = ChunkedGrid
+    else:
+        raise ValueError(f"backend inconnu : {config.grid_backend!r} (choix : {', '.join(GRID_BACKENDS)})")
+    return grid_cls(size=config.grid_size, grass_regrow_time=config.grass_regrowth_time, debug=config.debug_counts)
 
 class Simulation:
     """Orchestre les tours.
@@ -41,13 +104,47 @@ class Simulation:
     Le choix d'implémentation pour éviter les conflits :
     - On traite les animaux dans un ordre aléatoire à chaque phase.
     - Les mouvements échouent si la destination est occupée.
+
+    Avec rng_mode="counter", chaque tirage (ordre de passage, case choisie,
+    pousse de l'herbe, naissance) est fonction de (graine, tour, flux, case
+    de l'animal) : le résultat ne dépend plus de l'ordre dans lequel les
+    tirages sont faits, ce qui permet de découper ou réordonner le calcul
+    sans changer la trajectoire d'une graine.
+
+    Avec batched_phases=True (backend "arrays" seulement), les phases moutons
+    et loups sont traitées en bloc (voir batched.py) : mêmes règles, conflits
+    réglés par priorité aléatoire au lieu de l'ordre de passage.
+
+    Avec stop_on_convergence=True, un ConvergenceDetector suit les effectifs
+    de chaque tour et arrête la simulation dès qu'une espèce animale a
+    disparu ou que les effectifs sont figés ou cycliques ; `stop_reason` dit
+    pourquoi la simulation s'est arrêtée. L'état du détecteur est sauvegardé
+    avec la simulation.
+
+    Un observateur optionnel (`set_observer`) reçoit à chaque tour un
+    TurnStats : temps par phase et compteurs d'événements. Sans observateur,
+    rien n'est mesuré.
     """
 
     def __init__(self, config: SimConfig, seed: Optional[int]) -> None:
+        if config.rng_mode not in RNG_MODES:
+            raise ValueError(f"générateur inconnu : {config.rng_mode!r} (choix : {', '.join(RNG_MODES)})")
+        if config.batched_phases and config.grid_backend != "arrays":
+            raise ValueError("les phases groupées demandent le backend 'arrays'")
         self._cfg = config
+        self._params = SyncParams.from_config(config)
         self._rng = random.Random(seed)
-        self._grid = Grid(size=config.grid_size, grass_regrow_time=config.grass_regrowth_time)
+        self._counter: Optional[CounterRNG] = None
+        if config.rng_mode == "counter":
+            self._counter = CounterRNG(seed if seed is not None else random.SystemRandom().getrandbits(63))
+        self._grid = make_grid(config)
         self._turn = 0
+        self._observer: Optional[Callable[[TurnStats], None]] = None
+        self._stats: Optional[TurnStats] = None
+        self._detector: Optional[ConvergenceDetector] = None
+        if config.stop_on_convergence:
+            self._detector = ConvergenceDetector(config.grid_size * config.grid_size,
+                                                 config.convergence_window, config.convergence_tolerance)
 
     @property
     def grid(self) -> Grid:
@@ -59,48 +156,109 @@ class Simulation:
 
     def initialize(self) -> None:
         """Placement initial : herbe, puis moutons, puis loups."""
-        self._grid.place_grass_random(self._cfg.initial_grass_coverage, self._rng)
-
-        for _ in range(self._cfg.initial_sheep):
-            if not self._grid.spawn_animal_random(Sheep(energy=self._cfg.sheep_initial_energy), self._rng):
-                break
-
-        for _ in range(self._cfg.initial_wolves):
-            if not self._grid.spawn_animal_random(Wolf(energy=self._cfg.wolf_initial_energy), self._rng):
-                break
-
-        s, w, g = self._grid.count()
+        self._grid.place_grass_random(self._cfg.initial_grass_coverage, self._draws(STREAM_INIT_GRASS))
+
+        # Placement groupé sur des cases libres distinctes (s'arrête si la grille est pleine)
+        sheep = [Sheep(energy=self._cfg.sheep_initial_energy) for _ in range(self._cfg.initial_sheep)]
+        self._grid.spawn_animals_random(sheep, self._draws(STREAM_INIT_SHEEP))
+
+        wolves = [Wolf(energy=self._cfg.wolf_initial_energy) for _ in range(self._cfg.initial_wolves)]
+        self._grid.spawn_animals_random(wolves, self._draws(STREAM_INIT_WOLVES))
+
+        if self._detector is not None:
+            self._detector.update(self._turn, self._grid.count())
+
+    def save(self, path: str) -> None:
+        """
+        Sauvegarde l'état complet (configuration, tour, grille, état du
+        générateur aléatoire, détecteur de convergence) dans un fichier
+        binaire. Une simulation rechargée avec `Simulation.load` continue
+        exactement comme l'originale, arrêt anticipé compris.
+        """
+        version, internal, gauss_next = self._rng.getstate()
+        header = {
+            "config": asdict(self._cfg),
+            "turn": self._turn,
+            "rng": {"version": version, "gauss_next": gauss_next},
+        }
+        if self._counter is not None:
+            header["counter_seed"] = self._counter.seed_value
+        arrays = self._grid.export_state()
+        arrays["rng_state"] = np.array(internal, dtype=np.uint32)
+        if self._detector is not None:
+            header["convergence"], arrays["convergence_series"] = self._detector.export_state()
+        write_checkpoint(path, header, arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "Simulation":
+        """Recrée une simulation à partir d'un fichier écrit par `save`."""
+        header, arrays = read_checkpoint(path)
+        sim = cls(SimConfig(**header["config"]), seed=None)
+        sim._turn = header["turn"]
+        rng = header["rng"]
+        internal = tuple(int(v) for v in arrays.pop("rng_state"))
+        sim._rng.setstate((rng["version"], internal, rng["gauss_next"]))
+        if "counter_seed" in header:
+            sim._counter = CounterRNG(header["counter_seed"])
+        series = arrays.pop("convergence_series", None)
+        if sim._detector is not None and series is not None:
+            sim._detector.import_state(header["convergence"], np.array(series))
+        sim._grid.import_state(arrays)
+        return sim
+
+    def set_observer(self, observer: Optional[Callable[[TurnStats], None]]) -> None:
+        """Active (ou désactive avec None) la mesure des tours."""
+        self._observer = observer
 
     def step(self) -> None:
         """Exécute un tour complet."""
         self._turn += 1
 
-        # 1) Incrémentation de l'âge de tous les animaux 
-        self._increment_ages()
-
-        # 2) Mise à jour de l'herbe
-        self._grid.tick_grass(self._cfg.grass_growth_probability, self._rng)
-
-        # 3) Phase moutons
-        self._sheep_phase()
-
-        # 4) Phase loups
-        self._wolf_phase()
-
-        # 5) vérification des morts
-        self._remove_dead()
+        if self._observer is None:
+            for _name, phase in self._phases():
+                phase()
+        else:
+            stats = TurnStats(turn=self._turn)
+            self._stats = stats
+            try:
+                for name, phase in self._phases():
+                    t0 = time.perf_counter()
+                    phase()
+                    stats.phase_s[name] = time.perf_counter() - t0
+            finally:
+                self._stats = None
+            self._observer(stats)
+
+        if self._detector is not None:
+            self._detector.update(self._turn, self._grid.count())
+
+    def _phases(self) -> list[tuple[str, Callable[[], None]]]:
+        """Les phases d'un tour, dans l'ordre."""
+        return [
+            ("ages", self._increment_ages),        # 1) Incrémentation de l'âge de tous les animaux
+            ("grass", self._tick_grass),           # 2) Mise à jour de l'herbe
+            ("sheep", self._sheep_phase_batched if self._cfg.batched_phases else self._sheep_phase),  # 3) Phase moutons
+            ("wolves", self._wolf_phase_batched if self._cfg.batched_phases else self._wolf_phase),  # 4) Phase loups
+            ("dead", self._remove_dead),           # 5) vérification des morts
+            ("reproduction", self._reproduction),  # 6) Reproduction
+        ]
 
-        # 6) Reproduction
-        self._reproduction()
+    def _tick_grass(self) -> None:
+        draws = None
+        if self._counter is not None:
+            # un tirage par case, fonction de (graine, tour, case)
+            draws = partial(self._counter.cells, self._turn, STREAM_GRASS)
+        self._grid.tick_grass(self._cfg.grass_growth_probability, self._draws(STREAM_GRASS), draws)
 
     def _increment_ages(self) -> None:
-        for (x, y) in self._all_animal_positions_shuffled():
+        for (x, y) in self._all_animal_positions_shuffled(STREAM_AGES):
             a = self._grid.cell(x, y).animal
             if a is not None:
                 a.increment_age()
 
     def _sheep_phase(self) -> None:
-        for (x, y) in self._positions_of_sheep_shuffled():
+        stats = self._stats
+        for (x, y) in self._positions_of_sheep_shuffled(STREAM_SHEEP_ORDER):
             sheep = self._grid.cell(x, y).animal
             if not isinstance(sheep, Sheep):
                 continue  # peut avoir bougé / été mangé
@@ -108,107 +266,160 @@ class Simulation:
             # Stratégie simple :
             # - si herbe adjacente libre : s'y déplacer
             # - sinon : déplacement aléatoire vers une case libre
-            target = self._pick_adjacent_grass(x, y)
+            target = self._pick_adjacent_grass(x, y, STREAM_SHEEP_GRASS)
             if target is None:
-                target = self._pick_adjacent_free(x, y)
+                target = self._pick_adjacent_free(x, y, STREAM_SHEEP_FREE)
 
             if target is not None:
                 self._grid.move_animal((x, y), target)
                 x, y = target
 
             # Mange l'herbe seulement si elle est sur la même case
-            if self._grid.eat_grass_if_present(x, y):
+            ate = self._grid.eat_grass_if_present(x, y)
+            if ate:
                 sheep.energy += self._cfg.sheep_energy_from_grass
 
+            if stats is not None:
+                stats.moves_attempted += 1
+                stats.moves_failed += target is None
+                stats.grass_eaten += ate
+
             # Coût énergétique du tour
             sheep.lose_energy(self._cfg.sheep_energy_loss_per_turn)
 
+    def _sheep_phase_batched(self) -> None:
+        assert isinstance(self._grid, ArrayGrid)
+        sheep_phase(self._grid, self._params, self._window(), STREAM_SHEEP_ORDER, self._stats)
+
     def _wolf_phase(self) -> None:
-        for (x, y) in self._positions_of_wolves_shuffled():
+        stats = self._stats
+        for (x, y) in self._positions_of_wolves_shuffled(STREAM_WOLF_ORDER):
             wolf = self._grid.cell(x, y).animal
             if not isinstance(wolf, Wolf):
                 continue
 
             # Si un mouton est adjacent : le manger puis se déplacer sur sa case
-            sheep_target = self._pick_adjacent_sheep(x, y)
+            sheep_target = self._pick_adjacent_sheep(x, y, STREAM_WOLF_PREY)
             if sheep_target is not None:
                 sx, sy = sheep_target
                 self._grid.remove_animal(sx, sy)
                 wolf.energy += self._cfg.wolf_energy_from_sheep
                 self._grid.move_animal((x, y), (sx, sy))
                 x, y = sx, sy
+                if stats is not None:
+                    stats.moves_attempted += 1
+                    stats.sheep_eaten += 1
             else:
                 # Sinon déplacement aléatoire
-                target = self._pick_adjacent_free(x, y)
+                target = self._pick_adjacent_free(x, y, STREAM_WOLF_FREE)
                 if target is not None:
                     self._grid.move_animal((x, y), target)
+                if stats is not None:
+                    stats.moves_attempted += 1
+                    stats.moves_failed += target is None
 
             wolf.lose_energy(self._cfg.wolf_energy_loss_per_turn)
 
+    def _wolf_phase_batched(self) -> None:
+        assert isinstance(self._grid, ArrayGrid)
+        wolf_phase(self._grid, self._params, self._window(), STREAM_WOLF_ORDER, self._stats)
+
     def _remove_dead(self) -> None:
-        for (x, y) in self._all_animal_positions_shuffled():
+        for (x, y) in self._all_animal_positions_shuffled(STREAM_DEAD):
             a = self._grid.cell(x, y).animal
             if a is None:
                 continue
 
             if isinstance(a, Sheep):
-                dead = (a.energy <= 0) or (a.age > self._cfg.sheep_max_age)
+                starved, too_old = (a.energy <= 0), (a.age > self._cfg.sheep_max_age)
             elif isinstance(a, Wolf):
-                dead = (a.energy <= 0) or (a.age > self._cfg.wolf_max_age)
+                starved, too_old = (a.energy <= 0), (a.age > self._cfg.wolf_max_age)
             else:
-                dead = False
+                starved = too_old = False
 
-            if dead:
+            if starved or too_old:
                 self._grid.remove_animal(x, y)
+                if self._stats is not None:
+                    # une mort de faim prime sur la vieillesse
+                    self._stats.deaths_starvation += starved
+                    self._stats.deaths_old_age += not starved
 
     def _reproduction(self) -> None:
         # Reproduction moutons
-        for (x, y) in self._positions_of_sheep_shuffled():
+        for (x, y) in self._positions_of_sheep_shuffled(STREAM_SHEEP_BIRTH_ORDER):
             sheep = self._grid.cell(x, y).animal
             if not isinstance(sheep, Sheep):
                 continue
             if sheep.energy > self._cfg.sheep_reproduction_threshold:
                 sheep.energy -= self._cfg.reproduction_energy_cost
-                self._grid.try_reproduce((x, y), Sheep(energy=self._cfg.sheep_initial_energy), self._rng)
+                born = self._grid.try_reproduce((x, y), Sheep(energy=self._cfg.sheep_initial_energy),
+                                                self._draws(STREAM_SHEEP_BIRTH, x, y))
+                self._count_birth(born)
 
         # Reproduction loups
-        for (x, y) in self._positions_of_wolves_shuffled():
+        for (x, y) in self._positions_of_wolves_shuffled(STREAM_WOLF_BIRTH_ORDER):
             wolf = self._grid.cell(x, y).animal
             if not isinstance(wolf, Wolf):
                 continue
             if wolf.energy > self._cfg.wolf_reproduction_threshold:
                 wolf.energy -= self._cfg.reproduction_energy_cost
-                self._grid.try_reproduce((x, y), Wolf(energy=self._cfg.wolf_initial_energy), self._rng)
+                born = self._grid.try_reproduce((x, y), Wolf(energy=self._cfg.wolf_initial_energy),
+                                                self._draws(STREAM_WOLF_BIRTH, x, y))
+                self._count_birth(born)
+
+    def _count_birth(self, born: bool) -> None:
+        if self._stats is not None:
+            self._stats.births += born
+            self._stats.births_failed += not born
 
     def should_stop(self) -> bool:
-        # Arrêt si max tours ou extinction totale
+        # Arrêt si max tours, extinction totale ou dynamique établie
+        return self.stop_reason is not None
+
+    @property
+    def stop_reason(self) -> Optional[str]:
+        """raison de l'arrêt (constantes STOP_* de convergence.py), None si la simulation continue"""
         if self._turn >= self._cfg.max_turns:
-            return True
+            return STOP_MAX_TURNS
         s, w, _g = self._grid.count()
-        return (s + w) == 0
+        if (s + w) == 0:
+            return STOP_EXTINCTION
+        if self._detector is not None:
+            return self._detector.reason
+        return None
 
     # --- Helpers (tirages aléatoires pour casser les biais d'ordre) ---
 
-    def _all_animal_positions_shuffled(self) -> list[tuple[int, int]]:
-        positions: list[tuple[int, int]] = []
-        for y in range(self._grid.size):
-            for x in range(self._grid.size):
-                if self._grid.cell(x, y).animal is not None:
-                    positions.append((x, y))
-        self._rng.shuffle(positions)
+    def _draws(self, stream: int, x: int = 0, y: int = 0) -> random.Random:
+        """générateur à utiliser pour un usage (flux) et une case donnés"""
+        if self._counter is None:
+            return self._rng
+        return self._counter.at(self._turn, stream, y * self._cfg.grid_size + x)
+
+    def _window(self) -> Window:
+        """source de tirages des phases groupées"""
+        n = self._cfg.grid_size
+        if self._counter is None:
+            return GeneratorWindow(0, self._turn, 0, n, batch_rng(self._rng))
+        return Window(self._counter.seed_value, self._turn, 0, n)
+
+    def _shuffle(self, positions: list[tuple[int, int]], stream: int) -> list[tuple[int, int]]:
+        if self._counter is None:
+            self._rng.shuffle(positions)
+        else:
+            self._counter.shuffle_cells(self._turn, stream, positions, self._cfg.grid_size)
         return positions
 
-    def _positions_of_sheep_shuffled(self) -> list[tuple[int, int]]:
-        positions = self._grid.positions_of(Sheep)
-        self._rng.shuffle(positions)
-        return positions
+    def _all_animal_positions_shuffled(self, stream: int) -> list[tuple[int, int]]:
+        return self._shuffle(self._grid.positions_of(Animal), stream)
 
-    def _positions_of_wolves_shuffled(self) -> list[tuple[int, int]]:
-        positions = self._grid.positions_of(Wolf)
-        self._rng.shuffle(positions)
-        return positions
+    def _positions_of_sheep_shuffled(self, stream: int) -> list[tuple[int, int]]:
+        return self._shuffle(self._grid.positions_of(Sheep), stream)
+
+    def _positions_of_wolves_shuffled(self, stream: int) -> list[tuple[int, int]]:
+        return self._shuffle(self._grid.positions_of(Wolf), stream)
 
-    def _pick_adjacent_free(self, x: int, y: int) -> Optional[tuple[int, int]]:
+    def _pick_adjacent_free(self, x: int, y: int, stream: int) -> Optional[tuple[int, int]]:
         options = [
             (nx, ny)
             for (nx, ny) in self._grid.neighbors4(x, y)
@@ -216,9 +427,9 @@ class Simulation:
         ]
         if not options:
             return None
-        return self._rng.choice(options)
+        return self._draws(stream, x, y).choice(options)
 
-    def _pick_adjacent_grass(self, x: int, y: int) -> Optional[tuple[int, int]]:
+    def _pick_adjacent_grass(self, x: int, y: int, stream: int) -> Optional[tuple[int, int]]:
         options = [
             (nx, ny)
             for (nx, ny) in self._grid.neighbors4(x, y)
@@ -226,9 +437,9 @@ class Simulation:
         ]
         if not options:
             return None
-        return self._rng.choice(options)
+        return self._draws(stream, x, y).choice(options)
 
-    def _pick_adjacent_sheep(self, x: int, y: int) -> Optional[tuple[int, int]]:
+    def _pick_adjacent_sheep(self, x: int, y: int, stream: int) -> Optional[tuple[int, int]]:
         options = [
             (nx, ny)
             for (nx, ny) in self._grid.neighbors4(x, y)
@@ -236,4 +447,4 @@ class Simulation:
         ]
         if not options:
             return None
-        return self._rng.choice(options)
\ No newline at end of file
+        return self._draws(stream, x, y).choice(options)
\ No newline at end of file
@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+# Collecte des effectifs par tour : fichiers en flux, tampon circulaire, sous-échantillonnage
+
+import argparse
+import csv
+import os
+import sys
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import numpy as np
+
+STATS_COLUMNS = ("turns", "sheep", "wolves", "grass")
+
+# Un enregistrement binaire : tour puis effectifs (moutons, loups, herbe)
+STATS_DTYPE = np.dtype([("turn", "<i8"), ("sheep", "<i4"), ("wolves", "<i4"), ("grass", "<i4")])
+
+
+def _empty_series() -> dict[str, list[int]]:
+    return {name: [] for name in STATS_COLUMNS}
+
+
+class StatsSink(ABC):
+    """
+    Reçoit les effectifs (moutons, loups, herbe) de chaque tour.
+
+    Les implémentations gardent une mémoire constante quelle que soit la
+    durée de la simulation. `series` renvoie ce qui est gardé en mémoire,
+    au format attendu par cli.plot_stats (listes "turns", "sheep", "wolves", "grass").
+    """
+
+    @abstractmethod
+    def record(self, turn: int, counts: tuple[int, int, int]) -> None:
+        """reçoit les effectifs du tour `turn`"""
+
+    def series(self) -> dict[str, list[int]]:
+        return _empty_series()
+
+    def close(self) -> None:
+        pass
+
+
+class CsvStatsSink(StatsSink):
+    """Écrit une ligne CSV par tour, par blocs de `buffer_rows` lignes."""
+
+    def __init__(self, path: str, buffer_rows: int = 4096) -> None:
+        self._file = open(path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(STATS_COLUMNS)
+        self._rows: list[tuple[int, int, int, int]] = []
+        self._buffer_rows = buffer_rows
+
+    def record(self, turn: int, counts: tuple[int, int, int]) -> None:
+        self._rows.append((turn, *counts))
+        if len(self._rows) >= self._buffer_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        self._writer.writerows(self._rows)
+        self._file.flush()
+        self._rows.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+
+class BinaryStatsSink(StatsSink):
+    """Écrit un enregistrement STATS_DTYPE (20 octets) par tour, par blocs ; relu par read_binary_stats."""
+
+    def __init__(self, path: str, buffer_rows: int = 4096) -> None:
+        self._file = open(path, "wb")
+        self._buffer = np.zeros(buffer_rows, dtype=STATS_DTYPE)
+        self._pending = 0
+
+    def record(self, turn: int, counts: tuple[int, int, int]) -> None:
+        self._buffer[self._pending] = (turn, *counts)
+        self._pending += 1
+        if self._pending == self._buffer.size:
+            self.flush()
+
+    def flush(self) -> None:
+        self._file.write(self._buffer[:self._pending].tobytes())
+        self._file.flush()
+        self._pending = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+
+def read_binary_stats(path: str) -> np.ndarray:
+    """enregistrements d'un fichier écrit par BinaryStatsSink (projetés en mémoire)"""
+    if os.path.getsize(path) < STATS_DTYPE.itemsize:
+        return np.zeros(0, dtype=STATS_DTYPE)
+    return np.memmap(path, dtype=STATS_DTYPE, mode="r")
+
+
+class RingBufferSink(StatsSink):
+    """Garde les `capacity` derniers tours."""
+
+    def __init__(self, capacity: int = 10_000) -> None:
+        if capacity <= 0:
+            raise ValueError("la capacité doit être > 0")
+        self._data = np.zeros((capacity, 4), dtype=np.int64)
+        self._n = 0
+
+    def __len__(self) -> int:
+        return min(self._n, self._data.shape[0])
+
+    def record(self, turn: int, counts: tuple[int, int, int]) -> None:
+        self._data[self._n % self._data.shape[0]] = (turn, *counts)
+        self._n += 1
+
+    def last(self) -> Optional[tuple[int, int, int, int]]:
+        """dernier tour reçu (tour, moutons, loups, herbe)"""
+        if self._n == 0:
+            return None
+        turn, s, w, g = self._data[(self._n - 1) % self._data.shape[0]].tolist()
+        return turn, s, w, g
+
+    def series(self) -> dict[str, list[int]]:
+        capacity = self._data.shape[0]
+        if self._n <= capacity:
+            rows = self._data[:self._n]
+        else:
+            rows = np.roll(self._data, -(self._n % capacity), axis=0)
+        return {name: rows[:, k].tolist() for k, name in enumerate(STATS_COLUMNS)}
+
+
+class DownsampleSink(StatsSink):
+    """
+    Sous-échantillonnage au fil de l'eau pour les tracés : au plus `buckets`
+    paquets de tours consécutifs. Chaque paquet garde les tours où chaque
+    effectif atteint son minimum et son maximum, avec les trois effectifs de
+    ces tours. Quand tous les paquets sont pleins, ils sont fusionnés deux à
+    deux et leur largeur double : la mémoire reste constante, et le tracé
+    passe par les pics qu'une simple moyenne effacerait, dans l'ordre où ils
+    sont arrivés.
+    """
+
+    # colonne suivie par chaque extrême : minimums (0..2) puis maximums (3..5)
+    _COLUMNS = np.array([0, 1, 2, 0, 1, 2])
+
+    def __init__(self, buckets: int = 1000) -> None:
+        if buckets < 2 or buckets % 2:
+            raise ValueError("le nombre de paquets doit être pair et >= 2")
+        self._buckets = buckets
+        self._width = 1
+        # par paquet et par extrême : tour, puis effectifs de ce tour
+        self._turn = np.zeros((buckets, 6), dtype=np.int64)
+        self._rows = np.zeros((buckets, 6, 3), dtype=np.int64)
+        self._filled = 0       # paquets commencés
+        self._in_bucket = 0    # tours dans le paquet courant
+
+    def record(self, turn: int, counts: tuple[int, int, int]) -> None:
+        if self._in_bucket == self._width or self._filled == 0:
+            if self._filled == self._buckets:
+                self._merge()
+            b = self._filled
+            self._filled += 1
+            self._in_bucket = 0
+            self._turn[b] = turn
+            self._rows[b] = counts
+        b = self._filled - 1
+        values = self._rows[b, np.arange(6), self._COLUMNS]
+        c = np.asarray(counts)[self._COLUMNS]
+        # inégalités strictes : à égalité, le premier tour est gardé
+        better = np.concatenate((c[:3] < values[:3], c[3:] > values[3:]))
+        self._turn[b, better] = turn
+        self._rows[b, better] = counts
+        self._in_bucket += 1
+
+    def _merge(self) -> None:
+        """fusionne les paquets deux à deux (largeur doublée)"""
+        half = self._buckets // 2
+        a, b = slice(0, None, 2), slice(1, None, 2)
+        va = self._rows[a, np.arange(6), self._COLUMNS]
+        vb = self._rows[b, np.arange(6), self._COLUMNS]
+        take_b = np.concatenate((vb[:, :3] < va[:, :3], vb[:, 3:] > va[:, 3:]), axis=1)
+        self._turn[:half] = np.where(take_b, self._turn[b], self._turn[a])
+        self._rows[:half] = np.where(take_b[:, :, None], self._rows[b], self._rows[a])
+        self._filled = half
+        self._width *= 2
+
+    def series(self) -> dict[str, list[int]]:
+        """tours des extrêmes de tous les paquets (au plus six par paquet), dans l'ordre"""
+        k = self._filled
+        turns, first = np.unique(self._turn[:k].ravel(), return_index=True)
+        rows = self._rows[:k].reshape(-1, 3)[first]
+        out: dict[str, list[int]] = {"turns": turns.tolist()}
+        for c, name in enumerate(STATS_COLUMNS[1:]):
+            out[name] = rows[:, c].tolist()
+        return out
+
+
+class TeeSink(StatsSink):
+    """Transmet chaque tour à plusieurs collecteurs ; `series` est celle du premier."""
+
+    def __init__(self, *sinks: StatsSink) -> None:
+        if not sinks:
+            raise ValueError("au moins un collecteur est nécessaire")
+        self._sinks = sinks
+
+    def record(self, turn: int, counts: tuple[int, int, int]) -> None:
+        for sink in self._sinks:
+            sink.record(turn, counts)
+
+    def series(self) -> dict[str, list[int]]:
+        return self._sinks[0].series()
+
+    def close(self) -> None:
+        for sink in self._sinks:
+            sink.close()
+
+
+def make_stats_sink(out: Optional[str] = None, plot_points: int = 1000) -> StatsSink:
+    """
+    Collecteur utilisé par la CLI et l'interface Pyxel : sous-échantillonnage
+    pour le graphique final, et copie complète en flux dans `out` si fourni
+    (binaire si le nom finit par .bin, CSV sinon).
+    """
+    sink: StatsSink = DownsampleSink(buckets=plot_points)
+    if out is None:
+        return sink
+    writer = BinaryStatsSink(out) if out.endswith(".bin") else CsvStatsSink(out)
+    return TeeSink(sink, writer)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="ecosystem-stats",
+        description="Convertit un fichier d'effectifs binaire (--stats-out *.bin) en CSV.",
+    )
+    parser.add_argument("path", help="Fichier binaire d'effectifs")
+    parser.add_argument("--out", default=None, help="Fichier CSV (défaut: sortie standard)")
+    args = parser.parse_args()
+
+    records = read_binary_stats(args.path)
+    f = open(args.out, "w", newline="") if args.out else sys.stdout
+    writer = csv.writer(f)
+    writer.writerow(STATS_COLUMNS)
+    for start in range(0, records.size, 65536):
+        writer.writerows(records[start:start + 65536].tolist())
+    if args.out:
+        f.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# Historique complet d'une simulation : état de chaque case à chaque tour, sur disque
+
+import argparse
+import os
+import struct
+import sys
+from typing import BinaryIO, Optional
+
+import numpy as np
+
+from p25_hackathon.grid import SHEEP, WOLF, Grid
+
+# Format d'un fichier de trajectoire (ajout seulement) :
+#   en-tête de HEADER_SIZE octets : MAGIC | version | taille n de la grille | premier tour
+#   puis un enregistrement par tour, tous de même taille (voir record_dtype) :
+#   codes des cases (uint8, voir Grid.cell_codes) et énergies (int32), en (n, n).
+# Le fichier se projette en mémoire tel quel : codes[t, y, x] sans copie.
+MAGIC = b"P25TRAJ\0"
+VERSION = 1
+HEADER_SIZE = 64
+
+_HEADER = struct.Struct("<8sIIQ")
+
+
+def record_dtype(n: int) -> np.dtype:
+    """type d'un enregistrement (un tour) pour une grille n×n"""
+    return np.dtype([("codes", np.uint8, (n, n)), ("energy", np.int32, (n, n))])
+
+
+def _read_header(f: BinaryIO, path: str) -> tuple[int, int]:
+    magic, version, size, first_turn = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path!r} n'est pas un fichier de trajectoire")
+    if version != VERSION:
+        raise ValueError(f"version de trajectoire non prise en charge : {version}")
+    return size, first_turn
+
+
+class TrajectoryWriter:
+    """
+    Ajoute l'état de la grille à chaque tour dans un fichier de trajectoire.
+
+    Les tours sont copiés dans un tampon d'environ `buffer_bytes` octets (au
+    moins un tour), écrit d'un bloc quand il est plein : la mémoire utilisée
+    est bornée quelle que soit la taille de la grille et l'écriture ne coûte
+    qu'un appel système par bloc. Avec `append`, un
+    fichier existant est complété à partir du tour `first_turn` (reprise
+    d'une simulation sauvegardée) ; les tours doivent se suivre sans trou.
+    """
+
+    def __init__(self, path: str, grid_size: int, first_turn: int = 0,
+                 buffer_bytes: int = 4 * 1024 * 1024, append: bool = False) -> None:
+        if buffer_bytes <= 0:
+            raise ValueError("la taille du tampon doit être positive")
+        self._dtype = record_dtype(grid_size)
+
+        if append and os.path.exists(path):
+            with open(path, "rb") as f:
+                size, start = _read_header(f, path)
+            if size != grid_size:
+                raise ValueError(f"trajectoire {size}x{size} pour une grille {grid_size}x{grid_size}")
+            # on reprend au tour first_turn : les tours suivants déjà écrits (et un
+            # enregistrement incomplet après un arrêt brutal) sont écrasés
+            stored = (os.path.getsize(path) - HEADER_SIZE) // self._dtype.itemsize
+            if not start <= first_turn <= start + stored:
+                raise ValueError(f"reprise au tour {first_turn} impossible : tours {start}..{start + stored - 1} enregistrés")
+            stored = first_turn - start
+            self._file: BinaryIO = open(path, "r+b")
+            self._file.truncate(HEADER_SIZE + stored * self._dtype.itemsize)
+            self._file.seek(0, os.SEEK_END)
+            self._next_turn = start + stored
+        else:
+            self._file = open(path, "wb")
+            self._file.write(_HEADER.pack(MAGIC, VERSION, grid_size, first_turn).ljust(HEADER_SIZE, b"\0"))
+            self._next_turn = first_turn
+
+        self._size = grid_size
+        self._buffer = np.zeros(max(1, buffer_bytes // self._dtype.itemsize), dtype=self._dtype)
+        self._pending = 0
+
+    @property
+    def next_turn(self) -> int:
+        """tour attendu au prochain appel de record"""
+        return self._next_turn
+
+    def record(self, turn: int, grid: Grid) -> None:
+        """ajoute l'état de la grille au tour `turn`"""
+        if turn != self._next_turn:
+            raise ValueError(f"tour {turn} reçu, tour {self._next_turn} attendu")
+        n = self._size
+        slot = self._buffer[self._pending]
+        slot["codes"] = grid.cell_codes().reshape(n, n)
+        slot["energy"] = grid.cell_energies().reshape(n, n)
+        self._pending += 1
+        self._next_turn += 1
+        if self._pending == self._buffer.size:
+            self.flush()
+
+    def flush(self) -> None:
+        """écrit les tours en attente"""
+        if self._pending:
+            self._file.write(self._buffer[:self._pending].tobytes())
+            self._file.flush()
+            self._pending = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+
+class Trajectory:
+    """
+    Lecture d'un fichier de trajectoire, projeté en mémoire (lecture seule).
+
+    `codes` et `energy` sont des vues (tours, n, n) sur le fichier : un tour
+    (`codes[t]`) ou l'historique d'une case (`codes[:, y, x]`) se lisent sans
+    copie, et seules les pages touchées sont chargées.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self.size, self.first_turn = _read_header(f, path)
+        dtype = record_dtype(self.size)
+        turns = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+        if turns == 0:
+            self._records = np.zeros(0, dtype=dtype)
+        else:
+            self._records = np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(turns,))
+
+    def __len__(self) -> int:
+        return self._records.shape[0]
+
+    @property
+    def turns(self) -> range:
+        """numéros des tours enregistrés"""
+        return range(self.first_turn, self.first_turn + len(self))
+
+    @property
+    def codes(self) -> np.ndarray:
+        """codes des cases, (tours, n, n)"""
+        return self._records["codes"]
+
+    @property
+    def energy(self) -> np.ndarray:
+        """énergie de l'animal de chaque case, (tours, n, n)"""
+        return self._records["energy"]
+
+    def index_of_turn(self, turn: int) -> int:
+        """position du tour `turn` dans les tableaux"""
+        if turn not in self.turns:
+            raise ValueError(f"tour {turn} absent (tours {self.first_turn}..{self.first_turn + len(self) - 1})")
+        return turn - self.first_turn
+
+    def cell_history(self, x: int, y: int) -> tuple[np.ndarray, np.ndarray]:
+        """codes et énergies d'une case au fil des tours (vues sans copie)"""
+        return self.codes[:, y, x], self.energy[:, y, x]
+
+    def counts(self, start: int = 0, stop: Optional[int] = None, chunk: int = 256) -> np.ndarray:
+        """
+        effectifs (moutons, loups, herbe) de chaque tour, (tours, 3) ;
+        calculés par blocs de `chunk` tours pour ne pas tout charger d'un coup
+        """
+        stop = len(self) if stop is None else stop
+        out = np.zeros((max(stop - start, 0), 3), dtype=np.int64)
+        for lo in range(start, stop, chunk):
+            hi = min(lo + chunk, stop)
+            block = np.asarray(self.codes[lo:hi]).reshape(hi - lo, -1)
+            species = block >> 1
+            out[lo - start:hi - start, 0] = np.count_nonzero(species == SHEEP, axis=1)
+            out[lo - start:hi - start, 1] = np.count_nonzero(species == WOLF, axis=1)
+            out[lo - start:hi - start, 2] = np.count_nonzero(block & 1, axis=1)
+        return out
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ecosystem-trajectory",
+        description="Résume un fichier de trajectoire enregistré avec --trajectory.",
+    )
+    parser.add_argument("path", help="Fichier de trajectoire")
+    parser.add_argument("--cell", type=int, nargs=2, metavar=("X", "Y"), default=None,
+                        help="Afficher l'historique d'une case")
+    parser.add_argument("--every", type=int, default=50,
+                        help="Intervalle entre deux lignes affichées, en tours (défaut: 50)")
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    traj = Trajectory(args.path)
+    n = traj.size
+    print(f"{len(traj)} tours ({traj.first_turn}..{traj.first_turn + len(traj) - 1}), grille {n}x{n}")
+
+    if args.cell is not None:
+        x, y = args.cell
+        if not (0 <= x < n and 0 <= y < n):
+            raise ValueError(f"case ({x}, {y}) hors de la grille")
+        codes, energy = traj.cell_history(x, y)
+        symbols = ".#SSWW"
+        for t in range(0, len(traj), args.every):
+            print(f"  tour {traj.turns[t]:6d}  {symbols[codes[t]]}  énergie {energy[t]}")
+    else:
+        counts = traj.counts()
+        for t in range(0, len(traj), args.every):
+            s, w, g = counts[t]
+            print(f"  tour {traj.turns[t]:6d}  Sheep: {s}  Wolves: {w}  Grass: {g}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+# Backends "objects" et "arrays" : même graine, même simulation
+
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from p25_hackathon.simulation import SimConfig, Simulation
+
+TURNS = 60
+
+
+@pytest.mark.parametrize("rng_mode", ["shared", "counter"])
+@pytest.mark.parametrize("seed", [0, 5, -2])
+def test_objects_and_arrays_match_turn_by_turn(rng_mode: str, seed: int) -> None:
+    cfg = SimConfig(grid_size=20, initial_sheep=60, initial_wolves=10, rng_mode=rng_mode)
+    sims = [Simulation(replace(cfg, grid_backend=backend), seed=seed) for backend in ("objects", "arrays")]
+    for sim in sims:
+        sim.initialize()
+    for _ in range(TURNS):
+        objects, arrays = sims
+        assert objects.grid.count() == arrays.grid.count(), f"tour {objects.turn}"
+        np.testing.assert_array_equal(objects.grid.cell_codes(), arrays.grid.cell_codes())
+        if objects.should_stop():
+            break
+        for sim in sims:
+            sim.step()
@@ -0,0 +1,26 @@
+# Lecture des arguments de batch.py
+
+import argparse
+
+import pytest
+
+from p25_hackathon.batch import parse_seeds
+
+
+@pytest.mark.parametrize("text, seeds", [
+    ("0-3", [0, 1, 2, 3]),
+    ("1,5,7", [1, 5, 7]),
+    ("-3", [-3]),
+    ("-5-2", [-5, -4, -3, -2, -1, 0, 1, 2]),
+    ("-5--3", [-5, -4, -3]),
+    ("1,-2", [1, -2]),
+    ("0-2,-1", [0, 1, 2, -1]),
+])
+def test_parse_seeds(text: str, seeds: list[int]) -> None:
+    assert parse_seeds(text) == seeds
+
+
+@pytest.mark.parametrize("text", ["", "a", "1-", "1--", "1,,2"])
+def test_parse_seeds_rejects_garbage(text: str) -> None:
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_seeds(text)
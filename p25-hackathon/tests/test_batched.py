@@ -0,0 +1,35 @@
+# Phases groupées (batched.py) contre la version un animal à la fois : mêmes statistiques
+
+from dataclasses import replace
+
+import pytest
+
+from p25_hackathon.batched import _welch
+from p25_hackathon.simulation import SimConfig, Simulation
+
+SEEDS = range(12)
+TURNS = 20
+MAX_SIGMA = 4.0
+
+
+def _final_counts(cfg: SimConfig, seed: int) -> tuple[int, int, int]:
+    sim = Simulation(cfg, seed=seed)
+    sim.initialize()
+    for _ in range(TURNS):
+        sim.step()
+    return sim.grid.count()
+
+
+@pytest.mark.parametrize("rng_mode", ["shared", "counter"])
+def test_batched_phases_match_sequential(rng_mode: str) -> None:
+    cfg = SimConfig(grid_size=20, initial_sheep=100, initial_wolves=8, max_turns=TURNS,
+                    grid_backend="arrays", rng_mode=rng_mode)
+    samples = {
+        batched: [_final_counts(replace(cfg, batched_phases=batched), seed) for seed in SEEDS]
+        for batched in (False, True)
+    }
+    for k, name in enumerate(("moutons", "loups", "herbe")):
+        a = [float(c[k]) for c in samples[False]]
+        b = [float(c[k]) for c in samples[True]]
+        sigma = _welch(a, b)
+        assert sigma <= MAX_SIGMA, f"{name} : écart de {sigma:.1f} σ"
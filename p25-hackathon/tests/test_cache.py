@@ -0,0 +1,85 @@
+# Cache des résultats (cache.py) : clés, lectures, entrées abîmées, éviction
+
+import os
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+import p25_hackathon.cache as cache_module
+from p25_hackathon.cache import CachedRun, ResultCache, cache_key
+from p25_hackathon.simulation import SimConfig
+
+CFG = SimConfig(grid_size=10, max_turns=5)
+
+
+def _run(n: int = 6) -> CachedRun:
+    series = np.array([[t, 20 - t, 5, 30 + t] for t in range(n)])
+    return CachedRun.from_series(series, "max_turns")
+
+
+def _entry(directory, seed: int) -> str:
+    return os.path.join(directory, cache_key(CFG, seed) + ".run")
+
+
+def test_hit_and_miss(tmp_path) -> None:
+    cache = ResultCache(str(tmp_path))
+    assert cache.get(CFG, 1) is None
+    cache.put(CFG, 1, _run())
+    hit = cache.get(CFG, 1)
+    assert hit is not None
+    np.testing.assert_array_equal(hit.series, _run().series)
+    assert hit.outcome == _run().outcome
+    assert cache.get(CFG, 2) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_unseeded_runs_are_not_cached(tmp_path) -> None:
+    cache = ResultCache(str(tmp_path))
+    cache.put(CFG, None, _run())
+    assert cache.get(CFG, None) is None
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.parametrize("keep", [0, 3, 40])
+def test_damaged_entry_is_a_miss_and_is_replaced(tmp_path, keep: int) -> None:
+    cache = ResultCache(str(tmp_path))
+    cache.put(CFG, 1, _run())
+    path = _entry(tmp_path, 1)
+    with open(path, "r+b") as f:
+        f.truncate(keep)  # écriture interrompue
+    assert cache.get(CFG, 1) is None
+    assert cache.misses == 1
+    assert not os.path.exists(path)
+    cache.put(CFG, 1, _run())
+    assert cache.get(CFG, 1) is not None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path) -> None:
+    probe = ResultCache(str(tmp_path / "probe"))
+    probe.put(CFG, 0, _run())
+    entry_size = os.path.getsize(_entry(tmp_path / "probe", 0))
+
+    cache = ResultCache(str(tmp_path / "cache"), max_bytes=int(entry_size * 2.5))
+    cache.put(CFG, 1, _run())
+    cache.put(CFG, 2, _run())
+    os.utime(_entry(tmp_path / "cache", 1), (100, 100))
+    os.utime(_entry(tmp_path / "cache", 2), (200, 200))
+    assert cache.get(CFG, 1) is not None  # 1 devient la plus récente
+    cache.put(CFG, 3, _run())             # dépasse la limite : 2 est supprimée
+
+    assert cache.get(CFG, 2) is None
+    assert cache.get(CFG, 1) is not None
+    assert cache.get(CFG, 3) is not None
+
+
+def test_key_changes_with_config_seed_and_engine(monkeypatch) -> None:
+    key = cache_key(CFG, 1)
+    assert cache_key(CFG, 1) == key
+    assert cache_key(CFG, 2) != key
+    assert cache_key(replace(CFG, grid_size=11), 1) != key
+    assert cache_key(replace(CFG, grass_growth_probability=0.2), 1) != key
+    # affichage seulement : même résultat, même clé
+    assert cache_key(replace(CFG, delay_s=1.0, use_color=False), 1) == key
+    monkeypatch.setattr(cache_module, "ENGINE_VERSION", cache_module.ENGINE_VERSION + 1)
+    assert cache_key(CFG, 1) != key
@@ -0,0 +1,28 @@
+# Sauvegarde et reprise (Simulation.save / Simulation.load)
+
+import numpy as np
+import pytest
+
+from p25_hackathon.simulation import SimConfig, Simulation
+
+
+@pytest.mark.parametrize("rng_mode", ["shared", "counter"])
+@pytest.mark.parametrize("backend", ["objects", "arrays", "chunked"])
+def test_resumed_run_matches_uninterrupted(tmp_path, backend: str, rng_mode: str) -> None:
+    cfg = SimConfig(grid_size=20, initial_sheep=60, initial_wolves=10, grid_backend=backend, rng_mode=rng_mode)
+    original = Simulation(cfg, seed=3)
+    original.initialize()
+    for _ in range(15):
+        original.step()
+
+    path = tmp_path / "run.ckpt"
+    original.save(str(path))
+    resumed = Simulation.load(str(path))
+    assert resumed.turn == original.turn
+
+    for _ in range(30):
+        assert resumed.grid.count() == original.grid.count(), f"tour {original.turn}"
+        np.testing.assert_array_equal(resumed.grid.cell_codes(), original.grid.cell_codes())
+        np.testing.assert_array_equal(resumed.grid.cell_energies(), original.grid.cell_energies())
+        original.step()
+        resumed.step()
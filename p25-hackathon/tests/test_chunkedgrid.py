@@ -0,0 +1,59 @@
+# Grille en tuiles (chunkedgrid.py) : déplacements d'une tuile à l'autre, retour des tuiles à l'état compact
+
+import random
+
+import numpy as np
+
+from p25_hackathon.arraygrid import ArrayGrid
+from p25_hackathon.chunkedgrid import ChunkedGrid
+from p25_hackathon.livingbeings import Sheep, Wolf
+
+
+def test_moves_across_tile_borders_match_arraygrid() -> None:
+    # tuiles de 4 sur une grille de 10 : celles du bord n'ont que 2 cases de large
+    chunked = ChunkedGrid(10, grass_regrow_time=3, tile_size=4)
+    flat = ArrayGrid(10, grass_regrow_time=3)
+    moves = [((3, 1), (4, 1)), ((4, 1), (4, 0)), ((4, 3), (4, 4)), ((7, 4), (8, 4)), ((8, 4), (9, 9))]
+    for grid in (chunked, flat):
+        grid.cell(3, 1).animal = Sheep(energy=5)
+        grid.cell(4, 3).animal = Wolf(energy=7)
+        grid.cell(7, 4).animal = Sheep(energy=2)
+        grid.cell(4, 0).grass.present = True
+        for dep, arr in moves:
+            assert grid.move_animal(dep, arr)
+        assert grid.eat_grass_if_present(4, 0)
+        assert not grid.move_animal((4, 4), (4, 0))  # destination occupée
+
+    assert chunked.count() == flat.count() == (2, 1, 0)
+    assert sorted(chunked.positions_of(Sheep)) == [(4, 0), (9, 9)]
+    np.testing.assert_array_equal(chunked.cell_codes(), flat.cell_codes())
+    np.testing.assert_array_equal(chunked.cell_energies(), flat.cell_energies())
+    assert chunked.cell(4, 0).grass.regrow_timer == 3
+
+
+def test_tiles_return_to_compact_states() -> None:
+    grid = ChunkedGrid(8, grass_regrow_time=2, tile_size=4)
+    rng = random.Random(0)
+    assert grid.tile_counts == (4, 0, 0) and grid.nbytes == 0
+
+    # tuile 0 entièrement en herbe : plus de tableaux après le tour d'herbe
+    for y in range(4):
+        for x in range(4):
+            grid.cell(x, y).grass.present = True
+    grid.tick_grass(0.0, rng)
+    assert grid.tile_counts == (3, 1, 0) and grid.nbytes == 0
+
+    # une case mangée : tuile allouée tant que l'herbe repousse
+    assert grid.eat_grass_if_present(1, 2)
+    assert grid.tile_counts == (3, 0, 1) and grid.count()[2] == 15
+    grid.tick_grass(0.0, rng)
+    assert grid.tile_counts == (3, 0, 1)
+    grid.tick_grass(0.0, rng)
+    assert grid.tile_counts == (3, 1, 0) and grid.count()[2] == 16
+
+    # herbe retirée partout : tuile de nouveau vide
+    for y in range(4):
+        for x in range(4):
+            grid.cell(x, y).grass.present = False
+    grid.tick_grass(0.0, rng)
+    assert grid.tile_counts == (4, 0, 0) and grid.nbytes == 0 and grid.count()[2] == 0
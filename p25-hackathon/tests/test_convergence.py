@@ -0,0 +1,79 @@
+# Détecteur de dynamique établie (convergence.py), sur des séries synthétiques
+
+import numpy as np
+import pytest
+
+from p25_hackathon.convergence import (STOP_CYCLE, STOP_FIXED_POINT, STOP_SHEEP_EXTINCT,
+                                       STOP_WOLVES_EXTINCT, ConvergenceDetector)
+
+CELLS = 10_000
+TURNS = 600
+
+
+def _feed(detector: ConvergenceDetector, series: np.ndarray, start: int = 0) -> None:
+    for turn, counts in enumerate(series, start=start):
+        if detector.update(turn, tuple(int(v) for v in counts)) is not None:
+            break
+
+
+def _sine(period: int) -> np.ndarray:
+    t = np.arange(TURNS)
+    phase = 2 * np.pi * t / period
+    return np.stack([2000 + 1500 * np.sin(phase), 500 + 300 * np.sin(phase - 1.0), np.full(TURNS, 3000)], axis=1)
+
+
+def test_oscillation_is_a_cycle_with_its_period() -> None:
+    detector = ConvergenceDetector(CELLS, window=200)
+    _feed(detector, _sine(37))
+    assert detector.reason == STOP_CYCLE
+    assert detector.period == 37
+
+
+def test_noise_around_constant_counts_is_a_fixed_point() -> None:
+    rng = np.random.default_rng(0)
+    noise = np.array([2000, 500, 3000]) + rng.normal(0, 30, (TURNS, 3))
+    detector = ConvergenceDetector(CELLS, window=200)
+    _feed(detector, noise)
+    assert detector.reason == STOP_FIXED_POINT
+
+
+def test_ramp_never_stops() -> None:
+    t = np.arange(TURNS)
+    detector = ConvergenceDetector(CELLS, window=200)
+    _feed(detector, np.stack([100 + 5 * t, 50 + 2 * t, 3000 + t], axis=1))
+    assert detector.reason is None
+
+
+@pytest.mark.parametrize("counts, reason", [((0, 40, 900), STOP_SHEEP_EXTINCT), ((80, 0, 900), STOP_WOLVES_EXTINCT)])
+def test_single_species_extinction(counts: tuple[int, int, int], reason: str) -> None:
+    detector = ConvergenceDetector(CELLS, window=200)
+    assert detector.update(0, (100, 50, 900)) is None
+    assert detector.update(1, counts) == reason
+    assert detector.turn == 1
+    # une raison trouvée reste
+    assert detector.update(2, (100, 50, 900)) == reason
+
+
+def test_species_absent_from_the_start_is_not_an_extinction() -> None:
+    detector = ConvergenceDetector(CELLS, window=200)
+    for turn in range(10):
+        assert detector.update(turn, (100 + turn, 0, 900)) is None
+
+
+def test_export_import_round_trip() -> None:
+    series = _sine(37)
+    reference = ConvergenceDetector(CELLS, window=200)
+    _feed(reference, series)
+
+    first = ConvergenceDetector(CELLS, window=200)
+    _feed(first, series[:150])
+    assert first.reason is None
+    state, buffer = first.export_state()
+    resumed = ConvergenceDetector(CELLS, window=200)
+    resumed.import_state(state, buffer)
+    np.testing.assert_array_equal(resumed.window(), first.window())
+    _feed(resumed, series[150:], start=150)
+    assert (resumed.reason, resumed.turn, resumed.period) == (reference.reason, reference.turn, reference.period)
+
+    with pytest.raises(ValueError):
+        ConvergenceDetector(CELLS, window=100).import_state(state, buffer)
@@ -0,0 +1,28 @@
+# Ensemble de répliques (ensemble.py) : chaque réplique suit la simulation seule de même graine
+
+import numpy as np
+
+from p25_hackathon.ensemble import Ensemble
+from p25_hackathon.parallel import ParallelSimulation
+from p25_hackathon.simulation import SimConfig
+
+TURNS = 12
+
+
+def test_each_replica_matches_its_single_run() -> None:
+    cfg = SimConfig(grid_size=24, initial_sheep=120, initial_wolves=20)
+    seeds = [-2, 0, 7]
+    ensemble = Ensemble(cfg, seeds)
+    ensemble.initialize()
+    result = ensemble.run(TURNS)
+    assert result.series.shape == (TURNS + 1, len(seeds), 3)
+
+    for k, seed in enumerate(seeds):
+        with ParallelSimulation(cfg, seed=seed, workers=1) as single:
+            single.initialize()
+            counts = [single.count()]
+            for _ in range(TURNS):
+                single.step()
+                counts.append(single.count())
+        np.testing.assert_array_equal(result.series[:, k], np.array(counts), err_msg=f"graine {seed}")
+    np.testing.assert_allclose(result.mean, result.series.mean(axis=1))
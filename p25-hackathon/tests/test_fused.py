@@ -0,0 +1,17 @@
+# FusedSimulation (fused.py) reproduit Simulation.step tour par tour
+
+import pytest
+
+from p25_hackathon.fused import check_equivalence
+from p25_hackathon.simulation import SimConfig
+
+TURNS = 40
+
+
+@pytest.mark.parametrize("batched_phases", [False, True])
+@pytest.mark.parametrize("rng_mode", ["shared", "counter"])
+@pytest.mark.parametrize("seed", [0, 1, 7, -3])
+def test_fused_matches_simulation(rng_mode: str, batched_phases: bool, seed: int) -> None:
+    cfg = SimConfig(grid_size=20, initial_sheep=80, initial_wolves=10, max_turns=TURNS,
+                    grid_backend="arrays", rng_mode=rng_mode, batched_phases=batched_phases)
+    assert check_equivalence(cfg, seed, TURNS) is None
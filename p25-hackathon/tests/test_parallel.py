@@ -0,0 +1,29 @@
+# Tour synchrone réparti (parallel.py) : même résultat quel que soit le nombre de processus
+
+import numpy as np
+import pytest
+
+from p25_hackathon.parallel import ParallelSimulation
+from p25_hackathon.simulation import SimConfig
+
+TURNS = 15
+
+
+def _final_state(cfg: SimConfig, seed: int, workers: int) -> tuple[tuple[int, int, int], dict[str, np.ndarray]]:
+    with ParallelSimulation(cfg, seed=seed, workers=workers) as sim:
+        sim.initialize()
+        for _ in range(TURNS):
+            sim.step()
+        return sim.count(), {name: arr.copy() for name, arr in sim.world.items()}
+
+
+@pytest.mark.parametrize("seed", [-4, 3])
+def test_same_result_for_any_number_of_workers(seed: int) -> None:
+    cfg = SimConfig(grid_size=48, initial_sheep=400, initial_wolves=60)
+    counts, world = _final_state(cfg, seed, workers=1)
+    assert counts[0] > 0 and counts[1] > 0
+    for workers in (3, 5):
+        other_counts, other_world = _final_state(cfg, seed, workers)
+        assert other_counts == counts, f"{workers} processus"
+        for name, arr in world.items():
+            np.testing.assert_array_equal(other_world[name], arr, err_msg=f"{name}, {workers} processus")
@@ -0,0 +1,25 @@
+# Pipeline simulation / affichage (pipeline.py)
+
+import time
+
+from p25_hackathon.pipeline import FramePipeline
+from p25_hackathon.simulation import SimConfig, Simulation
+
+
+def test_every_frame_is_shown_or_counted_as_dropped() -> None:
+    sim = Simulation(SimConfig(grid_size=20, max_turns=150), seed=1)
+    sim.initialize()
+    turns_seen = []
+    pipeline = FramePipeline(sim, capacity=2, on_turn=lambda s: turns_seen.append(s.turn))
+    shown = []
+    with pipeline:
+        while True:
+            frame = pipeline.latest(timeout=5.0)
+            if frame is None:
+                break
+            shown.append(frame.turn)
+            if frame.last:
+                break
+            time.sleep(0.002)  # affichage plus lent que la simulation
+    assert shown == sorted(shown) and shown[-1] == sim.turn
+    assert len(shown) + pipeline.dropped == len(turns_seen) == sim.turn + 1
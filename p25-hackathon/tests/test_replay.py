@@ -0,0 +1,36 @@
+# Journal de rejeu (replay.py) : une position retrouvée vaut la simulation à ce tour
+
+import numpy as np
+
+from p25_hackathon.replay import Replay, ReplayRecorder
+from p25_hackathon.simulation import SimConfig, Simulation
+
+TURNS = 40
+KEYFRAME_EVERY = 8
+
+
+def test_seek_matches_live_run(tmp_path) -> None:
+    cfg = SimConfig(grid_size=16, initial_sheep=40, initial_wolves=6, grid_backend="arrays")
+    path = str(tmp_path / "run.rpl")
+    sim = Simulation(cfg, seed=4)
+    sim.initialize()
+    live = {}
+    recorder = ReplayRecorder(path, cfg.grid_size, keyframe_every=KEYFRAME_EVERY)
+    for _ in range(TURNS + 1):
+        codes = sim.grid.cell_codes()
+        live[sim.turn] = (codes.copy(), sim.grid.count())
+        recorder.record(sim.turn, codes, sim.grid.count())
+        sim.step()
+    recorder.close()
+
+    replay = Replay(path)
+    assert replay.turns == list(range(TURNS + 1))
+    # sauts en avant, en arrière, sur et entre les images clés
+    for turn in (0, 17, 3, 40, 8, 9, 39, 16, 25):
+        np.testing.assert_array_equal(replay.seek(replay.index_of_turn(turn)), live[turn][0])
+        assert replay.counts[replay.index] == live[turn][1]
+    # pas à pas en arrière depuis la fin
+    replay.seek(len(replay) - 1)
+    for turn in range(TURNS - 1, TURNS - 12, -1):
+        np.testing.assert_array_equal(replay.step(-1), live[turn][0])
+    replay.close()
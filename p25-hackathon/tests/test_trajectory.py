@@ -0,0 +1,38 @@
+# Fichier de trajectoire (trajectory.py) : écriture par blocs, relecture projetée en mémoire
+
+import numpy as np
+
+from p25_hackathon.simulation import SimConfig, Simulation
+from p25_hackathon.trajectory import Trajectory, TrajectoryWriter, record_dtype
+
+N = 12
+
+
+def _run(path: str, first_turn: int, sim: Simulation, turns: int, append: bool = False) -> list:
+    # tampon de 3 tours : plusieurs blocs et un bloc final partiel
+    writer = TrajectoryWriter(path, N, first_turn=first_turn, append=append,
+                              buffer_bytes=3 * record_dtype(N).itemsize)
+    states = []
+    for _ in range(turns):
+        writer.record(sim.turn, sim.grid)
+        states.append((sim.grid.cell_codes().reshape(N, N).copy(), sim.grid.cell_energies().reshape(N, N).copy()))
+        sim.step()
+    writer.close()
+    return states
+
+
+def test_records_round_trip(tmp_path) -> None:
+    path = str(tmp_path / "run.traj")
+    sim = Simulation(SimConfig(grid_size=N, initial_sheep=30, initial_wolves=5, grid_backend="arrays"), seed=2)
+    sim.initialize()
+    states = _run(path, 0, sim, 10)
+    # reprise : les tours suivants sont ajoutés au même fichier
+    states += _run(path, sim.turn, sim, 4, append=True)
+
+    traj = Trajectory(path)
+    assert list(traj.turns) == list(range(14))
+    for t, (codes, energy) in enumerate(states):
+        np.testing.assert_array_equal(traj.codes[t], codes)
+        np.testing.assert_array_equal(traj.energy[t], energy)
+    sheep = [int(np.count_nonzero(c >> 1 == 1)) for c, _e in states]
+    assert traj.counts()[:, 0].tolist() == sheep